@@ -9,19 +9,20 @@ from .repos import (
     get_rationales_repo,
     get_subscriptions_repo,
     get_notifications_repo,
+    get_stripe_events_repo,
 )
 from .event_loop import get_event_loop
 from .http_client import get_client_session
 from .auth import (
     get_password_context,
+    get_password_hasher,
     verify_password,
     create_access_token,
     get_current_active_user,
     validate_password,
     validate_email,
-    get_optional_user,
 )
-from .request_pagination import paginate
+from .request_pagination import paginate, get_next_cursor, get_meta_data
 from .query_params import (
     get_post_reactions_query_params,
     get_posts_query_params,
@@ -30,5 +31,7 @@ from .query_params import (
     get_rationales_query_params,
 )
 from .account_connections import get_account_connections_client
-from .stripe import get_stripe_client
-from .content_blocking import get_block_data
+from .stripe import get_stripe_client, get_stripe_event_worker
+from .notifications import get_notification_dispatcher
+from .viewer import get_viewer
+from .metrics import verify_metrics_token
@@ -8,9 +8,10 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.dependencies import get_users_repo  # pylint: disable = cyclic-import
+from app.infrastructure.db.routing import set_request_user
 from app.libraries import pelleum_errors
+from app.libraries.password_hasher import PasswordHasher, create_password_context
 from app.settings import settings
-from app.usecases.interfaces.user_repo import IUsersRepo
 from app.usecases.schemas import auth
 from app.usecases.schemas.users import UserInDB
 
@@ -29,19 +30,55 @@ class CustomOAuth2PasswordBearer(OAuth2PasswordBearer):
 custom_oauth2_scheme = CustomOAuth2PasswordBearer(tokenUrl=settings.token_url)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=settings.token_url)
 
+password_context: Optional[CryptContext] = None
+password_hasher: Optional[PasswordHasher] = None
 
-async def get_password_context():
-    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+async def get_password_context() -> CryptContext:
+    global password_context  # pylint: disable = global-statement
+    if password_context is None:
+        password_context = create_password_context(bcrypt_rounds=settings.bcrypt_rounds)
+
+    return password_context
+
+
+async def get_password_hasher() -> PasswordHasher:
+    global password_hasher  # pylint: disable = global-statement
+    if password_hasher is None:
+        password_hasher = PasswordHasher(
+            password_context=await get_password_context(),
+            max_workers=settings.password_hashing_workers,
+            max_queue=settings.password_hashing_max_queue,
+            retry_after=settings.password_hashing_retry_after,
+        )
+
+    return password_hasher
 
 
 async def verify_password(user: UserInDB, password: str):
-    password_context = await get_password_context()
-    return password_context.verify(password, user.hashed_password)
+    password_hasher = await get_password_hasher()
+    password_matches, new_hashed_password = await password_hasher.verify_and_update(
+        password, user.hashed_password
+    )
+
+    # The stored hash was made under an old policy (e.g. a different bcrypt cost)
+    if new_hashed_password:
+        users_repo = await get_users_repo()
+        await users_repo.update_hashed_password(
+            user_id=user.user_id, hashed_password=new_hashed_password
+        )
+
+    return password_matches
 
 
 async def create_access_token(data: auth.AuthDataToCreateToken) -> str:
     """Creates and returns JSON web token"""
-    data_to_encode: dict = data.dict().copy()
+    data_to_encode: dict = data.dict(exclude_none=True)
+
+    # Without the claims, every request looks the user up by username instead
+    if not settings.access_token_user_claims:
+        data_to_encode.pop("user_id", None)
+        data_to_encode.pop("is_active", None)
 
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
@@ -54,29 +91,48 @@ async def create_access_token(data: auth.AuthDataToCreateToken) -> str:
     )
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
-    """Validates token sent in"""
+async def decode_access_token(token: str) -> Optional[auth.JWTData]:
+    """Returns the token's claims, or None if the token is invalid."""
     try:
         payload = jwt.decode(
             token,
             settings.json_web_token_secret,
             algorithms=[settings.json_web_token_algorithm],
         )
-        username: str = payload.get("sub")
-        if username is None:
-            raise await pelleum_errors.PelleumErrors().invalid_credentials()
-        token_data = auth.JWTData(username=username)
     except JWTError:
-        raise await pelleum_errors.PelleumErrors().invalid_credentials()  # pylint: disable = raise-missing-from
+        return None
+
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+
+    return auth.JWTData(
+        username=username,
+        user_id=payload.get("user_id"),
+        is_active=payload.get("is_active"),
+    )
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
+    """Validates token sent in"""
+    token_data = await decode_access_token(token=token)
+    if token_data is None:
+        raise await pelleum_errors.PelleumErrors().invalid_credentials()
+
+    # Tokens with an is_active claim let inactive users be turned away early
+    if token_data.is_active is False:
+        raise await pelleum_errors.PelleumErrors().inactive_user()
 
     return await verify_user_exists(username=token_data.username)
 
 
 async def verify_user_exists(username: str) -> UserInDB:
     users_repo = await get_users_repo()
-    user = await users_repo.retrieve_user_with_filter(username=username)
+    user = await users_repo.retrieve_authenticated_user(username=username)
     if user is None:
         raise await pelleum_errors.PelleumErrors().invalid_credentials()
+
+    set_request_user(user_id=user.user_id)
     return user
 
 
@@ -135,29 +191,3 @@ async def validate_email(email: str) -> None:
         raise await pelleum_errors.PelleumErrors(
             detail="Email format is invalid. Please submit a valid email."
         ).invalid_email()
-
-
-# Optional User Flow
-async def get_optional_user(
-    token: str = Depends(custom_oauth2_scheme),
-    users_repo: IUsersRepo = Depends(get_users_repo),
-) -> UserInDB:
-    """Validates token sent in"""
-
-    if token:
-        try:
-            payload = jwt.decode(
-                token,
-                settings.json_web_token_secret,
-                algorithms=[settings.json_web_token_algorithm],
-            )
-            username: str = payload.get("sub")
-            if username is None:
-                return
-            token_data = auth.JWTData(username=username)
-        except JWTError:
-            # a token was supplied, but it was invalid
-            return
-
-        return await users_repo.retrieve_user_with_filter(username=token_data.username)
-    return
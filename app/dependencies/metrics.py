@@ -0,0 +1,17 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header
+
+from app.libraries import pelleum_errors
+from app.settings import settings
+
+
+async def verify_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """Only lets through requests bearing settings.metrics_token. With no token
+    configured, metrics aren't served at all."""
+
+    if not settings.metrics_token or not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.metrics_token}"
+    ):
+        raise await pelleum_errors.PelleumErrors().access_forbidden()
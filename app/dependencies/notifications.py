@@ -0,0 +1,22 @@
+from typing import Optional
+
+from app.dependencies import get_notifications_repo
+from app.settings import settings
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
+
+notification_dispatcher: Optional[NotificationDispatcher] = None
+
+
+async def get_notification_dispatcher() -> NotificationDispatcher:
+    global notification_dispatcher  # pylint: disable = global-statement
+    if notification_dispatcher is None:
+        notification_dispatcher = NotificationDispatcher(
+            notifications_repo=await get_notifications_repo(),
+            max_queue_size=settings.notification_queue_size,
+            batch_size=settings.notification_batch_size,
+            flush_interval=settings.notification_flush_ms / 1000,
+            max_attempts=settings.notification_write_attempts,
+            retry_backoff=settings.notification_retry_backoff_ms / 1000,
+        )
+
+    return notification_dispatcher
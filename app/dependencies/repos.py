@@ -4,6 +4,7 @@ from app.infrastructure.db.repos.portfolio_repo import PortfolioRepo
 from app.infrastructure.db.repos.post_reaction_repo import PostReactionRepo
 from app.infrastructure.db.repos.posts_repo import PostsRepo
 from app.infrastructure.db.repos.rationales_repo import RationalesRepo
+from app.infrastructure.db.repos.stripe_events_repo import StripeEventsRepo
 from app.infrastructure.db.repos.subscriptions_repo import SubscriptionsRepo
 from app.infrastructure.db.repos.theses_repo import ThesesRepo
 from app.infrastructure.db.repos.thesis_reaction_repo import ThesisReactionRepo
@@ -13,6 +14,7 @@ from app.usecases.interfaces.portfolio_repo import IPortfolioRepo
 from app.usecases.interfaces.post_reaction_repo import IPostReactionRepo
 from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.interfaces.rationales_repo import IRationalesRepo
+from app.usecases.interfaces.stripe_events_repo import IStripeEventsRepo
 from app.usecases.interfaces.subscriptions_repo import ISubscriptionsRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
 from app.usecases.interfaces.user_repo import IUsersRepo
@@ -52,3 +54,7 @@ async def get_subscriptions_repo() -> ISubscriptionsRepo:
 
 async def get_notifications_repo() -> INotificationsRepo:
     return NotificationsRepo(db=await get_or_create_database())
+
+
+async def get_stripe_events_repo() -> IStripeEventsRepo:
+    return StripeEventsRepo(db=await get_or_create_database())
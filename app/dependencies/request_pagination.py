@@ -1,10 +1,80 @@
+import base64
+import binascii
+import math
+from datetime import datetime
+from typing import Any, List, Optional
+
 from fastapi import Query
 
+from app.libraries import pelleum_errors
 from app.usecases.schemas import request_pagination
 
 
-def paginate(
-    records_per_page=Query(200), page=Query(1)
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """Encodes a (created_at, id) sort key into an opaque cursor string"""
+
+    raw_cursor = f"{created_at.isoformat()}|{record_id}"
+    return base64.urlsafe_b64encode(raw_cursor.encode()).decode()
+
+
+async def decode_cursor(cursor: str) -> request_pagination.Cursor:
+    """Decodes an opaque cursor string back into its (created_at, id) sort key"""
+
+    try:
+        raw_cursor = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, record_id = raw_cursor.split("|")
+        return request_pagination.Cursor(
+            created_at=datetime.fromisoformat(created_at), record_id=int(record_id)
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise await pelleum_errors.PelleumErrors(
+            detail="The supplied cursor is invalid."
+        ).invalid_query_params()
+
+
+def get_next_cursor(
+    records: List[Any], records_per_page: int, id_field: str
+) -> Optional[str]:
+    """Returns the cursor for the page after records, or None if records is the last page"""
+
+    if not records or len(records) < records_per_page:
+        return None
+
+    last_record = records[-1]
+    return encode_cursor(
+        created_at=last_record.created_at, record_id=getattr(last_record, id_field)
+    )
+
+
+def get_meta_data(
+    pagination: request_pagination.RequestPagination,
+    records: List[Any],
+    record_count: Optional[request_pagination.RecordCount],
+    id_field: str,
+) -> request_pagination.MetaData:
+    """Builds the pagination meta data returned alongside a page of records"""
+
+    return request_pagination.MetaData(
+        page=pagination.page,
+        records_per_page=pagination.records_per_page,
+        total_records=record_count.total if record_count else None,
+        total_records_type=record_count.type if record_count else None,
+        total_pages=math.ceil(record_count.total / pagination.records_per_page)
+        if record_count and pagination.records_per_page
+        else None,
+        next_cursor=get_next_cursor(
+            records=records,
+            records_per_page=pagination.records_per_page,
+            id_field=id_field,
+        ),
+    )
+
+
+async def paginate(
+    records_per_page=Query(200),
+    page=Query(1),
+    cursor=Query(None),
+    include_total: Optional[bool] = Query(None),
 ) -> request_pagination.RequestPagination:
 
     records_per_page = int(records_per_page)
@@ -15,5 +85,9 @@ def paginate(
     page = max(page, 1)
 
     return request_pagination.RequestPagination(
-        page=page, records_per_page=records_per_page
+        page=page,
+        records_per_page=records_per_page,
+        cursor=await decode_cursor(cursor) if cursor else None,
+        # Totals are skipped by default when scrolling with a cursor
+        include_total=include_total if include_total is not None else not cursor,
     )
@@ -1,12 +1,46 @@
+from typing import Optional
+
+import aiohttp
+from fastapi import Depends
+
+from app.dependencies import (
+    get_client_session,
+    get_stripe_events_repo,
+    get_subscriptions_repo,
+)
 from app.infrastructure.clients.stripe import StripeClient
 from app.settings import settings
 from app.usecases.interfaces.clients.stripe import IStripeClient
+from app.usecases.services.stripe_events import StripeEventWorker
+
+stripe_event_worker: Optional[StripeEventWorker] = None
 
 
-async def get_stripe_client() -> IStripeClient:
+async def get_stripe_client(
+    client_session: aiohttp.client.ClientSession = Depends(get_client_session),
+) -> IStripeClient:
     """Instantiate and return stripe client"""
 
     return StripeClient(
+        client_session=client_session,
         api_key=settings.stripe_test_secret_key,
         webhook_secret=settings.stripe_test_webhook_secret,
+        base_url=settings.stripe_api_base_url,
+        timeout=settings.stripe_timeout_seconds,
+        max_retries=settings.stripe_max_retries,
     )
+
+
+async def get_stripe_event_worker() -> StripeEventWorker:
+    global stripe_event_worker  # pylint: disable = global-statement
+    if stripe_event_worker is None:
+        stripe_event_worker = StripeEventWorker(
+            stripe_events_repo=await get_stripe_events_repo(),
+            subscriptions_repo=await get_subscriptions_repo(),
+            stripe_client=await get_stripe_client(
+                client_session=await get_client_session()
+            ),
+            max_concurrency=settings.stripe_event_worker_concurrency,
+        )
+
+    return stripe_event_worker
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Optional
+
+from fastapi import Depends
+
+from app.dependencies import get_users_repo  # pylint: disable = cyclic-import
+from app.dependencies.auth import custom_oauth2_scheme, decode_access_token
+from app.infrastructure.db.routing import set_request_user
+from app.usecases.interfaces.user_repo import IUsersRepo
+from app.usecases.schemas.users import Viewer
+
+
+async def get_viewer(
+    token: Optional[str] = Depends(custom_oauth2_scheme),
+    users_repo: IUsersRepo = Depends(get_users_repo),
+) -> Viewer:
+    """Resolves the requesting user and their block sets once per request. Anonymous
+    or invalid tokens resolve to a viewer with no user who blocks no one."""
+
+    if not token:
+        return Viewer()
+
+    token_data = await decode_access_token(token=token)
+    if token_data is None:
+        return Viewer()
+
+    # Without a user_id claim, the block sets have to be joined onto the user lookup
+    if token_data.user_id is None:
+        viewer = await users_repo.retrieve_viewer(username=token_data.username)
+        if viewer.user:
+            set_request_user(user_id=viewer.user.user_id)
+        return viewer
+
+    set_request_user(user_id=token_data.user_id)
+    user, block_data = await asyncio.gather(
+        users_repo.retrieve_authenticated_user(username=token_data.username),
+        users_repo.retrieve_block_data(user_id=token_data.user_id),
+    )
+
+    if not user:
+        return Viewer()
+
+    return Viewer(user=user, block_data=block_data)
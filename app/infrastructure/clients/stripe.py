@@ -1,26 +1,132 @@
-from typing import Any
+import asyncio
+import uuid
+from typing import Any, List, Mapping, Optional, Tuple
 
+import aiohttp
 import stripe
 
 from app.libraries.pelleum_errors import PelleumErrors
 from app.usecases.interfaces.clients.stripe import IStripeClient
 from app.usecases.schemas import subscriptions
 
+# Statuses worth retrying: conflicts, rate limiting, and Stripe-side failures
+RETRYABLE_STATUSES = {409, 429, 500, 502, 503, 504}
+
+
+def encode_stripe_params(
+    params: Mapping[str, Any], prefix: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """Flattens nested params into Stripe's bracketed form encoding, e.g.
+    {"items": [{"price": "p"}]} becomes [("items[0][price]", "p")]."""
+
+    encoded = []
+
+    for key, value in params.items():
+        name = f"{prefix}[{key}]" if prefix else key
+
+        if value is None:
+            continue
+
+        if isinstance(value, Mapping):
+            encoded.extend(encode_stripe_params(value, prefix=name))
+        elif isinstance(value, (list, tuple)):
+            for index, item in enumerate(value):
+                if isinstance(item, Mapping):
+                    encoded.extend(
+                        encode_stripe_params(item, prefix=f"{name}[{index}]")
+                    )
+                else:
+                    encoded.append((f"{name}[{index}]", str(item)))
+        elif isinstance(value, bool):
+            encoded.append((name, "true" if value else "false"))
+        else:
+            encoded.append((name, str(value)))
+
+    return encoded
+
 
 class StripeClient(IStripeClient):
-    def __init__(self, api_key, webhook_secret) -> None:
-        stripe.api_key = api_key
+    """Calls the Stripe API over the shared aiohttp session, so requests don't block
+    the event loop. POSTs carry an idempotency key that is reused across retries."""
+
+    def __init__(
+        self,
+        client_session: aiohttp.client.ClientSession,
+        api_key: str,
+        webhook_secret: str,
+        base_url: str = "https://api.stripe.com",
+        timeout: float = 10,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+    ) -> None:
+        self.client_session = client_session
+        self.base_url = base_url
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.__api_key = api_key
         self.__webhook_secret = webhook_secret
 
+    async def api_call(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Mapping[str, Any]:
+        """Make API call, retrying network errors and retryable statuses"""
+
+        headers = {"Authorization": f"Bearer {self.__api_key}"}
+        if method == "POST":
+            headers["Idempotency-Key"] = str(uuid.uuid4())
+
+        encoded_params = encode_stripe_params(params) if params else None
+        error_message = "There was an external Stripe error"
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+            try:
+                async with self.client_session.request(
+                    method,
+                    self.base_url + endpoint,
+                    headers=headers,
+                    params=encoded_params if method in ("GET", "DELETE") else None,
+                    data=encoded_params if method == "POST" else None,
+                    timeout=self.timeout,
+                ) as response:
+                    response_json = await response.json(content_type=None)
+
+                    if response.status < 400:
+                        return response_json
+
+                    # Error bodies aren't always JSON objects, e.g. when empty
+                    error = (
+                        response_json.get("error")
+                        if isinstance(response_json, dict)
+                        else None
+                    )
+                    if isinstance(error, dict):
+                        error_message = error.get("message", error_message)
+                    should_retry = response.headers.get("Stripe-Should-Retry")
+                    if should_retry == "false" or (
+                        should_retry is None
+                        and response.status not in RETRYABLE_STATUSES
+                    ):
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error_message = f"Stripe request failed: {e!r}"
+
+        raise await PelleumErrors(detail=error_message).stripe_client_error()
+
     async def create_customer(
         self,
         email: str,
     ) -> subscriptions.StripeCustomer:
-        try:
-            customer = stripe.Customer.create(email=email)
-        except stripe.error.StripeError as e:
-            raise await PelleumErrors(detail=str(e)).stripe_client_error()
-        return subscriptions.StripeCustomer(id=customer.id)
+        customer = await self.api_call(
+            method="POST", endpoint="/v1/customers", params={"email": email}
+        )
+        return subscriptions.StripeCustomer(id=customer["id"])
 
     async def create_subscription(
         self,
@@ -28,66 +134,69 @@ class StripeClient(IStripeClient):
         price_id: str,
         payment_behavior: str,
     ) -> subscriptions.StripeSubscription:
-        try:
-            subscription = stripe.Subscription.create(
-                customer=customer_id,
-                items=[
+        subscription = await self.api_call(
+            method="POST",
+            endpoint="/v1/subscriptions",
+            params={
+                "customer": customer_id,
+                "items": [
                     {
                         "price": price_id,
                     }
                 ],
-                payment_behavior=payment_behavior,
-                expand=["latest_invoice.payment_intent"],
-            )
-        except stripe.error.StripeError as e:
-            raise await PelleumErrors(detail=str(e)).stripe_client_error()
+                "payment_behavior": payment_behavior,
+                "expand": ["latest_invoice.payment_intent"],
+            },
+        )
         return subscriptions.StripeSubscription(
-            id=subscription.id,
-            client_secret=subscription.latest_invoice.payment_intent.client_secret,
+            id=subscription["id"],
+            client_secret=subscription["latest_invoice"]["payment_intent"][
+                "client_secret"
+            ],
         )
 
     async def delete_subscription(
         self,
         stripe_subscription_id: str,
     ) -> subscriptions.StripeSubscription:
-        try:
-            deletedSubscription = stripe.Subscription.delete(stripe_subscription_id)
-        except stripe.error.StripeError as e:
-            raise await PelleumErrors(detail=str(e)).stripe_client_error()
-        return subscriptions.StripeSubscription(id=deletedSubscription.id)
+        deleted_subscription = await self.api_call(
+            method="DELETE", endpoint=f"/v1/subscriptions/{stripe_subscription_id}"
+        )
+        return subscriptions.StripeSubscription(id=deleted_subscription["id"])
 
     async def construct_webhook_event(
         self,
         payload: Any,
         sig_header: str,
     ) -> subscriptions.WebhookEvent:
+        # Signature verification is local computation, so the SDK is fine here
         try:
             event = stripe.Webhook.construct_event(
                 payload=payload, sig_header=sig_header, secret=self.__webhook_secret
             )
         except stripe.error.StripeError as e:
             raise await PelleumErrors(detail=str(e)).stripe_client_error()
-        return subscriptions.WebhookEvent(data=event["data"], event_type=event["type"])
+        return subscriptions.WebhookEvent(
+            event_id=event["id"], data=event["data"], event_type=event["type"]
+        )
 
     async def retrieve_payment_intent(
         self,
         payment_intent_id: str,
     ) -> subscriptions.StripePaymentIntent:
-        try:
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-        except stripe.error.StripeError as e:
-            raise await PelleumErrors(detail=str(e)).stripe_client_error()
+        payment_intent = await self.api_call(
+            method="GET", endpoint=f"/v1/payment_intents/{payment_intent_id}"
+        )
         return subscriptions.StripePaymentIntent(
-            payment_method=payment_intent.payment_method
+            payment_method=payment_intent["payment_method"]
         )
 
     async def modify_subscription(
         self, stripe_subscription_id: str, default_payment_method: str
     ) -> subscriptions.StripeSubscription:
-        try:
-            subscription = stripe.Subscription.modify(
-                stripe_subscription_id, default_payment_method=default_payment_method
-            )
-        except stripe.error.StripeError as e:
-            raise await PelleumErrors(detail=str(e)).stripe_client_error()
-        return subscriptions.StripeSubscription(id=subscription.id)
+        subscription = await self.api_call(
+            method="POST",
+            endpoint=f"/v1/subscriptions/{stripe_subscription_id}",
+            params={"default_payment_method": default_payment_method},
+        )
+        return subscriptions.StripeSubscription(id=subscription["id"])
@@ -1,17 +1,37 @@
-import databases
-
 from app.dependencies import logger
+from app.infrastructure.db.instrumentation import InstrumentedDatabase
+from app.infrastructure.db.routing import RoutedDatabase
 from app.settings import settings
 
 DATABASE = None
 
 
+def create_database(url: str) -> InstrumentedDatabase:
+    return InstrumentedDatabase(
+        url,
+        min_size=settings.db_min_pool_size,
+        max_size=settings.db_max_pool_size,
+        command_timeout=settings.db_command_timeout,
+        statement_cache_size=settings.db_statement_cache_size,
+        max_queries=settings.db_max_queries,
+        max_inactive_connection_lifetime=settings.db_max_inactive_connection_lifetime,
+    )
+
+
 async def get_or_create_database():
     global DATABASE
     if DATABASE is not None:
         return DATABASE
 
-    DATABASE = databases.Database(settings.db_url, min_size=5)
+    DATABASE = create_database(settings.db_url)
+
+    # Replicas get their own pools; repos reach them through the routed database
+    if settings.db_replica_urls:
+        DATABASE = RoutedDatabase(
+            primary=DATABASE,
+            replicas=[create_database(url) for url in settings.db_replica_urls],
+            sticky_seconds=settings.db_replica_sticky_seconds,
+        )
 
     await DATABASE.connect()
     logger.info("Connected to Database!")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Table, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.expression import ClauseElement
+
+
+def build_counter_update(
+    table: Table, key_column: Column, key_value: int, counter: str, amount: int
+) -> ClauseElement:
+    """Builds a statement that adds amount to a counter column of a stats table.
+    Increments upsert the stats row, so rows only exist for records that have
+    been interacted with. Decrements never take a counter below zero."""
+
+    if amount > 0:
+        return (
+            insert(table)
+            .values({key_column.name: key_value, counter: amount})
+            .on_conflict_do_update(
+                index_elements=[key_column],
+                set_={counter: table.c[counter] + amount, "updated_at": func.now()},
+            )
+        )
+
+    return (
+        table.update()
+        .where(key_column == key_value)
+        .values({counter: func.greatest(table.c[counter] + amount, 0)})
+    )
@@ -0,0 +1,135 @@
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Iterable, List, Optional
+
+import databases
+
+from app.libraries.metrics import (
+    COUNT_BUCKETS,
+    LATENCY_BUCKETS,
+    HistogramFamily,
+    render_gauge,
+)
+
+POOL_ACQUIRE_SECONDS = HistogramFamily(
+    name="db_pool_acquire_seconds",
+    description="Time spent waiting for a pool connection, by repo method.",
+    label="method",
+    buckets=LATENCY_BUCKETS,
+)
+QUERY_SECONDS = HistogramFamily(
+    name="db_query_seconds",
+    description="Query latency once a connection is held, by repo method.",
+    label="method",
+    buckets=LATENCY_BUCKETS,
+)
+QUERIES_PER_REQUEST = HistogramFamily(
+    name="db_queries_per_request",
+    description="Number of queries issued while handling a request, by route.",
+    label="route",
+    buckets=COUNT_BUCKETS,
+)
+
+# A one-item list, so tasks spawned during the request add to the same count
+_request_query_count: ContextVar[Optional[List[int]]] = ContextVar(
+    "request_query_count", default=None
+)
+
+
+# Database wrappers, skipped over when looking for the code that issued a query
+_WRAPPER_MODULES = {__name__, "app.infrastructure.db.routing"}
+
+
+def _caller_label() -> str:
+    """Names the function that issued the query, e.g. user_repo.retrieve_block_data"""
+    frame = sys._getframe(1)  # pylint: disable = protected-access
+    while frame.f_back and frame.f_globals.get("__name__") in _WRAPPER_MODULES:
+        frame = frame.f_back
+
+    module = frame.f_globals.get("__name__", "")
+    return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+
+
+class InstrumentedDatabase(databases.Database):
+    """A Database that times pool acquisition and each query, labelled by the repo
+    method that issued it, and counts queries against the current request."""
+
+    async def _instrumented(
+        self, operation: str, query: Any, *args: Any, **kwargs: Any
+    ) -> Any:
+        label = _caller_label()
+        started_at = time.perf_counter()
+
+        async with self.connection() as connection:
+            acquired_at = time.perf_counter()
+            result = await getattr(connection, operation)(query, *args, **kwargs)
+
+        finished_at = time.perf_counter()
+        POOL_ACQUIRE_SECONDS.observe(label, acquired_at - started_at)
+        QUERY_SECONDS.observe(label, finished_at - acquired_at)
+
+        request_query_count = _request_query_count.get()
+        if request_query_count is not None:
+            request_query_count[0] += 1
+
+        return result
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._instrumented("fetch_all", query, values)
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._instrumented("fetch_one", query, values)
+
+    async def fetch_val(
+        self, query: Any, values: Optional[dict] = None, column: Any = 0
+    ) -> Any:
+        return await self._instrumented("fetch_val", query, values, column=column)
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._instrumented("execute", query, values)
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        return await self._instrumented("execute_many", query, values)
+
+    def pool_metrics(self) -> Iterable[str]:
+        """Gauges for the underlying asyncpg pool, when connected through one that
+        reports its size (asyncpg 0.25+)."""
+        pool = getattr(self._backend, "_pool", None)
+        if pool is None or not hasattr(pool, "get_size"):
+            return
+
+        yield from render_gauge(
+            "db_pool_size", "Connections currently open in the pool.", pool.get_size()
+        )
+        yield from render_gauge(
+            "db_pool_idle", "Open connections not checked out.", pool.get_idle_size()
+        )
+
+
+def start_request_query_count() -> Any:
+    """Starts counting queries for the current request. Returns a token for
+    finish_request_query_count."""
+    return _request_query_count.set([0])
+
+
+def finish_request_query_count(token: Any, route: str) -> None:
+    request_query_count = _request_query_count.get()
+    _request_query_count.reset(token)
+
+    if request_query_count is not None:
+        QUERIES_PER_REQUEST.observe(route, request_query_count[0])
+
+
+def render_metrics(database: Optional[InstrumentedDatabase]) -> str:
+    """All database metrics in the Prometheus text exposition format."""
+
+    lines = [
+        *POOL_ACQUIRE_SECONDS.render(),
+        *QUERY_SECONDS.render(),
+        *QUERIES_PER_REQUEST.render(),
+    ]
+    if database is not None:
+        lines.extend(database.pool_metrics())
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,20 @@
+from itertools import chain
+from typing import Iterable
+
+from sqlalchemy import Column, case, func, literal_column, null
+from sqlalchemy.sql.expression import ColumnElement
+
+
+def json_object(columns: Iterable[Column], key_column: Column) -> ColumnElement:
+    """json_build_object() over columns, keyed by column name, so a joined row comes
+    back as one JSON column instead of one column per field. NULL when key_column
+    is NULL, as it is when an outer join found no row."""
+
+    return case(
+        (key_column.is_(None), null()),
+        else_=func.json_build_object(
+            *chain.from_iterable(
+                (literal_column(f"'{column.name}'"), column) for column in columns
+            )
+        ),
+    )
@@ -39,7 +39,6 @@ NOTIFICATIONS = sa.Table(
         "user_to_notify",
         sa.Integer,
         sa.ForeignKey("users.user_id"),
-        index=True,
         nullable=False,
     ),
     sa.Column(
@@ -53,17 +52,44 @@ NOTIFICATIONS = sa.Table(
         "event_id",
         sa.Integer,
         sa.ForeignKey("events.event_id", ondelete="cascade"),
+        index=True,
         nullable=False,
     ),
     sa.Column("acknowledged", sa.Boolean, nullable=False, default=False),
-    sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    # Part of the primary key, as Postgres requires of the partition key. In UTC
+    # whatever the session's TimeZone, since the daily partitions are UTC days
+    sa.Column(
+        "created_at",
+        sa.DateTime,
+        primary_key=True,
+        nullable=False,
+        server_default=sa.func.timezone("utc", sa.func.now()),
+    ),
     sa.Column(
         "updated_at",
         sa.DateTime,
         nullable=False,
-        server_default=sa.func.now(),
-        onupdate=sa.func.now(),
+        server_default=sa.func.timezone("utc", sa.func.now()),
+        onupdate=sa.func.timezone("utc", sa.func.now()),
+    ),
+    # Serves the unread count, which only looks at unacknowledged notifications
+    sa.Index(
+        "ix_notifications_unacknowledged",
+        "user_to_notify",
+        "created_at",
+        postgresql_where=sa.text("NOT acknowledged"),
     ),
+    # One partition per day, so old notifications are dropped a partition at a time
+    # and reads of recent ones only touch the last few days
+    postgresql_partition_by="RANGE (created_at)",
+)
+
+# Serves retrieve_many, which reads a user's notifications newest first
+sa.Index(
+    "ix_notifications_user_to_notify_created_at",
+    NOTIFICATIONS.c.user_to_notify,
+    NOTIFICATIONS.c.created_at.desc(),
+    NOTIFICATIONS.c.notification_id.desc(),
 )
 
 
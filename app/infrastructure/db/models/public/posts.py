@@ -10,7 +10,6 @@ POSTS = sa.Table(
         "user_id",
         sa.Integer,
         sa.ForeignKey("users.user_id"),
-        index=True,
     ),
     sa.Column("username", sa.String, nullable=False, index=True),
     sa.Column(
@@ -22,10 +21,10 @@ POSTS = sa.Table(
     ),
     sa.Column("title", sa.String, nullable=True),
     sa.Column("content", sa.Text, nullable=False),
-    sa.Column("asset_symbol", sa.String, nullable=True, index=True),
+    sa.Column("asset_symbol", sa.String, nullable=True),
     sa.Column("sentiment", sa.String, nullable=True),
-    sa.Column("is_post_comment_on", sa.BigInteger, nullable=True, index=True),
-    sa.Column("is_thesis_comment_on", sa.BigInteger, nullable=True, index=True),
+    sa.Column("is_post_comment_on", sa.BigInteger, nullable=True),
+    sa.Column("is_thesis_comment_on", sa.BigInteger, nullable=True),
     sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
     sa.Column(
         "updated_at",
@@ -36,6 +35,37 @@ POSTS = sa.Table(
     ),
 )
 
+# Post lists filter on one of these columns and are ordered newest first, with
+# post_id breaking ties, so each index hands back a page already in order
+sa.Index("ix_posts_created_at", POSTS.c.created_at.desc(), POSTS.c.post_id.desc())
+sa.Index(
+    "ix_posts_user_id_created_at",
+    POSTS.c.user_id,
+    POSTS.c.created_at.desc(),
+    POSTS.c.post_id.desc(),
+)
+sa.Index(
+    "ix_posts_asset_symbol_created_at",
+    POSTS.c.asset_symbol,
+    POSTS.c.created_at.desc(),
+    POSTS.c.post_id.desc(),
+)
+# Most posts aren't comments, so these only cover the ones that are
+sa.Index(
+    "ix_posts_is_post_comment_on_created_at",
+    POSTS.c.is_post_comment_on,
+    POSTS.c.created_at.desc(),
+    POSTS.c.post_id.desc(),
+    postgresql_where=POSTS.c.is_post_comment_on.isnot(None),
+)
+sa.Index(
+    "ix_posts_is_thesis_comment_on_created_at",
+    POSTS.c.is_thesis_comment_on,
+    POSTS.c.created_at.desc(),
+    POSTS.c.post_id.desc(),
+    postgresql_where=POSTS.c.is_thesis_comment_on.isnot(None),
+)
+
 POST_REACTIONS = sa.Table(
     "post_reactions",
     METADATA,
@@ -63,3 +93,24 @@ POST_REACTIONS = sa.Table(
         onupdate=sa.func.now(),
     ),
 )
+
+# Denormalized counters, kept in sync by the posts and post reactions repos
+POST_STATS = sa.Table(
+    "post_stats",
+    METADATA,
+    sa.Column(
+        "post_id",
+        sa.BigInteger,
+        sa.ForeignKey("posts.post_id", ondelete="cascade"),
+        primary_key=True,
+    ),
+    sa.Column("like_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+    sa.Column("comment_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+    sa.Column(
+        "updated_at",
+        sa.DateTime,
+        nullable=False,
+        server_default=sa.func.now(),
+        onupdate=sa.func.now(),
+    ),
+)
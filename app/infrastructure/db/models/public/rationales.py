@@ -10,14 +10,12 @@ RATIONALES = sa.Table(
         "thesis_id",
         sa.BigInteger,
         sa.ForeignKey("theses.thesis_id", ondelete="cascade"),
-        index=True,
         nullable=False,
     ),
     sa.Column(
         "user_id",
         sa.Integer,
         sa.ForeignKey("users.user_id"),
-        index=True,
         nullable=False,
     ),
     sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
@@ -31,3 +29,17 @@ RATIONALES = sa.Table(
 )
 
 sa.UniqueConstraint(RATIONALES.c.thesis_id, RATIONALES.c.user_id)
+
+# Rationale lists filter on one of these columns and are ordered newest first
+sa.Index(
+    "ix_rationales_thesis_id_created_at",
+    RATIONALES.c.thesis_id,
+    RATIONALES.c.created_at.desc(),
+    RATIONALES.c.rationale_id.desc(),
+)
+sa.Index(
+    "ix_rationales_user_id_created_at",
+    RATIONALES.c.user_id,
+    RATIONALES.c.created_at.desc(),
+    RATIONALES.c.rationale_id.desc(),
+)
@@ -1,4 +1,5 @@
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.infrastructure.db.metadata import METADATA
 
@@ -32,3 +33,29 @@ SUBSCRIPTIONS = sa.Table(
         onupdate=sa.func.now(),
     ),
 )
+
+# Verified Stripe webhook events, queued for the background worker
+STRIPE_EVENTS = sa.Table(
+    "stripe_events",
+    METADATA,
+    sa.Column("event_id", sa.String, primary_key=True),
+    sa.Column("event_type", sa.String, nullable=False),
+    sa.Column("stripe_subscription_id", sa.String, nullable=True),
+    sa.Column("data", JSONB, nullable=False),
+    sa.Column("attempts", sa.Integer, nullable=False, server_default=sa.text("0")),
+    sa.Column("last_error", sa.Text, nullable=True),
+    sa.Column("locked_until", sa.DateTime, nullable=True),
+    sa.Column("processed_at", sa.DateTime, nullable=True),
+    sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    # Serves the worker's scan for unprocessed events in arrival order
+    sa.Index(
+        "ix_stripe_events_unprocessed",
+        "created_at",
+        postgresql_where=sa.text("processed_at IS NULL"),
+    ),
+    sa.Index(
+        "ix_stripe_events_stripe_subscription_id_created_at",
+        "stripe_subscription_id",
+        "created_at",
+    ),
+)
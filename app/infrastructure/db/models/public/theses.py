@@ -10,13 +10,12 @@ THESES = sa.Table(
         "user_id",
         sa.Integer,
         sa.ForeignKey("users.user_id"),
-        index=True,
     ),
     sa.Column("username", sa.String, nullable=False, index=True),
     sa.Column("title", sa.String, nullable=False),
     sa.Column("content", sa.Text, nullable=False),
     sa.Column("sources", sa.ARRAY(sa.String), nullable=True),
-    sa.Column("asset_symbol", sa.String, nullable=False, index=True),
+    sa.Column("asset_symbol", sa.String, nullable=False),
     sa.Column("sentiment", sa.String, nullable=False),
     sa.Column("is_authors_current", sa.Boolean, nullable=False, default=True),
     sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
@@ -29,6 +28,22 @@ THESES = sa.Table(
     ),
 )
 
+# Thesis lists filter on one of these columns and are ordered newest first, with
+# thesis_id breaking ties, so each index hands back a page already in order
+sa.Index("ix_theses_created_at", THESES.c.created_at.desc(), THESES.c.thesis_id.desc())
+sa.Index(
+    "ix_theses_user_id_created_at",
+    THESES.c.user_id,
+    THESES.c.created_at.desc(),
+    THESES.c.thesis_id.desc(),
+)
+sa.Index(
+    "ix_theses_asset_symbol_created_at",
+    THESES.c.asset_symbol,
+    THESES.c.created_at.desc(),
+    THESES.c.thesis_id.desc(),
+)
+
 THESES_REACTIONS = sa.Table(
     "theses_reactions",
     METADATA,
@@ -58,3 +73,25 @@ THESES_REACTIONS = sa.Table(
 )
 
 sa.UniqueConstraint(THESES.c.user_id, THESES.c.title)
+
+# Denormalized counters, kept in sync by the thesis reactions and rationales repos
+THESIS_STATS = sa.Table(
+    "thesis_stats",
+    METADATA,
+    sa.Column(
+        "thesis_id",
+        sa.BigInteger,
+        sa.ForeignKey("theses.thesis_id", ondelete="cascade"),
+        primary_key=True,
+    ),
+    sa.Column("like_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+    sa.Column("dislike_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+    sa.Column("save_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+    sa.Column(
+        "updated_at",
+        sa.DateTime,
+        nullable=False,
+        server_default=sa.func.now(),
+        onupdate=sa.func.now(),
+    ),
+)
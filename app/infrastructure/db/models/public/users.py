@@ -42,3 +42,10 @@ BLOCKS = sa.Table(
     ),
     sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
 )
+
+# The primary key serves lookups by user_id. This serves the reverse direction,
+# the users who have blocked someone, and holds both columns so neither direction
+# has to visit the table.
+sa.Index(
+    "ix_blocks_blocked_user_id_user_id", BLOCKS.c.blocked_user_id, BLOCKS.c.user_id
+)
@@ -0,0 +1,61 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Integer, bindparam, desc, tuple_
+from sqlalchemy.sql import Select
+
+from app.usecases.schemas.request_pagination import Cursor
+
+
+def paginate_query(
+    query: Select,
+    created_at_column: Column,
+    id_column: Column,
+    page_number: int,
+    page_size: int,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    """Orders a query newest first and limits it to one page. With a cursor, the page
+    starts right after the cursor's (created_at, id) key, so deep pages cost the same
+    as the first. Without one, it falls back to OFFSET pagination."""
+
+    query = query.order_by(desc(created_at_column), desc(id_column)).limit(page_size)
+
+    if cursor:
+        return query.where(
+            tuple_(created_at_column, id_column)
+            < tuple_(cursor.created_at, cursor.record_id)
+        )
+
+    return query.offset((page_number - 1) * page_size)
+
+
+def paginate_statement(
+    query: Select, created_at_column: Column, id_column: Column, keyset: bool
+) -> Select:
+    """paginate_query with bound parameters in place of the page values, so the
+    statement can be compiled once and cached. Bind them with pagination_values()."""
+
+    query = query.order_by(desc(created_at_column), desc(id_column)).limit(
+        bindparam("page_limit", type_=Integer)
+    )
+
+    if keyset:
+        return query.where(
+            tuple_(created_at_column, id_column)
+            < tuple_(bindparam("cursor_created_at"), bindparam("cursor_record_id"))
+        )
+
+    return query.offset(bindparam("page_offset", type_=Integer))
+
+
+def pagination_values(
+    page_number: int, page_size: int, cursor: Optional[Cursor] = None
+) -> Dict[str, Any]:
+    if cursor:
+        return {
+            "page_limit": page_size,
+            "cursor_created_at": cursor.created_at,
+            "cursor_record_id": cursor.record_id,
+        }
+
+    return {"page_limit": page_size, "page_offset": (page_number - 1) * page_size}
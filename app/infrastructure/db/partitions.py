@@ -0,0 +1,113 @@
+import asyncio
+from datetime import date, timedelta
+from typing import List
+
+import asyncpg
+from databases import Database
+
+ONE_DAY = timedelta(days=1)
+
+# How long detaching a partition waits for its lock on the parent table, and how
+# many times it tries before leaving the partition for the next run
+DETACH_LOCK_TIMEOUT = "2s"
+DETACH_ATTEMPTS = 3
+
+
+def daily_partition_name(table_name: str, day: date) -> str:
+    """e.g. notifications_p20220502 for the rows of May 2nd"""
+    return f"{table_name}_p{day:%Y%m%d}"
+
+
+async def create_daily_partitions(
+    db: Database, table_name: str, first_day: date, days: int
+) -> List[str]:
+    """Creates the partitions of a table range partitioned by day, for first_day
+    and the days after it, skipping ones that already exist. Also skips days that
+    already have rows in the default partition, which Postgres won't move out; those
+    rows stay where they are until they expire."""
+
+    created_partitions = []
+    for day in (first_day + ONE_DAY * offset for offset in range(days)):
+        partition_name = daily_partition_name(table_name, day)
+        # Dates render as plain YYYY-MM-DD, so they're safe to inline in DDL
+        try:
+            await db.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF "
+                f"{table_name} FOR VALUES FROM ('{day.isoformat()}') "
+                f"TO ('{(day + ONE_DAY).isoformat()}')"
+            )
+        except asyncpg.exceptions.CheckViolationError:
+            continue
+        created_partitions.append(partition_name)
+
+    return created_partitions
+
+
+async def _detach_partition(db: Database, table_name: str, partition_name: str) -> bool:
+    """Detaches a partition from its table, giving up if the lock on the table
+    isn't granted after DETACH_ATTEMPTS tries of DETACH_LOCK_TIMEOUT each."""
+
+    for attempt in range(DETACH_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(attempt)
+        try:
+            async with db.transaction():
+                await db.execute(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'")
+                await db.execute(
+                    f"ALTER TABLE {table_name} DETACH PARTITION {partition_name}"
+                )
+            return True
+        except asyncpg.exceptions.LockNotAvailableError:
+            continue
+
+    return False
+
+
+async def drop_daily_partitions(
+    db: Database, table_name: str, before: date
+) -> List[str]:
+    """Drops the daily partitions of a table that only hold rows from before the
+    given day. Other partitions, like the default one, are left alone.
+
+    Detaching a partition takes an ACCESS EXCLUSIVE lock on the whole table, which
+    blocks every read and write of it until the detach commits. So each partition
+    is detached on its own, in a transaction with a short lock_timeout, rather than
+    queueing behind a long query with everything else queued behind it. Only then
+    is it dropped, which just locks the detached table. Partitions whose detach
+    times out are left for the next run. DETACH ... CONCURRENTLY would avoid the
+    lock, but needs Postgres 14 and a table without a default partition."""
+
+    # Tables named like daily partitions, attached or left detached by a past run
+    partitions = await db.fetch_all(
+        query="""
+        SELECT relname AS partition_name, relispartition AS is_attached
+        FROM pg_class
+        WHERE relkind = 'r' AND relname LIKE :pattern AND pg_table_is_visible(oid)
+        """,
+        values={"pattern": f"{table_name}_p%"},
+    )
+
+    prefix = f"{table_name}_p"
+    last_partition_name = daily_partition_name(table_name, before - ONE_DAY)
+
+    dropped_partitions = []
+    for record in partitions:
+        partition_name = record["partition_name"]
+        # Names sort by day, since the day is zero padded
+        if not (
+            partition_name.startswith(prefix)
+            and len(partition_name) == len(last_partition_name)
+            and partition_name[len(prefix) :].isdigit()
+            and partition_name <= last_partition_name
+        ):
+            continue
+
+        if record["is_attached"] and not await _detach_partition(
+            db=db, table_name=table_name, partition_name=partition_name
+        ):
+            continue
+
+        await db.execute(f"DROP TABLE {partition_name}")
+        dropped_partitions.append(partition_name)
+
+    return dropped_partitions
@@ -0,0 +1,97 @@
+import json
+from typing import Callable, Hashable, List, Mapping, Optional
+
+from databases import Database
+from sqlalchemy import and_, func, literal_column, select
+from sqlalchemy.sql import FromClause, Select
+from sqlalchemy.sql.expression import ClauseElement
+
+from app.infrastructure.db.statement_cache import (
+    CompiledStatement,
+    StatementCache,
+    compile_statement,
+)
+from app.libraries.ttl_cache import TTLCache
+from app.usecases.schemas.request_pagination import CountType, RecordCount
+
+# Seconds a total count is reused for before it is recomputed
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+# Above this many planned rows, the planner's estimate is returned instead of
+# running an exact COUNT(*)
+ESTIMATE_THRESHOLD = 10000
+
+_count_cache = TTLCache(ttl=COUNT_CACHE_TTL, max_entries=COUNT_CACHE_MAX_ENTRIES)
+_count_statements = StatementCache()
+
+
+def _rows_query(from_clause: FromClause, conditions: List[ClauseElement]) -> Select:
+    query = select([literal_column("1")]).select_from(from_clause)
+    return query.where(and_(*conditions)) if conditions else query
+
+
+def _count_query(from_clause: FromClause, conditions: List[ClauseElement]) -> Select:
+    query = select([func.count()]).select_from(from_clause)
+    return query.where(and_(*conditions)) if conditions else query
+
+
+def _compiled(
+    build: Callable[[FromClause, List[ClauseElement]], Select],
+    from_clause: FromClause,
+    conditions: List[ClauseElement],
+    statement_key: Optional[Hashable],
+) -> CompiledStatement:
+    if statement_key is None:
+        return compile_statement(build(from_clause, conditions))
+
+    return _count_statements.get(
+        (build.__name__, statement_key), lambda: build(from_clause, conditions)
+    )
+
+
+async def count_records(
+    db: Database,
+    from_clause: FromClause,
+    conditions: List[ClauseElement],
+    values: Optional[Mapping] = None,
+    statement_key: Optional[Hashable] = None,
+) -> RecordCount:
+    """Counts the records a list query matches. Large result sets get the planner's
+    row estimate from EXPLAIN instead of a full COUNT(*) scan, and either kind of
+    count is cached for a short time per query.
+
+    Conditions written with bindparam() get their values from values. Passing a
+    statement_key that names the shape of the conditions compiles the count
+    statements once per shape."""
+
+    rows_statement = _compiled(_rows_query, from_clause, conditions, statement_key)
+    rows_values = rows_statement.bind(values or {})
+    cache_key = rows_statement.sql + repr(sorted(rows_values.items()))
+
+    cached_count = _count_cache.get(cache_key)
+    if cached_count:
+        return cached_count
+
+    query_plan = await db.fetch_val(
+        query=f"EXPLAIN (FORMAT JSON) {rows_statement.sql}", values=rows_values
+    )
+    if isinstance(query_plan, str):
+        query_plan = json.loads(query_plan)
+    estimated_rows = int(query_plan[0]["Plan"]["Plan Rows"])
+
+    if estimated_rows > ESTIMATE_THRESHOLD:
+        record_count = RecordCount(total=estimated_rows, type=CountType.ESTIMATE)
+    else:
+        count_statement = _compiled(
+            _count_query, from_clause, conditions, statement_key
+        )
+        record_count = RecordCount(
+            total=await db.fetch_val(
+                query=count_statement.sql, values=count_statement.bind(values or {})
+            ),
+            type=CountType.EXACT,
+        )
+
+    _count_cache.set(cache_key, record_count)
+    return record_count
@@ -1,13 +1,177 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional
 
 from databases import Database
-from sqlalchemy import and_, desc, select
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    false,
+    func,
+    not_,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app.infrastructure.db.models.public.notifications import EVENTS, NOTIFICATIONS
 from app.infrastructure.db.models.public.users import USERS
+from app.infrastructure.db.pagination import paginate_query
+from app.infrastructure.db.partitions import (
+    create_daily_partitions,
+    drop_daily_partitions,
+)
+from app.infrastructure.db.statement_cache import compile_statement
 from app.usecases.interfaces.notifications_repo import INotificationsRepo
 from app.usecases.schemas import notifications
+from app.usecases.schemas.request_pagination import Cursor
+
+# Notifications older than this are no longer shown
+NOTIFICATION_LIFETIME = timedelta(days=5)
+
+# Repeat reactions from the same user to the same post or thesis within this window
+# don't notify again, so reacting and unreacting over and over adds no rows
+REACTION_COLLAPSE_WINDOW = timedelta(hours=1)
+
+NEW_EVENT_FIELDS = (
+    "type",
+    "affected_post_id",
+    "affected_thesis_id",
+    "comment_id",
+    "user_to_notify",
+    "user_who_fired_event",
+)
+
+
+def _build_create_query() -> Any:
+    """Inserts a batch of events and their notifications in one statement:
+
+    WITH new_notifications AS (
+        SELECT nextval(...) AS event_id, new_row.* FROM unnest(:types, ...) AS new_row
+        WHERE <not a repeat reaction>
+    ), new_events AS (INSERT INTO events ... SELECT ... FROM new_notifications)
+    INSERT INTO notifications ... SELECT ... FROM new_events JOIN new_notifications
+
+    Event ids are drawn up front, so each notification knows its event without a
+    round trip for the id INSERT ... RETURNING would give back."""
+
+    new_row = (
+        func.unnest(
+            cast(bindparam("types"), ARRAY(String)),
+            cast(bindparam("affected_post_ids"), ARRAY(Integer)),
+            cast(bindparam("affected_thesis_ids"), ARRAY(Integer)),
+            cast(bindparam("comment_ids"), ARRAY(Integer)),
+            cast(bindparam("users_to_notify"), ARRAY(Integer)),
+            cast(bindparam("users_who_fired_event"), ARRAY(Integer)),
+        )
+        .table_valued(*NEW_EVENT_FIELDS)
+        .render_derived()
+        .alias("new_row")
+    )
+
+    is_repeat_reaction = exists().where(
+        and_(
+            NOTIFICATIONS.c.event_id == EVENTS.c.event_id,
+            NOTIFICATIONS.c.user_to_notify == new_row.c.user_to_notify,
+            NOTIFICATIONS.c.user_who_fired_event == new_row.c.user_who_fired_event,
+            NOTIFICATIONS.c.created_at > bindparam("collapse_after"),
+            EVENTS.c.type == new_row.c.type,
+            EVENTS.c.affected_post_id.is_not_distinct_from(new_row.c.affected_post_id),
+            EVENTS.c.affected_thesis_id.is_not_distinct_from(
+                new_row.c.affected_thesis_id
+            ),
+        )
+    )
+
+    new_notifications = (
+        select(
+            [
+                func.nextval(func.pg_get_serial_sequence("events", "event_id")).label(
+                    "event_id"
+                ),
+                new_row,
+            ]
+        )
+        .where(
+            or_(
+                new_row.c.type == notifications.EventType.COMMENT.value,
+                not_(is_repeat_reaction),
+            )
+        )
+        .cte("new_notifications")
+    )
+
+    event_columns = [
+        "event_id",
+        "type",
+        "affected_post_id",
+        "affected_thesis_id",
+        "comment_id",
+    ]
+    new_events = (
+        EVENTS.insert()
+        .from_select(
+            event_columns,
+            select([new_notifications.c[column] for column in event_columns]),
+        )
+        .returning(EVENTS.c.event_id)
+        .cte("new_events")
+    )
+
+    return NOTIFICATIONS.insert().from_select(
+        ["user_to_notify", "user_who_fired_event", "event_id", "acknowledged"],
+        select(
+            [
+                new_notifications.c.user_to_notify,
+                new_notifications.c.user_who_fired_event,
+                new_events.c.event_id,
+                false(),
+            ]
+        ).select_from(
+            new_events.join(
+                new_notifications,
+                new_events.c.event_id == new_notifications.c.event_id,
+            )
+        ),
+    )
+
+
+_CREATE_STATEMENT = compile_statement(_build_create_query())
+
+
+def _create_values(
+    new_events: List[notifications.NewEventRepoAdapter],
+) -> Dict[str, Any]:
+    """The batch as one array per column, with exact duplicates dropped"""
+
+    rows = list(
+        dict.fromkeys(
+            tuple(getattr(new_event, field) for field in NEW_EVENT_FIELDS)
+            for new_event in new_events
+        )
+    )
+    (
+        types,
+        affected_post_ids,
+        affected_thesis_ids,
+        comment_ids,
+        users_to_notify,
+        users_who_fired_event,
+    ) = (list(column) for column in zip(*rows))
+
+    return {
+        "types": [event_type.value for event_type in types],
+        "affected_post_ids": affected_post_ids,
+        "affected_thesis_ids": affected_thesis_ids,
+        "comment_ids": comment_ids,
+        "users_to_notify": users_to_notify,
+        "users_who_fired_event": users_who_fired_event,
+        "collapse_after": datetime.utcnow() - REACTION_COLLAPSE_WINDOW,
+    }
 
 
 class NotificationsRepo(INotificationsRepo):
@@ -17,25 +181,21 @@ class NotificationsRepo(INotificationsRepo):
     async def create(self, new_event: notifications.NewEventRepoAdapter) -> None:
         """Create reaction"""
 
-        event_insert_statement = EVENTS.insert().values(
-            type=new_event.type,
-            affected_post_id=new_event.affected_post_id,
-            affected_thesis_id=new_event.affected_thesis_id,
-            comment_id=new_event.comment_id,
-        )
-
-        async with self.db.transaction():
+        await self.create_many(new_events=[new_event])
 
-            event_id = await self.db.execute(event_insert_statement)
+    async def create_many(
+        self, new_events: List[notifications.NewEventRepoAdapter]
+    ) -> None:
+        """Creates events and their notifications in a single statement. Repeat
+        reactions within REACTION_COLLAPSE_WINDOW are skipped."""
 
-            notification_insert_statement = NOTIFICATIONS.insert().values(
-                user_to_notify=new_event.user_to_notify,
-                user_who_fired_event=new_event.user_who_fired_event,
-                event_id=event_id,
-                acknowledged=False,
-            )
+        if not new_events:
+            return
 
-            await self.db.execute(notification_insert_statement)
+        await self.db.execute(
+            query=_CREATE_STATEMENT.sql,
+            values=_CREATE_STATEMENT.bind(_create_values(new_events)),
+        )
 
     async def update(self, notification_id: int) -> None:
         """Update notification acknowledgement."""
@@ -53,6 +213,7 @@ class NotificationsRepo(INotificationsRepo):
         user_id: int,
         page_number: int = 1,
         page_size: int = 200,
+        cursor: Optional[Cursor] = None,
     ) -> List[notifications.NotificationDbInfo]:
         """Retrieve many reactions"""
 
@@ -63,6 +224,7 @@ class NotificationsRepo(INotificationsRepo):
         columns_to_select = [
             NOTIFICATIONS.c.notification_id,
             NOTIFICATIONS.c.acknowledged,
+            NOTIFICATIONS.c.created_at,
             EVENTS,
             USERS.c.username,
             USERS.c.user_id,
@@ -73,19 +235,48 @@ class NotificationsRepo(INotificationsRepo):
             .select_from(j)
             .where(
                 and_(
-                    NOTIFICATIONS.c.created_at > datetime.utcnow() - timedelta(days=5),
+                    NOTIFICATIONS.c.created_at
+                    > datetime.utcnow() - NOTIFICATION_LIFETIME,
                     NOTIFICATIONS.c.user_to_notify == user_id,
                 )
             )
-            .limit(page_size)
-            .offset((page_number - 1) * page_size)
-            .order_by(desc(NOTIFICATIONS.c.created_at))
+        )
+
+        query = paginate_query(
+            query=query,
+            created_at_column=NOTIFICATIONS.c.created_at,
+            id_column=NOTIFICATIONS.c.notification_id,
+            page_number=page_number,
+            page_size=page_size,
+            cursor=cursor,
         )
 
         query_results = await self.db.fetch_all(query)
 
         return [notifications.NotificationDbInfo(**result) for result in query_results]
 
+    async def retrieve_unread(self, user_id: int) -> notifications.UnreadNotifications:
+        """Counts a user's unacknowledged notifications, over the same period that
+        retrieve_many shows. Served by the partial index on unacknowledged ones."""
+
+        query = select(
+            [
+                func.count().label("unread_count"),
+                func.max(NOTIFICATIONS.c.notification_id).label(
+                    "latest_notification_id"
+                ),
+            ]
+        ).where(
+            and_(
+                NOTIFICATIONS.c.user_to_notify == user_id,
+                not_(NOTIFICATIONS.c.acknowledged),
+                NOTIFICATIONS.c.created_at > datetime.utcnow() - NOTIFICATION_LIFETIME,
+            )
+        )
+
+        result = await self.db.fetch_one(query)
+        return notifications.UnreadNotifications(**result)
+
     async def retrieve_single(
         self,
         notification_id: int,
@@ -98,3 +289,35 @@ class NotificationsRepo(INotificationsRepo):
 
         result = await self.db.fetch_one(query)
         return notifications.NotificationInDb(**result) if result else None
+
+    async def maintain_partitions(self, retention_days: int, premake_days: int) -> None:
+        """Creates the daily notifications partitions for today and the next
+        premake_days, then drops notifications older than retention_days, along
+        with their events."""
+
+        today = datetime.utcnow().date()
+        cutoff = today - timedelta(days=retention_days)
+
+        await create_daily_partitions(
+            db=self.db,
+            table_name=NOTIFICATIONS.name,
+            first_day=today,
+            days=premake_days + 1,
+        )
+        await drop_daily_partitions(
+            db=self.db, table_name=NOTIFICATIONS.name, before=cutoff
+        )
+
+        # Rows that landed in the default partition, while no daily one existed
+        await self.db.execute(
+            delete(NOTIFICATIONS).where(
+                NOTIFICATIONS.c.created_at < datetime.combine(cutoff, time())
+            )
+        )
+
+        # Every event has its own notification, so ones without are left over
+        await self.db.execute(
+            delete(EVENTS).where(
+                not_(exists().where(NOTIFICATIONS.c.event_id == EVENTS.c.event_id))
+            )
+        )
@@ -1,13 +1,17 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import asyncpg
 from databases import Database
-from sqlalchemy import and_, between, delete, desc, func, select
+from sqlalchemy import and_, between, delete, select
 
-from app.infrastructure.db.models.public.posts import POST_REACTIONS, POSTS
+from app.infrastructure.db.counters import build_counter_update
+from app.infrastructure.db.models.public.posts import POST_REACTIONS, POST_STATS, POSTS
+from app.infrastructure.db.pagination import paginate_query
+from app.infrastructure.db.record_counts import count_records
 from app.libraries import pelleum_errors
 from app.usecases.interfaces.post_reaction_repo import IPostReactionRepo
 from app.usecases.schemas import post_reactions
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
 
 
 class PostReactionRepo(IPostReactionRepo):
@@ -26,7 +30,17 @@ class PostReactionRepo(IPostReactionRepo):
         )
 
         try:
-            await self.db.execute(insert_statement)
+            async with self.db.transaction():
+                await self.db.execute(insert_statement)
+                await self.db.execute(
+                    build_counter_update(
+                        table=POST_STATS,
+                        key_column=POST_STATS.c.post_id,
+                        key_value=post_reaction.post_id,
+                        counter="like_count",
+                        amount=1,
+                    )
+                )
         except asyncpg.exceptions.UniqueViolationError:
             raise await pelleum_errors.PelleumErrors(
                 detail="User has already liked this post."
@@ -35,21 +49,39 @@ class PostReactionRepo(IPostReactionRepo):
     async def delete(self, post_id: int, user_id: int) -> None:
         """Delete reaction"""
 
-        delete_statement = delete(POST_REACTIONS).where(
-            and_(
-                POST_REACTIONS.c.user_id == user_id,
-                POST_REACTIONS.c.post_id == post_id,
+        delete_statement = (
+            delete(POST_REACTIONS)
+            .where(
+                and_(
+                    POST_REACTIONS.c.user_id == user_id,
+                    POST_REACTIONS.c.post_id == post_id,
+                )
             )
+            .returning(POST_REACTIONS.c.post_id)
         )
 
-        await self.db.execute(delete_statement)
+        async with self.db.transaction():
+            deleted_post_id = await self.db.execute(delete_statement)
+
+            if deleted_post_id:
+                await self.db.execute(
+                    build_counter_update(
+                        table=POST_STATS,
+                        key_column=POST_STATS.c.post_id,
+                        key_value=deleted_post_id,
+                        counter="like_count",
+                        amount=-1,
+                    )
+                )
 
     async def retrieve_many_with_filter(
         self,
         query_params: post_reactions.PostsReactionsQueryParams,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[post_reactions.PostReactionInDB], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[post_reactions.PostReactionInDB], Optional[RecordCount]]:
         """Retrieve many reactions"""
 
         conditions = []
@@ -79,24 +111,34 @@ class PostReactionRepo(IPostReactionRepo):
 
         j = POST_REACTIONS.join(POSTS, POST_REACTIONS.c.post_id == POSTS.c.post_id)
 
-        query = (
-            select([POST_REACTIONS])
-            .select_from(j)
-            .where(and_(*conditions))
-            .limit(page_size)
-            .offset((page_number - 1) * page_size)
-            .order_by(desc(POST_REACTIONS.c.created_at))
+        # Reactions are unique per (user, post), so the key's id is whichever side
+        # of that pair the query doesn't pin down
+        id_column = (
+            POST_REACTIONS.c.user_id
+            if query_params.post_id
+            else POST_REACTIONS.c.post_id
         )
 
-        query_count = select([func.count()]).select_from(j).where(and_(*conditions))
+        query = select([POST_REACTIONS]).select_from(j).where(and_(*conditions))
 
-        async with self.db.transaction():
-            query_results = await self.db.fetch_all(query)
-            count_results = await self.db.fetch_all(query_count)
+        query = paginate_query(
+            query=query,
+            created_at_column=POST_REACTIONS.c.created_at,
+            id_column=id_column,
+            page_number=page_number,
+            page_size=page_size,
+            cursor=cursor,
+        )
+
+        query_results = await self.db.fetch_all(query)
 
         posts_reactions_list = [
             post_reactions.PostReactionInDB(**result) for result in query_results
         ]
-        posts_reactions_count = count_results[0][0]
+        posts_reactions_count = (
+            await count_records(db=self.db, from_clause=j, conditions=conditions)
+            if include_total
+            else None
+        )
 
         return posts_reactions_list, posts_reactions_count
@@ -1,12 +1,79 @@
-from typing import List, Optional, Tuple
+from typing import AbstractSet, Any, Dict, List, Optional, Tuple
 
 from databases import Database
-from sqlalchemy import and_, delete, desc, func, select
+from sqlalchemy import all_, and_, bindparam, delete, desc, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Join, Select
 
-from app.infrastructure.db.models.public.posts import POST_REACTIONS, POSTS
+from app.infrastructure.db.counters import build_counter_update
+from app.infrastructure.db.json_objects import json_object
+from app.infrastructure.db.models.public.posts import POST_REACTIONS, POST_STATS, POSTS
 from app.infrastructure.db.models.public.theses import THESES
+from app.infrastructure.db.pagination import paginate_statement, pagination_values
+from app.infrastructure.db.record_counts import count_records
+from app.infrastructure.db.statement_cache import StatementCache
 from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.schemas import posts
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
+
+# Maximum amount of replies loaded per parent, for each level of a comment tree
+REPLY_LIMITS_PER_LEVEL = (15, 5, 5)
+
+# Columns for PostInfoFromDB, with the thesis a post is on as one JSON column
+POST_INFO_COLUMNS = [
+    POSTS,
+    POST_REACTIONS.c.reaction.label("user_reaction_value"),
+    func.coalesce(POST_STATS.c.like_count, 0).label("like_count"),
+    func.coalesce(POST_STATS.c.comment_count, 0).label("comment_count"),
+    json_object(THESES.columns, key_column=THESES.c.thesis_id).label("thesis_json"),
+]
+
+# List filters by name, each bound to a parameter of the same name
+POST_LIST_FILTERS = {
+    "user_id": POSTS.c.user_id == bindparam("user_id"),
+    "excluded_user_ids": POSTS.c.user_id != all_(bindparam("excluded_user_ids")),
+    "asset_symbol": POSTS.c.asset_symbol == bindparam("asset_symbol"),
+    "sentiment": POSTS.c.sentiment == bindparam("sentiment"),
+    "is_post_comment_on": POSTS.c.is_post_comment_on == bindparam("is_post_comment_on"),
+    "is_thesis_comment_on": POSTS.c.is_thesis_comment_on
+    == bindparam("is_thesis_comment_on"),
+}
+
+
+def _post_info_join(requesting_user_id: Any) -> Join:
+    return (
+        POSTS.join(
+            THESES,
+            POSTS.c.thesis_id == THESES.c.thesis_id,
+            isouter=True,
+        )
+        .join(
+            POST_REACTIONS,
+            and_(
+                POSTS.c.post_id == POST_REACTIONS.c.post_id,
+                POST_REACTIONS.c.user_id == requesting_user_id,
+            ),
+            isouter=True,
+        )
+        .join(POST_STATS, POSTS.c.post_id == POST_STATS.c.post_id, isouter=True)
+    )
+
+
+_LIST_JOIN = _post_info_join(requesting_user_id=bindparam("requesting_user_id"))
+_list_statements = StatementCache()
+
+
+def _build_list_query(filter_names: Tuple[str, ...], keyset: bool) -> Select:
+    query = select(POST_INFO_COLUMNS).select_from(_LIST_JOIN)
+    if filter_names:
+        query = query.where(and_(*[POST_LIST_FILTERS[name] for name in filter_names]))
+
+    return paginate_statement(
+        query=query,
+        created_at_column=POSTS.c.created_at,
+        id_column=POSTS.c.post_id,
+        keyset=keyset,
+    )
 
 
 class PostsRepo(IPostsRepo):
@@ -27,7 +94,21 @@ class PostsRepo(IPostsRepo):
             is_post_comment_on=new_post.is_post_comment_on,
             is_thesis_comment_on=new_post.is_thesis_comment_on,
         )
-        post_id = await self.db.execute(create_post_insert_stmt)
+
+        async with self.db.transaction():
+            post_id = await self.db.execute(create_post_insert_stmt)
+
+            if new_post.is_post_comment_on:
+                await self.db.execute(
+                    build_counter_update(
+                        table=POST_STATS,
+                        key_column=POST_STATS.c.post_id,
+                        key_value=new_post.is_post_comment_on,
+                        counter="comment_count",
+                        amount=1,
+                    )
+                )
+
         return await self.retrieve_post_with_filter(post_id=post_id)
 
     async def retrieve_post_with_filter(
@@ -55,150 +136,224 @@ class PostsRepo(IPostsRepo):
                 "Please pass a condition parameter to query by to the function, retrieve_post_with_filter()"
             )
 
-        j = POSTS.join(
-            THESES,
-            POSTS.c.thesis_id == THESES.c.thesis_id,
-            isouter=True,
-        ).join(
-            POST_REACTIONS,
-            and_(
-                POSTS.c.post_id == POST_REACTIONS.c.post_id,
-                POST_REACTIONS.c.user_id == user_id,
-            ),
-            isouter=True,
-        )
+        j = _post_info_join(requesting_user_id=user_id)
 
-        thesis_columns = [
-            column.label("thesis_" + str(column).split(".")[1])
-            for column in THESES.columns
-        ]
+        # Get Post
+        query = select(POST_INFO_COLUMNS).select_from(j).where(and_(*conditions))
 
-        columns_to_select = [
-            POSTS,
-            POST_REACTIONS.c.reaction.label("user_reaction_value"),
-        ] + thesis_columns
+        result = await self.db.fetch_one(query)
+        return posts.PostInfoFromDB(**result) if result else None
 
-        # Get Post
-        query = (
-            select(columns_to_select).select_from(j).where(and_(*conditions)).subquery()
-        )
+    async def retrieve_posts_by_ids(
+        self, post_ids: List[int], requesting_user_id: int
+    ) -> Dict[int, posts.PostInfoFromDB]:
+        """Retrieve many posts in one query, keyed by post_id"""
 
-        # Gets number of likes per post
-        likes_count_query = (
-            select([func.count(POST_REACTIONS.table_valued())])
-            .where(POST_REACTIONS.c.post_id == query.c.post_id)
-            .scalar_subquery()
-            .label("like_count")
-        )
+        if not post_ids:
+            return {}
 
-        # Gets number of comments per post
-        comment_count_query = (
-            select([func.count(POSTS.table_valued())])
-            .where(POSTS.c.is_post_comment_on == query.c.post_id)
-            .scalar_subquery()
-            .label("comment_count")
+        query = (
+            select(POST_INFO_COLUMNS)
+            .select_from(_post_info_join(requesting_user_id=requesting_user_id))
+            .where(POSTS.c.post_id.in_(post_ids))
         )
 
-        compiled_query = select([query, likes_count_query, comment_count_query])
+        query_results = await self.db.fetch_all(query)
 
-        result = await self.db.fetch_one(compiled_query)
-        return posts.PostInfoFromDB(**result) if result else None
+        return {
+            result["post_id"]: posts.PostInfoFromDB(**result)
+            for result in query_results
+        }
 
     async def retrieve_many_with_filter(
         self,
         query_params: posts.PostQueryRepoAdapter,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[posts.PostInfoFromDB], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+        excluded_user_ids: Optional[AbstractSet[int]] = None,
+    ) -> Tuple[List[posts.PostInfoFromDB], Optional[RecordCount]]:
         """Retrieve many posts based on filter."""
 
-        conditions = []
+        filter_values = {
+            "user_id": query_params.user_id,
+            "excluded_user_ids": sorted(excluded_user_ids or ()),
+            "asset_symbol": query_params.asset_symbol,
+            "sentiment": query_params.sentiment,
+            "is_post_comment_on": query_params.is_post_comment_on,
+            "is_thesis_comment_on": query_params.is_thesis_comment_on,
+        }
+        filter_names = tuple(name for name, value in filter_values.items() if value)
+
+        values = {
+            **filter_values,
+            **pagination_values(
+                page_number=page_number, page_size=page_size, cursor=cursor
+            ),
+            "requesting_user_id": query_params.requesting_user_id,
+        }
 
-        if query_params.user_id:
-            conditions.append(POSTS.c.user_id == query_params.user_id)
+        # Gets posts
+        statement = _list_statements.get(
+            (filter_names, cursor is not None),
+            lambda: _build_list_query(
+                filter_names=filter_names, keyset=cursor is not None
+            ),
+        )
+        query_results = await self.db.fetch_all(
+            query=statement.sql, values=statement.bind(values)
+        )
 
-        if query_params.asset_symbol:
-            conditions.append(POSTS.c.asset_symbol == query_params.asset_symbol)
+        theses_list = [posts.PostInfoFromDB(**result) for result in query_results]
+        theses_count = (
+            await count_records(
+                db=self.db,
+                from_clause=_LIST_JOIN,
+                conditions=[POST_LIST_FILTERS[name] for name in filter_names],
+                values=values,
+                statement_key=("posts", filter_names),
+            )
+            if include_total
+            else None
+        )
 
-        if query_params.sentiment:
-            conditions.append(POSTS.c.sentiment == query_params.sentiment)
+        return theses_list, theses_count
 
-        if query_params.is_post_comment_on:
-            conditions.append(
-                POSTS.c.is_post_comment_on == query_params.is_post_comment_on
+    async def retrieve_replies_for_posts(
+        self,
+        post_ids: List[int],
+        requesting_user_id: int,
+        max_depth: int = 3,
+    ) -> List[posts.PostInfoFromDB]:
+        """Retrieve up to three levels of replies for many parent posts in one query.
+        Each level keeps the newest replies per parent (15 for the first level, 5 for
+        the others), so the caller can assemble the comment trees in memory."""
+
+        if not post_ids:
+            return []
+
+        # Each level ranks replies per parent and keeps the newest ones
+        reply_levels = []
+        parent_ids = post_ids
+        for level, reply_limit in enumerate(REPLY_LIMITS_PER_LEVEL[:max_depth], 1):
+            ranked_replies = (
+                select(
+                    [
+                        POSTS.c.post_id,
+                        func.row_number()
+                        .over(
+                            partition_by=POSTS.c.is_post_comment_on,
+                            order_by=desc(POSTS.c.created_at),
+                        )
+                        .label("reply_rank"),
+                    ]
+                )
+                .where(POSTS.c.is_post_comment_on.in_(parent_ids))
+                .subquery()
             )
-
-        if query_params.is_thesis_comment_on:
-            conditions.append(
-                POSTS.c.is_thesis_comment_on == query_params.is_thesis_comment_on
+            reply_level = (
+                select([ranked_replies.c.post_id])
+                .where(ranked_replies.c.reply_rank <= reply_limit)
+                .cte(f"reply_level_{level}")
             )
+            reply_levels.append(reply_level)
+            parent_ids = select([reply_level.c.post_id])
 
-        j = POSTS.join(
-            THESES,
-            POSTS.c.thesis_id == THESES.c.thesis_id,
-            isouter=True,
-        ).join(
-            POST_REACTIONS,
-            and_(
-                POSTS.c.post_id == POST_REACTIONS.c.post_id,
-                POST_REACTIONS.c.user_id == query_params.requesting_user_id,
-            ),
-            isouter=True,
-        )
-
-        thesis_columns = [
-            column.label("thesis_" + str(column).split(".")[1])
-            for column in THESES.columns
-        ]
+        j = _post_info_join(requesting_user_id=requesting_user_id)
 
-        columns_to_select = [
-            POSTS,
-            POST_REACTIONS.c.reaction.label("user_reaction_value"),
-        ] + thesis_columns
-
-        # Gets posts
-        posts_query = (
-            select(columns_to_select)
+        # Gets replies from every level
+        compiled_query = (
+            select(POST_INFO_COLUMNS)
             .select_from(j)
-            .where(and_(*conditions))
-            .limit(page_size)
-            .offset((page_number - 1) * page_size)
+            .where(
+                or_(
+                    *[
+                        POSTS.c.post_id.in_(select([reply_level.c.post_id]))
+                        for reply_level in reply_levels
+                    ]
+                )
+            )
             .order_by(desc(POSTS.c.created_at))
-            .subquery()
         )
 
-        # Gets number of likes per post
-        likes_count_query = (
-            select([func.count(POST_REACTIONS.table_valued())])
-            .where(POST_REACTIONS.c.post_id == posts_query.c.post_id)
-            .scalar_subquery()
-            .label("like_count")
-        )
+        query_results = await self.db.fetch_all(compiled_query)
 
-        # Gets number of comments per post
-        comment_count_query = (
-            select([func.count(POSTS.table_valued())])
-            .where(POSTS.c.is_post_comment_on == posts_query.c.post_id)
-            .scalar_subquery()
-            .label("comment_count")
-        )
+        return [posts.PostInfoFromDB(**result) for result in query_results]
 
-        compiled_query = select([posts_query, likes_count_query, comment_count_query])
+    async def delete(self, post_id: int) -> None:
+        """Delete a post."""
 
-        query_count = select([func.count()]).select_from(j).where(and_(*conditions))
+        delete_statement = (
+            delete(POSTS)
+            .where(POSTS.c.post_id == post_id)
+            .returning(POSTS.c.is_post_comment_on)
+        )
 
         async with self.db.transaction():
-            query_results = await self.db.fetch_all(compiled_query)
-            count_results = await self.db.fetch_all(query_count)
+            parent_post_id = await self.db.execute(delete_statement)
+
+            if parent_post_id:
+                await self.db.execute(
+                    build_counter_update(
+                        table=POST_STATS,
+                        key_column=POST_STATS.c.post_id,
+                        key_value=parent_post_id,
+                        counter="comment_count",
+                        amount=-1,
+                    )
+                )
+
+    async def repair_stats(self, post_id: Optional[int] = None) -> None:
+        """Recomputes the post_stats counters from the reactions and posts tables,
+        repairing any drift. Repairs every post unless post_id is passed."""
+
+        post_condition = [POSTS.c.post_id == post_id] if post_id else []
+
+        like_counts = (
+            select([POST_REACTIONS.c.post_id, func.count().label("like_count")])
+            .group_by(POST_REACTIONS.c.post_id)
+            .subquery()
+        )
 
-        theses_list = [posts.PostInfoFromDB(**result) for result in query_results]
-        theses_count = count_results[0][0]
+        comments = POSTS.alias("comments")
+        comment_counts = (
+            select([comments.c.is_post_comment_on, func.count().label("comment_count")])
+            .where(comments.c.is_post_comment_on.isnot(None))
+            .group_by(comments.c.is_post_comment_on)
+            .subquery()
+        )
 
-        return theses_list, theses_count
+        j = POSTS.join(
+            like_counts, POSTS.c.post_id == like_counts.c.post_id, isouter=True
+        ).join(
+            comment_counts,
+            POSTS.c.post_id == comment_counts.c.is_post_comment_on,
+            isouter=True,
+        )
 
-    async def delete(self, post_id: int) -> None:
-        """Delete a post."""
+        recomputed_stats = (
+            select(
+                [
+                    POSTS.c.post_id,
+                    func.coalesce(like_counts.c.like_count, 0),
+                    func.coalesce(comment_counts.c.comment_count, 0),
+                ]
+            )
+            .select_from(j)
+            .where(and_(*post_condition))
+        )
 
-        delete_statement = delete(POSTS).where(POSTS.c.post_id == post_id)
+        insert_statement = insert(POST_STATS).from_select(
+            ["post_id", "like_count", "comment_count"], recomputed_stats
+        )
+        repair_statement = insert_statement.on_conflict_do_update(
+            index_elements=[POST_STATS.c.post_id],
+            set_={
+                "like_count": insert_statement.excluded.like_count,
+                "comment_count": insert_statement.excluded.comment_count,
+                "updated_at": func.now(),
+            },
+        )
 
-        await self.db.execute(delete_statement)
+        await self.db.execute(repair_statement)
@@ -1,14 +1,29 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import asyncpg
 from databases import Database
-from sqlalchemy import and_, delete, desc, func, select
+from sqlalchemy import and_, delete, select
 
+from app.infrastructure.db.counters import build_counter_update
+from app.infrastructure.db.json_objects import json_object
 from app.infrastructure.db.models.public.rationales import RATIONALES
-from app.infrastructure.db.models.public.theses import THESES, THESES_REACTIONS
+from app.infrastructure.db.models.public.theses import (
+    THESES,
+    THESES_REACTIONS,
+    THESIS_STATS,
+)
+from app.infrastructure.db.pagination import paginate_query
+from app.infrastructure.db.record_counts import count_records
 from app.libraries import pelleum_errors
 from app.usecases.interfaces.rationales_repo import IRationalesRepo
 from app.usecases.schemas import rationales
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
+
+# Columns for RationaleWithThesis, with the thesis as one JSON column
+RATIONALE_WITH_THESIS_COLUMNS = [
+    RATIONALES,
+    json_object(THESES.columns, key_column=THESES.c.thesis_id).label("thesis_json"),
+]
 
 
 class RationalesRepo(IRationalesRepo):
@@ -25,9 +40,19 @@ class RationalesRepo(IRationalesRepo):
         )
 
         try:
-            newly_created_rationale_id = await self.db.execute(
-                create_rationale_insert_stmt
-            )
+            async with self.db.transaction():
+                newly_created_rationale_id = await self.db.execute(
+                    create_rationale_insert_stmt
+                )
+                await self.db.execute(
+                    build_counter_update(
+                        table=THESIS_STATS,
+                        key_column=THESIS_STATS.c.thesis_id,
+                        key_value=thesis_id,
+                        counter="save_count",
+                        amount=1,
+                    )
+                )
         except asyncpg.exceptions.UniqueViolationError:
             raise await pelleum_errors.PelleumErrors(
                 detail="This thesis already exists in the user's rationale library."
@@ -67,14 +92,11 @@ class RationalesRepo(IRationalesRepo):
 
         j = RATIONALES.join(THESES, RATIONALES.c.thesis_id == THESES.c.thesis_id)
 
-        thesis_columns = [
-            column.label("thesis_" + str(column).split(".")[1])
-            for column in THESES.columns
-        ]
-
-        columns_to_select = [RATIONALES] + thesis_columns
-
-        query = select(columns_to_select).select_from(j).where(and_(*conditions))
+        query = (
+            select(RATIONALE_WITH_THESIS_COLUMNS)
+            .select_from(j)
+            .where(and_(*conditions))
+        )
 
         result = await self.db.fetch_one(query)
 
@@ -85,7 +107,9 @@ class RationalesRepo(IRationalesRepo):
         query_params: rationales.RationaleQueryRepoAdapter,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> List[rationales.RationaleWithThesis]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[rationales.RationaleWithThesis], Optional[RecordCount]]:
         """Retrieve many rationales by function parameters"""
 
         conditions = []
@@ -116,43 +140,56 @@ class RationalesRepo(IRationalesRepo):
             isouter=True,
         )
 
-        thesis_columns = [
-            column.label("thesis_" + str(column).split(".")[1])
-            for column in THESES.columns
-        ]
-
-        columns_to_select = [
-            RATIONALES,
-            THESES_REACTIONS.c.reaction.label("user_reaction_value"),
-        ] + thesis_columns
-
         query = (
-            select(columns_to_select)
+            select(
+                RATIONALE_WITH_THESIS_COLUMNS
+                + [THESES_REACTIONS.c.reaction.label("user_reaction_value")]
+            )
             .select_from(j)
             .where(and_(*conditions))
-            .limit(page_size)
-            .offset((page_number - 1) * page_size)
-            .order_by(desc(RATIONALES.c.created_at))
         )
 
-        query_count = select([func.count()]).select_from(j).where(and_(*conditions))
+        query = paginate_query(
+            query=query,
+            created_at_column=RATIONALES.c.created_at,
+            id_column=RATIONALES.c.rationale_id,
+            page_number=page_number,
+            page_size=page_size,
+            cursor=cursor,
+        )
 
-        async with self.db.transaction():
-            query_results = await self.db.fetch_all(query)
-            count_results = await self.db.fetch_all(query_count)
+        query_results = await self.db.fetch_all(query)
 
         rationales_list = [
             rationales.RationaleWithThesis(**result) for result in query_results
         ]
-        rationales_count = count_results[0][0]
+        rationales_count = (
+            await count_records(db=self.db, from_clause=j, conditions=conditions)
+            if include_total
+            else None
+        )
 
         return rationales_list, rationales_count
 
     async def delete(self, rationale_id: int) -> None:
         """Deletes a rationale"""
 
-        delete_statement = delete(RATIONALES).where(
-            RATIONALES.c.rationale_id == rationale_id
+        delete_statement = (
+            delete(RATIONALES)
+            .where(RATIONALES.c.rationale_id == rationale_id)
+            .returning(RATIONALES.c.thesis_id)
         )
 
-        await self.db.execute(delete_statement)
+        async with self.db.transaction():
+            thesis_id = await self.db.execute(delete_statement)
+
+            if thesis_id:
+                await self.db.execute(
+                    build_counter_update(
+                        table=THESIS_STATS,
+                        key_column=THESIS_STATS.c.thesis_id,
+                        key_value=thesis_id,
+                        counter="save_count",
+                        amount=-1,
+                    )
+                )
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from typing import List
+
+from databases import Database
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.infrastructure.db.models.public.subscriptions import STRIPE_EVENTS
+from app.usecases.interfaces.stripe_events_repo import IStripeEventsRepo
+from app.usecases.schemas import subscriptions
+
+# Advisory lock key taken for the duration of a claim, so claims run one at a time
+CLAIM_LOCK_KEY = 7_340_115_001
+
+
+class StripeEventsRepo(IStripeEventsRepo):
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def create(self, event: subscriptions.WebhookEvent) -> bool:
+        """Queues a verified webhook event. Returns False if the event was already
+        queued, since Stripe may deliver the same event more than once."""
+
+        data_object = event.data.get("object", {})
+
+        insert_statement = (
+            insert(STRIPE_EVENTS)
+            .values(
+                event_id=event.event_id,
+                event_type=event.event_type,
+                stripe_subscription_id=data_object.get("subscription"),
+                data=event.data,
+            )
+            .on_conflict_do_nothing(index_elements=[STRIPE_EVENTS.c.event_id])
+            .returning(STRIPE_EVENTS.c.event_id)
+        )
+
+        return await self.db.execute(insert_statement) is not None
+
+    async def claim_pending(
+        self, limit: int, lease_seconds: float, max_attempts: int
+    ) -> List[subscriptions.StripeEventInDB]:
+        """Leases up to limit unprocessed events in arrival order. An event is held
+        back while an earlier event for the same subscription is leased or waiting
+        to be retried, so each subscription's events are handled in order.
+
+        Claims are serialised with a transaction-level advisory lock. Otherwise, with
+        several workers, one could skip a row another is still leasing, see it as
+        unleased, and claim a later event for the same subscription ahead of it."""
+
+        now = func.now()
+        earlier_event = STRIPE_EVENTS.alias("earlier_event")
+
+        claimable_events = (
+            select([STRIPE_EVENTS.c.event_id])
+            .where(
+                and_(
+                    STRIPE_EVENTS.c.processed_at.is_(None),
+                    STRIPE_EVENTS.c.attempts < max_attempts,
+                    or_(
+                        STRIPE_EVENTS.c.locked_until.is_(None),
+                        STRIPE_EVENTS.c.locked_until < now,
+                    ),
+                    ~exists().where(
+                        and_(
+                            earlier_event.c.stripe_subscription_id
+                            == STRIPE_EVENTS.c.stripe_subscription_id,
+                            earlier_event.c.created_at < STRIPE_EVENTS.c.created_at,
+                            earlier_event.c.processed_at.is_(None),
+                            earlier_event.c.locked_until >= now,
+                        )
+                    ),
+                )
+            )
+            .order_by(STRIPE_EVENTS.c.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        claim_statement = (
+            STRIPE_EVENTS.update()
+            .values(locked_until=now + timedelta(seconds=lease_seconds))
+            .where(STRIPE_EVENTS.c.event_id.in_(claimable_events.scalar_subquery()))
+            .returning(*STRIPE_EVENTS.c)
+        )
+
+        async with self.db.transaction():
+            await self.db.execute(select([func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)]))
+            results = await self.db.fetch_all(claim_statement)
+
+        claimed_events = [subscriptions.StripeEventInDB(**result) for result in results]
+        return sorted(claimed_events, key=lambda event: event.created_at)
+
+    async def mark_processed(self, event_id: str) -> None:
+        """Marks an event as processed."""
+
+        update_statement = (
+            STRIPE_EVENTS.update()
+            .values(processed_at=func.now(), locked_until=None, last_error=None)
+            .where(STRIPE_EVENTS.c.event_id == event_id)
+        )
+
+        await self.db.execute(update_statement)
+
+    async def mark_failed(
+        self, event_id: str, error: str, retry_in_seconds: float
+    ) -> None:
+        """Records a failed attempt and holds the event until it may be retried."""
+
+        update_statement = (
+            STRIPE_EVENTS.update()
+            .values(
+                attempts=STRIPE_EVENTS.c.attempts + 1,
+                last_error=error,
+                locked_until=func.now() + timedelta(seconds=retry_in_seconds),
+            )
+            .where(STRIPE_EVENTS.c.event_id == event_id)
+        )
+
+        await self.db.execute(update_statement)
+
+    async def release(self, event_ids: List[str]) -> None:
+        """Gives up leases on events that were claimed but not attempted."""
+
+        if not event_ids:
+            return
+
+        update_statement = (
+            STRIPE_EVENTS.update()
+            .values(locked_until=None)
+            .where(STRIPE_EVENTS.c.event_id.in_(event_ids))
+        )
+
+        await self.db.execute(update_statement)
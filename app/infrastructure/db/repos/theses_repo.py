@@ -1,14 +1,71 @@
-from typing import List, Optional, Tuple
+from typing import AbstractSet, Any, Dict, List, Optional, Tuple
 
 import asyncpg
 from databases import Database
-from sqlalchemy import and_, delete, desc, func, select
+from sqlalchemy import all_, and_, bindparam, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Join, Select
 
+from app.infrastructure.db.models.public.posts import POST_STATS, POSTS
 from app.infrastructure.db.models.public.rationales import RATIONALES
-from app.infrastructure.db.models.public.theses import THESES, THESES_REACTIONS
+from app.infrastructure.db.models.public.theses import (
+    THESES,
+    THESES_REACTIONS,
+    THESIS_STATS,
+)
+from app.infrastructure.db.pagination import paginate_statement, pagination_values
+from app.infrastructure.db.record_counts import count_records
+from app.infrastructure.db.statement_cache import StatementCache
 from app.libraries import pelleum_errors
 from app.usecases.interfaces.theses_repo import IThesesRepo
 from app.usecases.schemas import theses
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
+
+# Columns for ThesisWithInteractionData
+THESIS_INTERACTION_COLUMNS = [
+    THESES,
+    THESES_REACTIONS.c.reaction.label("user_reaction_value"),
+    func.coalesce(THESIS_STATS.c.like_count, 0).label("like_count"),
+    func.coalesce(THESIS_STATS.c.dislike_count, 0).label("dislike_count"),
+    func.coalesce(THESIS_STATS.c.save_count, 0).label("save_count"),
+]
+
+# List filters by name, each bound to a parameter of the same name
+THESIS_LIST_FILTERS = {
+    "user_id": THESES.c.user_id == bindparam("user_id"),
+    "excluded_user_ids": THESES.c.user_id != all_(bindparam("excluded_user_ids")),
+    "asset_symbol": THESES.c.asset_symbol == bindparam("asset_symbol"),
+    "sentiment": THESES.c.sentiment == bindparam("sentiment"),
+}
+
+
+def _thesis_interaction_join(requesting_user_id: Any) -> Join:
+    return THESES.join(
+        THESES_REACTIONS,
+        and_(
+            THESES.c.thesis_id == THESES_REACTIONS.c.thesis_id,
+            THESES_REACTIONS.c.user_id == requesting_user_id,
+        ),
+        isouter=True,
+    ).join(THESIS_STATS, THESES.c.thesis_id == THESIS_STATS.c.thesis_id, isouter=True)
+
+
+_list_statements = StatementCache()
+
+
+def _build_list_query(filter_names: Tuple[str, ...], keyset: bool) -> Select:
+    query = select(THESIS_INTERACTION_COLUMNS).select_from(
+        _thesis_interaction_join(requesting_user_id=bindparam("requesting_user_id"))
+    )
+    if filter_names:
+        query = query.where(and_(*[THESIS_LIST_FILTERS[name] for name in filter_names]))
+
+    return paginate_statement(
+        query=query,
+        created_at_column=THESES.c.created_at,
+        id_column=THESES.c.thesis_id,
+        keyset=keyset,
+    )
 
 
 class ThesesRepo(IThesesRepo):
@@ -70,63 +127,31 @@ class ThesesRepo(IThesesRepo):
         result = await self.db.fetch_one(query)
         return theses.ThesisInDB(**result) if result else None
 
-    async def retrieve_thesis_with_reaction(
-        self, thesis_id: int, user_id: int
-    ) -> Optional[theses.ThesisWithInteractionData]:
-        """Retrieves a thesis with its corresponding user reaction"""
+    async def retrieve_theses_by_ids(
+        self, thesis_ids: List[int]
+    ) -> Dict[int, theses.ThesisInDB]:
+        """Retrieve many theses in one query, keyed by thesis_id"""
 
-        j = THESES.join(
-            THESES_REACTIONS,
-            and_(
-                THESES.c.thesis_id == THESES_REACTIONS.c.thesis_id,
-                THESES_REACTIONS.c.user_id == user_id,
-            ),
-            isouter=True,
-        )
+        if not thesis_ids:
+            return {}
 
-        thesis_query = (
-            select([THESES, THESES_REACTIONS.c.reaction.label("user_reaction_value")])
-            .select_from(j)
-            .where(THESES.c.thesis_id == thesis_id)
-            .subquery()
-        )
+        query = THESES.select().where(THESES.c.thesis_id.in_(thesis_ids))
 
-        # Gets number of likes per post
-        likes_count_query = (
-            select([func.count(THESES_REACTIONS.table_valued())])
-            .where(
-                and_(
-                    THESES_REACTIONS.c.thesis_id == thesis_query.c.thesis_id,
-                    THESES_REACTIONS.c.reaction == 1,
-                )
-            )
-            .scalar_subquery()
-            .label("like_count")
-        )
+        query_results = await self.db.fetch_all(query)
 
-        # Gets number of dislikes per post
-        dislikes_count_query = (
-            select([func.count(THESES_REACTIONS.table_valued())])
-            .where(
-                and_(
-                    THESES_REACTIONS.c.thesis_id == thesis_query.c.thesis_id,
-                    THESES_REACTIONS.c.reaction == -1,
-                )
-            )
-            .scalar_subquery()
-            .label("dislike_count")
-        )
+        return {
+            result["thesis_id"]: theses.ThesisInDB(**result) for result in query_results
+        }
 
-        # Gets number of comments per post
-        save_count_query = (
-            select([func.count(RATIONALES.table_valued())])
-            .where(RATIONALES.c.thesis_id == thesis_query.c.thesis_id)
-            .scalar_subquery()
-            .label("save_count")
-        )
+    async def retrieve_thesis_with_reaction(
+        self, thesis_id: int, user_id: int
+    ) -> Optional[theses.ThesisWithInteractionData]:
+        """Retrieves a thesis with its corresponding user reaction"""
 
-        compiled_query = select(
-            [thesis_query, likes_count_query, dislikes_count_query, save_count_query]
+        compiled_query = (
+            select(THESIS_INTERACTION_COLUMNS)
+            .select_from(_thesis_interaction_join(requesting_user_id=user_id))
+            .where(THESES.c.thesis_id == thesis_id)
         )
 
         query_result = await self.db.fetch_one(compiled_query)
@@ -165,96 +190,148 @@ class ThesesRepo(IThesesRepo):
         user_id: int,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[theses.ThesisWithInteractionData], int]:
-
-        conditions = []
-
-        if query_params.user_id:
-            conditions.append(THESES.c.user_id == query_params.user_id)
-
-        if query_params.asset_symbol:
-            conditions.append(THESES.c.asset_symbol == query_params.asset_symbol)
-
-        if query_params.sentiment:
-            conditions.append(THESES.c.sentiment == query_params.sentiment)
-
-        j = THESES.join(
-            THESES_REACTIONS,
-            and_(
-                THESES.c.thesis_id == THESES_REACTIONS.c.thesis_id,
-                THESES_REACTIONS.c.user_id == user_id,
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+        excluded_user_ids: Optional[AbstractSet[int]] = None,
+    ) -> Tuple[List[theses.ThesisWithInteractionData], Optional[RecordCount]]:
+
+        filter_values = {
+            "user_id": query_params.user_id,
+            "excluded_user_ids": sorted(excluded_user_ids or ()),
+            "asset_symbol": query_params.asset_symbol,
+            "sentiment": query_params.sentiment,
+        }
+        filter_names = tuple(name for name, value in filter_values.items() if value)
+
+        values = {
+            **filter_values,
+            **pagination_values(
+                page_number=page_number, page_size=page_size, cursor=cursor
             ),
-            isouter=True,
+            "requesting_user_id": user_id,
+        }
+
+        # Gets theses
+        statement = _list_statements.get(
+            (filter_names, cursor is not None),
+            lambda: _build_list_query(
+                filter_names=filter_names, keyset=cursor is not None
+            ),
+        )
+        query_results = await self.db.fetch_all(
+            query=statement.sql, values=statement.bind(values)
         )
 
-        # Gets posts
-        theses_query = (
-            select([THESES, THESES_REACTIONS.c.reaction.label("user_reaction_value")])
-            .select_from(j)
-            .where(and_(*conditions))
-            .limit(page_size)
-            .offset((page_number - 1) * page_size)
-            .order_by(desc(THESES.c.created_at))
-            .subquery()
+        theses_list = [
+            theses.ThesisWithInteractionData(**result) for result in query_results
+        ]
+        theses_count = (
+            await count_records(
+                db=self.db,
+                from_clause=THESES,
+                conditions=[THESIS_LIST_FILTERS[name] for name in filter_names],
+                values=values,
+                statement_key=("theses", filter_names),
+            )
+            if include_total
+            else None
         )
 
-        # Gets number of likes per post
-        likes_count_query = (
-            select([func.count(THESES_REACTIONS.table_valued())])
+        return theses_list, theses_count
+
+    async def delete(self, thesis_id: int) -> None:
+        """Delete a thesis. The models that reference thesis_id as a foreign
+        key all have ondelete="cascade", so they should also get deleted.
+        Posts on the thesis go with it, so the comment counts of the posts they
+        commented on are decremented first; the cascade doesn't touch post_stats."""
+
+        cascaded_comments = (
+            select([POSTS.c.is_post_comment_on, func.count().label("comment_count")])
             .where(
                 and_(
-                    THESES_REACTIONS.c.thesis_id == theses_query.c.thesis_id,
-                    THESES_REACTIONS.c.reaction == 1,
+                    POSTS.c.thesis_id == thesis_id,
+                    POSTS.c.is_post_comment_on.isnot(None),
                 )
             )
-            .scalar_subquery()
-            .label("like_count")
+            .group_by(POSTS.c.is_post_comment_on)
+            .subquery()
         )
 
-        # Gets number of dislikes per post
-        dislikes_count_query = (
-            select([func.count(THESES_REACTIONS.table_valued())])
-            .where(
-                and_(
-                    THESES_REACTIONS.c.thesis_id == theses_query.c.thesis_id,
-                    THESES_REACTIONS.c.reaction == -1,
+        decrement_statement = (
+            POST_STATS.update()
+            .where(POST_STATS.c.post_id == cascaded_comments.c.is_post_comment_on)
+            .values(
+                comment_count=func.greatest(
+                    POST_STATS.c.comment_count - cascaded_comments.c.comment_count, 0
                 )
             )
-            .scalar_subquery()
-            .label("dislike_count")
         )
 
-        # Gets number of comments per post
-        save_count_query = (
-            select([func.count(RATIONALES.table_valued())])
-            .where(RATIONALES.c.thesis_id == theses_query.c.thesis_id)
-            .scalar_subquery()
-            .label("save_count")
-        )
+        delete_statement = delete(THESES).where(THESES.c.thesis_id == thesis_id)
 
-        compiled_query = select(
-            [theses_query, likes_count_query, dislikes_count_query, save_count_query]
+        async with self.db.transaction():
+            await self.db.execute(decrement_statement)
+            await self.db.execute(delete_statement)
+
+    async def repair_stats(self, thesis_id: Optional[int] = None) -> None:
+        """Recomputes the thesis_stats counters from the reactions and rationales
+        tables, repairing any drift. Repairs every thesis unless thesis_id is passed."""
+
+        thesis_condition = [THESES.c.thesis_id == thesis_id] if thesis_id else []
+
+        reaction_counts = (
+            select(
+                [
+                    THESES_REACTIONS.c.thesis_id,
+                    func.count()
+                    .filter(THESES_REACTIONS.c.reaction == 1)
+                    .label("like_count"),
+                    func.count()
+                    .filter(THESES_REACTIONS.c.reaction == -1)
+                    .label("dislike_count"),
+                ]
+            )
+            .group_by(THESES_REACTIONS.c.thesis_id)
+            .subquery()
         )
 
-        query_count = (
-            select([func.count()]).select_from(THESES).where(and_(*conditions))
+        save_counts = (
+            select([RATIONALES.c.thesis_id, func.count().label("save_count")])
+            .group_by(RATIONALES.c.thesis_id)
+            .subquery()
         )
 
-        async with self.db.transaction():
-            query_results = await self.db.fetch_all(compiled_query)
-            count_results = await self.db.fetch_all(query_count)
-
-        theses_list = [
-            theses.ThesisWithInteractionData(**result) for result in query_results
-        ]
-        theses_count = count_results[0][0]
-
-        return theses_list, theses_count
-
-    async def delete(self, thesis_id: int) -> None:
-        """Delete a thesis. The models that reference thesis_id as a foreign
-        key all have ondelete="cascade", so they should also get deleted."""
+        j = THESES.join(
+            reaction_counts,
+            THESES.c.thesis_id == reaction_counts.c.thesis_id,
+            isouter=True,
+        ).join(save_counts, THESES.c.thesis_id == save_counts.c.thesis_id, isouter=True)
+
+        recomputed_stats = (
+            select(
+                [
+                    THESES.c.thesis_id,
+                    func.coalesce(reaction_counts.c.like_count, 0),
+                    func.coalesce(reaction_counts.c.dislike_count, 0),
+                    func.coalesce(save_counts.c.save_count, 0),
+                ]
+            )
+            .select_from(j)
+            .where(and_(*thesis_condition))
+        )
 
-        delete_statement = delete(THESES).where(THESES.c.thesis_id == thesis_id)
+        insert_statement = insert(THESIS_STATS).from_select(
+            ["thesis_id", "like_count", "dislike_count", "save_count"],
+            recomputed_stats,
+        )
+        repair_statement = insert_statement.on_conflict_do_update(
+            index_elements=[THESIS_STATS.c.thesis_id],
+            set_={
+                "like_count": insert_statement.excluded.like_count,
+                "dislike_count": insert_statement.excluded.dislike_count,
+                "save_count": insert_statement.excluded.save_count,
+                "updated_at": func.now(),
+            },
+        )
 
-        await self.db.execute(delete_statement)
+        await self.db.execute(repair_statement)
@@ -2,12 +2,27 @@ from typing import List, Optional, Tuple
 
 import asyncpg
 from databases import Database
-from sqlalchemy import and_, between, delete, desc, func, select
-
-from app.infrastructure.db.models.public.theses import THESES, THESES_REACTIONS
+from sqlalchemy import and_, between, delete, select
+
+from app.infrastructure.db.counters import build_counter_update
+from app.infrastructure.db.models.public.theses import (
+    THESES,
+    THESES_REACTIONS,
+    THESIS_STATS,
+)
+from app.infrastructure.db.pagination import paginate_query
+from app.infrastructure.db.record_counts import count_records
 from app.libraries import pelleum_errors
 from app.usecases.interfaces.thesis_reaction_repo import IThesisReactionRepo
 from app.usecases.schemas import thesis_reactions
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
+
+
+def reaction_counter(reaction: int) -> str:
+    """Returns the thesis_stats counter that tracks a reaction value"""
+    if reaction == thesis_reactions.Reaction.LIKE:
+        return "like_count"
+    return "dislike_count"
 
 
 class ThesisReactionRepo(IThesisReactionRepo):
@@ -26,7 +41,17 @@ class ThesisReactionRepo(IThesisReactionRepo):
         )
 
         try:
-            await self.db.execute(insert_statement)
+            async with self.db.transaction():
+                await self.db.execute(insert_statement)
+                await self.db.execute(
+                    build_counter_update(
+                        table=THESIS_STATS,
+                        key_column=THESIS_STATS.c.thesis_id,
+                        key_value=thesis_reaction.thesis_id,
+                        counter=reaction_counter(thesis_reaction.reaction),
+                        amount=1,
+                    )
+                )
         except asyncpg.exceptions.UniqueViolationError:
             raise await pelleum_errors.PelleumErrors(
                 detail="User has already liked this thesis."
@@ -37,6 +62,17 @@ class ThesisReactionRepo(IThesisReactionRepo):
     ) -> None:
         """Update reaction"""
 
+        existing_reaction_query = (
+            select([THESES_REACTIONS.c.reaction])
+            .where(
+                and_(
+                    THESES_REACTIONS.c.user_id == thesis_reaction_update.user_id,
+                    THESES_REACTIONS.c.thesis_id == thesis_reaction_update.thesis_id,
+                )
+            )
+            .with_for_update()
+        )
+
         update_statement = (
             THESES_REACTIONS.update()
             .values(reaction=thesis_reaction_update.reaction)
@@ -48,26 +84,65 @@ class ThesisReactionRepo(IThesisReactionRepo):
             )
         )
 
-        await self.db.execute(update_statement)
+        async with self.db.transaction():
+            existing_reaction = await self.db.fetch_val(existing_reaction_query)
+            await self.db.execute(update_statement)
+
+            # Move the reaction from its old counter to its new one
+            if (
+                existing_reaction is not None
+                and existing_reaction != thesis_reaction_update.reaction
+            ):
+                for reaction, amount in (
+                    (existing_reaction, -1),
+                    (thesis_reaction_update.reaction, 1),
+                ):
+                    await self.db.execute(
+                        build_counter_update(
+                            table=THESIS_STATS,
+                            key_column=THESIS_STATS.c.thesis_id,
+                            key_value=thesis_reaction_update.thesis_id,
+                            counter=reaction_counter(reaction),
+                            amount=amount,
+                        )
+                    )
 
     async def delete(self, thesis_id: int, user_id: int) -> None:
         """Delete reaction"""
 
-        delete_statement = delete(THESES_REACTIONS).where(
-            and_(
-                THESES_REACTIONS.c.user_id == user_id,
-                THESES_REACTIONS.c.thesis_id == thesis_id,
+        delete_statement = (
+            delete(THESES_REACTIONS)
+            .where(
+                and_(
+                    THESES_REACTIONS.c.user_id == user_id,
+                    THESES_REACTIONS.c.thesis_id == thesis_id,
+                )
             )
+            .returning(THESES_REACTIONS.c.reaction)
         )
 
-        await self.db.execute(delete_statement)
+        async with self.db.transaction():
+            deleted_reaction = await self.db.execute(delete_statement)
+
+            if deleted_reaction is not None:
+                await self.db.execute(
+                    build_counter_update(
+                        table=THESIS_STATS,
+                        key_column=THESIS_STATS.c.thesis_id,
+                        key_value=thesis_id,
+                        counter=reaction_counter(deleted_reaction),
+                        amount=-1,
+                    )
+                )
 
     async def retrieve_many_with_filter(
         self,
         query_params: thesis_reactions.ThesisReactionsQueryParams,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[thesis_reactions.ThesisReactionInDB], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[thesis_reactions.ThesisReactionInDB], Optional[RecordCount]]:
         """Retrieve many reactions"""
 
         conditions = []
@@ -99,25 +174,35 @@ class ThesisReactionRepo(IThesisReactionRepo):
             THESES, THESES_REACTIONS.c.thesis_id == THESES.c.thesis_id
         )
 
-        query = (
-            select([THESES_REACTIONS])
-            .select_from(j)
-            .where(and_(*conditions))
-            .limit(page_size)
-            .offset((page_number - 1) * page_size)
-            .order_by(desc(THESES_REACTIONS.c.created_at))
+        # Reactions are unique per (user, thesis), so the key's id is whichever side
+        # of that pair the query doesn't pin down
+        id_column = (
+            THESES_REACTIONS.c.user_id
+            if query_params.thesis_id
+            else THESES_REACTIONS.c.thesis_id
         )
 
-        query_count = select([func.count()]).select_from(j).where(and_(*conditions))
+        query = select([THESES_REACTIONS]).select_from(j).where(and_(*conditions))
 
-        async with self.db.transaction():
-            query_results = await self.db.fetch_all(query)
-            count_results = await self.db.fetch_all(query_count)
+        query = paginate_query(
+            query=query,
+            created_at_column=THESES_REACTIONS.c.created_at,
+            id_column=id_column,
+            page_number=page_number,
+            page_size=page_size,
+            cursor=cursor,
+        )
+
+        query_results = await self.db.fetch_all(query)
 
         theses_reactions_list = [
             thesis_reactions.ThesisReactionInDB(**result) for result in query_results
         ]
-        theses_reactions_count = count_results[0][0]
+        theses_reactions_count = (
+            await count_records(db=self.db, from_clause=j, conditions=conditions)
+            if include_total
+            else None
+        )
 
         return theses_reactions_list, theses_reactions_count
 
@@ -1,23 +1,38 @@
 from typing import List, Optional
 
 from databases import Database
-from passlib.context import CryptContext
-from sqlalchemy import and_, delete
+from sqlalchemy import and_, delete, false, func, select, true, union_all
+from sqlalchemy.dialects.postgresql import insert
 
 from app.infrastructure.db.models.public.users import BLOCKS, USERS
+from app.libraries.password_hasher import PasswordHasher
+from app.libraries.ttl_cache import TTLCache
 from app.usecases.interfaces.user_repo import IUsersRepo
 from app.usecases.schemas import users
 
+# Each user's block sets, invalidated whenever a block involving them changes. The
+# cache is per process, so other workers may serve sets up to a minute stale; fine
+# for filtering reads, but block writes check against the table itself
+_block_data_cache = TTLCache(ttl=60, max_entries=10000)
+# Authenticated users by username, invalidated whenever the user is updated
+_authenticated_user_cache = TTLCache(ttl=30, max_entries=10000)
+
+
+def clear_user_caches() -> None:
+    """Drops every cached user and block set, e.g. after the users table is emptied."""
+    _block_data_cache.clear()
+    _authenticated_user_cache.clear()
+
 
 class UsersRepo(IUsersRepo):
     def __init__(self, db: Database):
         self.db = db
 
     async def create(
-        self, new_user: users.UserCreate, password_context: CryptContext
+        self, new_user: users.UserCreate, password_hasher: PasswordHasher
     ) -> users.UserInDB:
 
-        hashed_password = password_context.hash(new_user.password)
+        hashed_password = await password_hasher.hash(new_user.password)
 
         create_user_insert_stmt = USERS.insert().values(
             email=new_user.email,
@@ -62,15 +77,31 @@ class UsersRepo(IUsersRepo):
         result = await self.db.fetch_one(query)
         return users.UserInDB(**result) if result else None
 
+    async def retrieve_authenticated_user(
+        self, username: str
+    ) -> Optional[users.UserInDB]:
+        """Retrieves the user a token was issued to. Results are cached per username,
+        so authenticated requests usually skip the users table."""
+
+        user = _authenticated_user_cache.get(username)
+        if user:
+            return user
+
+        user = await self.retrieve_user_with_filter(username=username)
+
+        if user:
+            _authenticated_user_cache.set(username, user)
+        return user
+
     async def update(
         self,
         updated_user: users.UserUpdate,
         user_id: str,
-        password_context: CryptContext,
+        password_hasher: PasswordHasher,
     ) -> users.UserInDB:
 
         if updated_user.password:
-            hashed_password = password_context.hash(updated_user.password)
+            hashed_password = await password_hasher.hash(updated_user.password)
             updated_user.password = hashed_password
 
         query = USERS.update()
@@ -88,38 +119,76 @@ class UsersRepo(IUsersRepo):
 
         user_update_stmt = query.where(USERS.c.user_id == user_id)
 
+        # A changed username leaves the old one cached, so look it up first
+        previous_user = (
+            await self.retrieve_user_with_filter(user_id=user_id)
+            if updated_user.username
+            else None
+        )
+
         await self.db.execute(user_update_stmt)
 
-        return await self.retrieve_user_with_filter(user_id=user_id)
+        user = await self.retrieve_user_with_filter(user_id=user_id)
+        _authenticated_user_cache.invalidate(user.username)
+        if previous_user:
+            _authenticated_user_cache.invalidate(previous_user.username)
+
+        return user
+
+    async def update_hashed_password(self, user_id: int, hashed_password: str) -> None:
+        """Replaces a user's stored password hash."""
+
+        update_statement = (
+            USERS.update()
+            .values(hashed_password=hashed_password)
+            .where(USERS.c.user_id == user_id)
+            .returning(USERS.c.username)
+        )
+
+        username = await self.db.execute(update_statement)
+        _authenticated_user_cache.invalidate(username)
 
     async def add_block(
         self,
         initiating_user_id: str,
         receiving_user_id: str,
-    ) -> None:
-        """Add block."""
-
-        create_block_insert_stmt = BLOCKS.insert().values(
-            user_id=initiating_user_id, blocked_user_id=receiving_user_id
+    ) -> bool:
+        """Add block. Returns False if the block already existed."""
+
+        create_block_insert_stmt = (
+            insert(BLOCKS)
+            .values(user_id=initiating_user_id, blocked_user_id=receiving_user_id)
+            .on_conflict_do_nothing()
+            .returning(BLOCKS.c.user_id)
         )
 
-        await self.db.execute(create_block_insert_stmt)
+        block_added = await self.db.execute(create_block_insert_stmt) is not None
+        _block_data_cache.invalidate(initiating_user_id, receiving_user_id)
+
+        return block_added
 
     async def remove_block(
         self,
         initiating_user_id: str,
         receiving_user_id: str,
-    ) -> None:
-        """Remove block."""
-
-        delete_statement = delete(BLOCKS).where(
-            and_(
-                BLOCKS.c.user_id == initiating_user_id,
-                BLOCKS.c.blocked_user_id == receiving_user_id,
+    ) -> bool:
+        """Remove block. Returns False if there was no block to remove."""
+
+        delete_statement = (
+            delete(BLOCKS)
+            .where(
+                and_(
+                    BLOCKS.c.user_id == initiating_user_id,
+                    BLOCKS.c.blocked_user_id == receiving_user_id,
+                )
             )
+            .returning(BLOCKS.c.user_id)
         )
 
-        await self.db.execute(delete_statement)
+        block_removed = await self.db.execute(delete_statement) is not None
+        _block_data_cache.invalidate(initiating_user_id, receiving_user_id)
+
+        return block_removed
 
     async def retrieve_blocks(
         self,
@@ -141,3 +210,84 @@ class UsersRepo(IUsersRepo):
         results = await self.db.fetch_all(query)
 
         return [users.BlockInDb(**result) for result in results] if results else []
+
+    async def retrieve_block_data(self, user_id: int) -> users.BlockData:
+        """Retrieves the users a user has blocked and the users who have blocked
+        them, in both directions with one query. Each direction is read from an
+        index alone: the primary key, and its reverse. Results are cached per user."""
+
+        block_data = _block_data_cache.get(user_id)
+        if block_data:
+            return block_data
+
+        query = union_all(
+            select(
+                [
+                    BLOCKS.c.blocked_user_id.label("other_user_id"),
+                    true().label("blocker"),
+                ]
+            ).where(BLOCKS.c.user_id == user_id),
+            select(
+                [BLOCKS.c.user_id.label("other_user_id"), false().label("blocker")]
+            ).where(BLOCKS.c.blocked_user_id == user_id),
+        )
+
+        results = await self.db.fetch_all(query)
+
+        block_data = users.BlockData(
+            user_blocks=frozenset(
+                result["other_user_id"] for result in results if result["blocker"]
+            ),
+            user_blocked_by=frozenset(
+                result["other_user_id"] for result in results if not result["blocker"]
+            ),
+        )
+
+        _block_data_cache.set(user_id, block_data)
+        return block_data
+
+    async def retrieve_viewer(self, username: str) -> users.Viewer:
+        """Retrieves the user a token was issued to along with their block sets. On a
+        cache miss, the user row and both block sets come back in one statement."""
+
+        user = _authenticated_user_cache.get(username)
+        if user:
+            return users.Viewer(
+                user=user,
+                block_data=await self.retrieve_block_data(user_id=user.user_id),
+            )
+
+        user_blocks = (
+            select([func.array_agg(BLOCKS.c.blocked_user_id)])
+            .where(BLOCKS.c.user_id == USERS.c.user_id)
+            .scalar_subquery()
+        )
+        user_blocked_by = (
+            select([func.array_agg(BLOCKS.c.user_id)])
+            .where(BLOCKS.c.blocked_user_id == USERS.c.user_id)
+            .scalar_subquery()
+        )
+
+        query = select(
+            [
+                USERS,
+                user_blocks.label("user_blocks"),
+                user_blocked_by.label("user_blocked_by"),
+            ]
+        ).where(USERS.c.username == username)
+
+        result = await self.db.fetch_one(query)
+
+        if not result:
+            return users.Viewer()
+
+        result = dict(result)
+        block_data = users.BlockData(
+            user_blocks=frozenset(result.pop("user_blocks") or ()),
+            user_blocked_by=frozenset(result.pop("user_blocked_by") or ()),
+        )
+        user = users.UserInDB(**result)
+
+        _authenticated_user_cache.set(username, user)
+        _block_data_cache.set(user.user_id, block_data)
+        return users.Viewer(user=user, block_data=block_data)
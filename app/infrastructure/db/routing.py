@@ -0,0 +1,138 @@
+import itertools
+from contextvars import ContextVar
+from typing import Any, Iterable, List, Optional
+
+import databases
+from sqlalchemy.sql.elements import TextClause
+
+from app.libraries.ttl_cache import TTLCache
+
+# Set once the current request (or background task) has written to the primary
+_wrote_to_primary: ContextVar[bool] = ContextVar("wrote_to_primary", default=False)
+_in_transaction: ContextVar[bool] = ContextVar("in_transaction", default=False)
+_request_user_id: ContextVar[Optional[int]] = ContextVar(
+    "request_user_id", default=None
+)
+
+
+def set_request_user(user_id: int) -> None:
+    """Records who is making the current request, so their writes make their reads
+    stick to the primary for a while."""
+    _request_user_id.set(user_id)
+
+
+def is_read_query(query: Any) -> bool:
+    """Whether a query is safe to send to a replica: a plain SELECT (or EXPLAIN)
+    without FOR UPDATE. Anything else, including UPDATE ... RETURNING, is not."""
+
+    if isinstance(query, (str, TextClause)):
+        sql = query if isinstance(query, str) else query.text
+        keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        return keyword in ("SELECT", "EXPLAIN")
+
+    return (
+        not getattr(query, "is_dml", False)
+        and getattr(query, "_for_update_arg", None) is None
+    )
+
+
+class _PrimaryTransaction:
+    """Wraps a primary transaction so reads inside it stay on the primary too."""
+
+    def __init__(self, transaction: Any):
+        self.transaction = transaction
+        self.token = None
+
+    async def __aenter__(self) -> Any:
+        self.token = _in_transaction.set(True)
+        _wrote_to_primary.set(True)
+        return await self.transaction.__aenter__()
+
+    async def __aexit__(self, *args: Any) -> None:
+        try:
+            await self.transaction.__aexit__(*args)
+        finally:
+            _in_transaction.reset(self.token)
+
+
+class RoutedDatabase:
+    """Sends repo reads to the read replicas and everything else to the primary.
+
+    Reads stay on the primary inside transaction() blocks, once the current request
+    has written, and for sticky_seconds after the requesting user last wrote, so
+    users read their own writes despite replication lag. Recent writers are tracked
+    per worker process."""
+
+    def __init__(
+        self,
+        primary: databases.Database,
+        replicas: List[databases.Database],
+        sticky_seconds: float = 5,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self._replica_cycle = itertools.cycle(replicas)
+        self._recent_writers = TTLCache(ttl=sticky_seconds, max_entries=100000)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.primary.is_connected
+
+    async def connect(self) -> None:
+        await self.primary.connect()
+        for replica in self.replicas:
+            await replica.connect()
+
+    async def disconnect(self) -> None:
+        await self.primary.disconnect()
+        for replica in self.replicas:
+            await replica.disconnect()
+
+    def _database_for(self, query: Any) -> databases.Database:
+        if not is_read_query(query):
+            self._record_write()
+            return self.primary
+
+        if _in_transaction.get() or _wrote_to_primary.get():
+            return self.primary
+
+        user_id = _request_user_id.get()
+        if user_id is not None and self._recent_writers.get(user_id):
+            return self.primary
+
+        return next(self._replica_cycle)
+
+    def _record_write(self) -> None:
+        _wrote_to_primary.set(True)
+
+        user_id = _request_user_id.get()
+        if user_id is not None:
+            self._recent_writers.set(user_id, True)
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._database_for(query).fetch_all(query, values)
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        return await self._database_for(query).fetch_one(query, values)
+
+    async def fetch_val(
+        self, query: Any, values: Optional[dict] = None, column: Any = 0
+    ) -> Any:
+        return await self._database_for(query).fetch_val(query, values, column=column)
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        self._record_write()
+        return await self.primary.execute(query, values)
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        self._record_write()
+        return await self.primary.execute_many(query, values)
+
+    def transaction(self, **kwargs: Any) -> _PrimaryTransaction:
+        return _PrimaryTransaction(self.primary.transaction(**kwargs))
+
+    def connection(self) -> Any:
+        return self.primary.connection()
+
+    def pool_metrics(self) -> Iterable[str]:
+        return self.primary.pool_metrics()
@@ -0,0 +1,61 @@
+from typing import Any, Callable, Dict, Hashable, Mapping, Tuple
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.expression import ClauseElement
+
+_dialect = postgresql.dialect(paramstyle="named")
+
+
+class CompiledStatement:
+    """SQL text with :name placeholders, the names of its parameters in the order
+    they appear, and the values the parameters were built with: fixed ones like the
+    0 in COALESCE(like_count, 0), and None for bindparam()s left to bind later."""
+
+    def __init__(
+        self, sql: str, param_names: Tuple[str, ...], fixed_values: Dict[str, Any]
+    ):
+        self.sql = sql
+        self.param_names = param_names
+        self.fixed_values = fixed_values
+
+    def bind(self, values: Mapping[str, Any]) -> Dict[str, Any]:
+        """Values for every parameter of the statement, taken from values where
+        given. Values it has no parameter for are ignored, so one dict can bind
+        several related statements."""
+
+        return {
+            name: values[name] if name in values else self.fixed_values[name]
+            for name in self.param_names
+        }
+
+
+def compile_statement(query: ClauseElement) -> CompiledStatement:
+    compiled = query.compile(
+        dialect=_dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = compiled.params
+    return CompiledStatement(
+        sql=str(compiled),
+        param_names=tuple(params),
+        fixed_values=dict(params),
+    )
+
+
+class StatementCache:
+    """Compiled statements keyed by the shape of the query, e.g. which filters are
+    set, so hot paths build and compile each shape once and afterwards only bind
+    values. Shapes come from code rather than from values, so the cache stays small."""
+
+    def __init__(self) -> None:
+        self._statements: Dict[Hashable, CompiledStatement] = {}
+
+    def get(
+        self, key: Hashable, build: Callable[[], ClauseElement]
+    ) -> CompiledStatement:
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements[key] = compile_statement(build())
+        return statement
+
+    def clear(self) -> None:
+        self._statements.clear()
@@ -2,10 +2,20 @@ from datetime import datetime
 
 from fastapi import APIRouter
 
+from app.dependencies import get_notification_dispatcher, get_password_hasher
+
 health_router = APIRouter(tags=["health"])
 
 
 @health_router.get("")
 async def health_check():
 
-    return {"status": "healthy", "datetime": datetime.now().isoformat()}
+    password_hasher = await get_password_hasher()
+    notification_dispatcher = await get_notification_dispatcher()
+
+    return {
+        "status": "healthy",
+        "datetime": datetime.now().isoformat(),
+        "password_hashing": password_hasher.metrics(),
+        "notifications": notification_dispatcher.metrics(),
+    }
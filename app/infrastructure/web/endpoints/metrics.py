@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.dependencies import verify_metrics_token
+from app.infrastructure.db import core
+from app.infrastructure.db.instrumentation import render_metrics
+
+# Pool and query internals aren't for the public, so scrapers authenticate
+metrics_router = APIRouter(
+    tags=["metrics"], dependencies=[Depends(verify_metrics_token)]
+)
+
+
+@metrics_router.get("", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Database pool and query metrics in the Prometheus text format."""
+
+    return PlainTextResponse(
+        render_metrics(database=core.DATABASE),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, Path, Response
+import asyncio
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, Header, Path, Response
 from pydantic import conint
-from starlette.status import HTTP_204_NO_CONTENT
+from starlette.status import HTTP_204_NO_CONTENT, HTTP_304_NOT_MODIFIED
 
 from app.dependencies import (
     get_current_active_user,
+    get_next_cursor,
     get_notifications_repo,
     get_posts_repo,
     get_theses_repo,
+    paginate,
 )
 from app.libraries import pelleum_errors
 from app.usecases.interfaces.notifications_repo import INotificationsRepo
 from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
 from app.usecases.schemas import notifications, users
+from app.usecases.schemas.request_pagination import RequestPagination
 
 notifications_router = APIRouter(tags=["Notifications"])
 
@@ -23,6 +29,7 @@ notifications_router = APIRouter(tags=["Notifications"])
     response_model=notifications.NotificationsResponse,
 )
 async def get_user_notifications(
+    request_pagination: RequestPagination = Depends(paginate),
     notifications_repo: INotificationsRepo = Depends(get_notifications_repo),
     posts_repo: IPostsRepo = Depends(get_posts_repo),
     theses_repo: IThesesRepo = Depends(get_theses_repo),
@@ -31,36 +38,83 @@ async def get_user_notifications(
     """Retrieves all of a user's unacknowledged notifications."""
 
     user_notifications = await notifications_repo.retrieve_many(
-        user_id=authorized_user.user_id
+        user_id=authorized_user.user_id,
+        page_number=request_pagination.page,
+        page_size=request_pagination.records_per_page,
+        cursor=request_pagination.cursor,
+    )
+
+    # Load every post and thesis the notifications refer to, one query for each
+    post_ids = set()
+    thesis_ids = set()
+    for notification in user_notifications:
+        if notification.comment_id:
+            post_ids.add(notification.comment_id)
+        elif notification.type == "POST_REACTION":
+            post_ids.add(notification.affected_post_id)
+        elif notification.type == "THESIS_REACTION":
+            thesis_ids.add(notification.affected_thesis_id)
+
+    posts_by_id, theses_by_id = await asyncio.gather(
+        posts_repo.retrieve_posts_by_ids(
+            post_ids=list(post_ids), requesting_user_id=authorized_user.user_id
+        ),
+        theses_repo.retrieve_theses_by_ids(thesis_ids=list(thesis_ids)),
     )
 
     notificatations_with_comments = []
     for notification in user_notifications:
         notification_raw = notification.dict()
         if notification.comment_id:
-            comment_object = await posts_repo.retrieve_post_with_filter(
-                post_id=notification.comment_id, user_id=authorized_user.user_id
-            )
-            notification_raw["comment"] = comment_object
+            notification_raw["comment"] = posts_by_id.get(notification.comment_id)
         elif notification.type == "POST_REACTION":
-            post_object = await posts_repo.retrieve_post_with_filter(
-                post_id=notification.affected_post_id, user_id=authorized_user.user_id
-            )
-            notification_raw["post"] = post_object
+            notification_raw["post"] = posts_by_id.get(notification.affected_post_id)
         elif notification.type == "THESIS_REACTION":
-            thesis_object = await theses_repo.retrieve_thesis_with_filter(
-                thesis_id=notification.affected_thesis_id
+            notification_raw["thesis"] = theses_by_id.get(
+                notification.affected_thesis_id
             )
-            notification_raw["thesis"] = thesis_object
         notificatations_with_comments.append(
             notifications.NotifcationResponseObject(**notification_raw)
         )
 
     return notifications.NotificationsResponse(
-        notifications=notificatations_with_comments
+        notifications=notificatations_with_comments,
+        next_cursor=get_next_cursor(
+            records=user_notifications,
+            records_per_page=request_pagination.records_per_page,
+            id_field="notification_id",
+        ),
     )
 
 
+@notifications_router.get(
+    "/unread_count",
+    status_code=200,
+    response_model=notifications.UnreadCountResponse,
+    responses={304: {"description": "The unread count has not changed"}},
+)
+async def get_unread_count(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    notifications_repo: INotificationsRepo = Depends(get_notifications_repo),
+    authorized_user: users.UserInDB = Depends(get_current_active_user),
+) -> Union[notifications.UnreadCountResponse, Response]:
+    """Counts a user's unacknowledged notifications, for rendering a badge. Send
+    the returned ETag back in If-None-Match to get a 304 while nothing changed."""
+
+    unread = await notifications_repo.retrieve_unread(user_id=authorized_user.user_id)
+
+    # A new notification raises the latest ID, acknowledging one lowers the count
+    etag = f'W/"{unread.unread_count}-{unread.latest_notification_id or 0}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return notifications.UnreadCountResponse(unread_count=unread.unread_count)
+
+
 @notifications_router.patch(
     "/{notification_id}",
     status_code=HTTP_204_NO_CONTENT,
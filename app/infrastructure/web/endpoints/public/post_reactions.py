@@ -1,23 +1,22 @@
-import math
-
 from fastapi import APIRouter, Body, Depends, Path, Response
 from pydantic import conint
 from starlette.status import HTTP_204_NO_CONTENT
 
 from app.dependencies import (
     get_current_active_user,
-    get_notifications_repo,
+    get_meta_data,
+    get_notification_dispatcher,
     get_post_reactions_query_params,
     get_post_reactions_repo,
     get_posts_repo,
     paginate,
 )
 from app.libraries import pelleum_errors
-from app.usecases.interfaces.notifications_repo import INotificationsRepo
 from app.usecases.interfaces.post_reaction_repo import IPostReactionRepo
 from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.schemas import notifications, post_reactions, users
-from app.usecases.schemas.request_pagination import MetaData, RequestPagination
+from app.usecases.schemas.request_pagination import RequestPagination
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
 
 post_reactions_router = APIRouter(tags=["Post Reactions"])
 
@@ -28,7 +27,9 @@ async def create_post_reaction(
     body: post_reactions.PostReactionRequest = Body(...),
     post_reactions_repo: IPostReactionRepo = Depends(get_post_reactions_repo),
     posts_repo: IPostsRepo = Depends(get_posts_repo),
-    notifications_repo: INotificationsRepo = Depends(get_notifications_repo),
+    notification_dispatcher: NotificationDispatcher = Depends(
+        get_notification_dispatcher
+    ),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
 ) -> None:
 
@@ -47,7 +48,7 @@ async def create_post_reaction(
     await post_reactions_repo.create(post_reaction=post_reaction)
 
     # Insert Notification
-    await notifications_repo.create(
+    await notification_dispatcher.dispatch(
         new_event=notifications.NewEventRepoAdapter(
             type=notifications.EventType.POST_REACTION,
             user_to_notify=post.user_id,
@@ -80,17 +81,17 @@ async def get_many_post_reactions(
         query_params=query_params,
         page_number=request_pagination.page,
         page_size=request_pagination.records_per_page,
+        cursor=request_pagination.cursor,
+        include_total=request_pagination.include_total,
     )
 
     return post_reactions.ManyPostsReactionsResponse(
         records=post_reactions.PostsReactions(posts_reactions=posts_reactions_list),
-        meta_data=MetaData(
-            page=request_pagination.page,
-            records_per_page=request_pagination.records_per_page,
-            total_records=posts_reactions_count,
-            total_pages=math.ceil(
-                posts_reactions_count / request_pagination.records_per_page
-            ),
+        meta_data=get_meta_data(
+            pagination=request_pagination,
+            records=posts_reactions_list,
+            record_count=posts_reactions_count,
+            id_field="user_id" if query_params.post_id else "post_id",
         ),
     )
 
@@ -1,26 +1,27 @@
-import math
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List
 
 from fastapi import APIRouter, Body, Depends, Path, Response
 from pydantic import conint
 from starlette.status import HTTP_204_NO_CONTENT
 
 from app.dependencies import (
-    get_block_data,
     get_current_active_user,
-    get_notifications_repo,
-    get_optional_user,
+    get_meta_data,
+    get_notification_dispatcher,
     get_posts_query_params,
     get_posts_repo,
     get_theses_repo,
+    get_viewer,
     paginate,
 )
+from app.infrastructure.web import serializers
 from app.libraries import pelleum_errors
-from app.usecases.interfaces.notifications_repo import INotificationsRepo
 from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
-from app.usecases.schemas import notifications, posts, theses, users
-from app.usecases.schemas.request_pagination import MetaData, RequestPagination
+from app.usecases.schemas import notifications, posts, users
+from app.usecases.schemas.request_pagination import RequestPagination
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
 
 posts_router = APIRouter(tags=["Posts"])
 
@@ -34,7 +35,9 @@ async def create_new_post(
     body: posts.CreatePostRequest = Body(...),
     posts_repo: IPostsRepo = Depends(get_posts_repo),
     theses_repo: IThesesRepo = Depends(get_theses_repo),
-    notifications_repo: INotificationsRepo = Depends(get_notifications_repo),
+    notification_dispatcher: NotificationDispatcher = Depends(
+        get_notification_dispatcher
+    ),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
 ) -> posts.PostResponse:
     """Creates a new post. This can be a stand-alone post, a post comment, or a
@@ -91,7 +94,7 @@ async def create_new_post(
     # If post was a comment, insert comment notification
     if body.is_post_comment_on or body.is_thesis_comment_on:
         event.comment_id = created_post.post_id
-        await notifications_repo.create(new_event=event)
+        await notification_dispatcher.dispatch(new_event=event)
 
     return created_post
 
@@ -100,17 +103,17 @@ async def create_new_post(
     "/{post_id}",
     status_code=200,
     response_model=posts.PostResponse,
+    response_class=serializers.RawJSONResponse,
 )
 async def get_post(
     post_id: conint(gt=0, lt=100000000000) = Path(...),
     posts_repo: IPostsRepo = Depends(get_posts_repo),
-    user_block_data: users.BlockData = Depends(get_block_data),
-    optional_user: Optional[users.UserInDB] = Depends(get_optional_user),
-) -> posts.PostResponse:
+    viewer: users.Viewer = Depends(get_viewer),
+) -> serializers.RawJSONResponse:
 
     # 1. Retrieve the post (if not optional user, user_id = 1... something that does not exist)
     post = await posts_repo.retrieve_post_with_filter(
-        post_id=post_id, user_id=optional_user.user_id if optional_user else -1
+        post_id=post_id, user_id=viewer.user.user_id if viewer.user else -1
     )
 
     if not post:
@@ -120,42 +123,34 @@ async def get_post(
 
     # 2. If user is blocked, prevent access
     if (
-        post.user_id in user_block_data.user_blocks
-        or post.user_id in user_block_data.user_blocked_by
+        post.user_id in viewer.block_data.user_blocks
+        or post.user_id in viewer.block_data.user_blocked_by
     ):
         raise await pelleum_errors.PelleumErrors(
             detail="You're account has been blocked by the user of this resource."
         ).access_forbidden()
 
     # 3. Format the post
-    post_raw = post.dict()
-    thesis_object_raw = {}
-    for key, value in post_raw.items():
-        if key[0:7] == "thesis_" and value is not None:
-            thesis_object_raw[key[7:]] = value
-    return posts.PostResponse(
-        thesis=theses.ThesisInDB(**thesis_object_raw) if thesis_object_raw else None,
-        **post_raw
-    )
+    return serializers.RawJSONResponse(content=serializers.dump_post_response(post))
 
 
 @posts_router.get(
     "/retrieve/many",
     status_code=200,
     response_model=posts.ManyPostsResponse,
+    response_class=serializers.RawJSONResponse,
 )
 async def get_many_posts(
     query_params: posts.PostQueryParams = Depends(get_posts_query_params),
     request_pagination: RequestPagination = Depends(paginate),
     posts_repo: IPostsRepo = Depends(get_posts_repo),
-    user_block_data: users.BlockData = Depends(get_block_data),
-    optional_user: users.UserInDB = Depends(get_optional_user),
-) -> posts.ManyPostsResponse:
+    viewer: users.Viewer = Depends(get_viewer),
+) -> serializers.RawJSONResponse:
     """This endpoint returns many posts based on query parameters that were sent to it."""
 
     query_params_raw = query_params.dict()
     query_params_raw.update(
-        {"requesting_user_id": optional_user.user_id if optional_user else -1}
+        {"requesting_user_id": viewer.user.user_id if viewer.user else -1}
     )
     query_params = posts.PostQueryRepoAdapter(**query_params_raw)
 
@@ -164,49 +159,38 @@ async def get_many_posts(
         query_params=query_params,
         page_number=request_pagination.page,
         page_size=request_pagination.records_per_page,
+        cursor=request_pagination.cursor,
+        include_total=request_pagination.include_total,
+        excluded_user_ids=viewer.block_data.user_blocks
+        | viewer.block_data.user_blocked_by,
     )
 
-    # 2. Filter blocked parent posts
-    filtered_parent_posts = await filter_blocked_content(
-        posts_list=posts_list, user_block_data=user_block_data
-    )
-
-    # 3. For each post, retrieve comments and update post object along the way
+    # 2. For each post, retrieve comments and update post object along the way
     posts_with_replies = await get_and_add_replies(
-        posts_list=filtered_parent_posts,
+        posts_list=posts_list,
         posts_repo=posts_repo,
-        user_id=optional_user.user_id if optional_user else -1,
-        user_block_data=user_block_data,
+        user_id=viewer.user.user_id if viewer.user else -1,
+        user_block_data=viewer.block_data,
         get_max_levels=True
         if query_params.is_post_comment_on or query_params.is_thesis_comment_on
         else False,
     )
 
-    # 4. Format the data
-    formatted_posts = []
-    for post in posts_with_replies:
-        post_raw = post.dict()
-        thesis_object_raw = {}
-        for key, value in post_raw.items():
-            if key[0:7] == "thesis_" and value is not None:
-                thesis_object_raw[key[7:]] = value
-        formatted_posts.append(
-            posts.PostResponse(
-                thesis=theses.ThesisInDB(**thesis_object_raw)
-                if thesis_object_raw
-                else None,
-                **post_raw
-            )
+    # 3. Format the data. The posts were validated when they were loaded, so they
+    # are written straight to JSON rather than through response_model again
+    return serializers.RawJSONResponse(
+        content=serializers.dump_page(
+            records_key="posts",
+            records=[
+                serializers.dump_post_response(post) for post in posts_with_replies
+            ],
+            meta_data=get_meta_data(
+                pagination=request_pagination,
+                records=posts_list,
+                record_count=post_count,
+                id_field="post_id",
+            ),
         )
-
-    return posts.ManyPostsResponse(
-        records=posts.Posts(posts=formatted_posts),
-        meta_data=MetaData(
-            page=request_pagination.page,
-            records_per_page=request_pagination.records_per_page,
-            total_records=post_count,
-            total_pages=math.ceil(post_count / request_pagination.records_per_page),
-        ),
     )
 
 
@@ -239,70 +223,54 @@ async def get_and_add_replies(
     get_max_levels=False,
 ) -> List[posts.PostInfoFromDB]:
     """This function grabs up to 3 levels of replies (if get_max_levels is True).
-    Else, it will grab 1 level or replies"""
+    Else, it will grab 1 level or replies. Every level is retrieved in a single
+    query, and the comment trees are assembled in memory."""
+
+    max_depth = 3 if get_max_levels else 1
+    parent_post_ids = [post.post_id for post in posts_list if post.comment_count > 0]
+
+    if not parent_post_ids:
+        return posts_list
+
+    replies = await posts_repo.retrieve_replies_for_posts(
+        post_ids=parent_post_ids, requesting_user_id=user_id, max_depth=max_depth
+    )
+
+    # Filter blocked content and group replies by the post they reply to
+    filtered_replies = await filter_blocked_content(
+        posts_list=replies, user_block_data=user_block_data
+    )
+    replies_by_parent = defaultdict(list)
+    for reply in filtered_replies:
+        replies_by_parent[reply.is_post_comment_on].append(reply)
+
+    await add_replies_to_tree(
+        posts_list=posts_list,
+        replies_by_parent=replies_by_parent,
+        levels_remaining=max_depth,
+    )
+
+    return posts_list
+
+
+async def add_replies_to_tree(
+    posts_list: List[posts.PostInfoFromDB],
+    replies_by_parent: Dict[int, List[posts.PostInfoFromDB]],
+    levels_remaining: int,
+) -> None:
+    """Attaches replies to their parent posts, one level at a time"""
+
+    if levels_remaining == 0:
+        return
 
     for post in posts_list:
         if post.comment_count > 0:
-            first_order_replies, _ = await posts_repo.retrieve_many_with_filter(
-                query_params=posts.PostQueryRepoAdapter(
-                    requesting_user_id=user_id, is_post_comment_on=post.post_id
-                ),
-                page_number=1,
-                page_size=15,
+            post.replies = replies_by_parent.get(post.post_id, [])
+            await add_replies_to_tree(
+                posts_list=post.replies,
+                replies_by_parent=replies_by_parent,
+                levels_remaining=levels_remaining - 1,
             )
-            # Filter blocked content and save
-            filtered_first_order_replies = await filter_blocked_content(
-                posts_list=first_order_replies, user_block_data=user_block_data
-            )
-            post.replies = filtered_first_order_replies
-
-            # For PostDetail, grab all levels. For feed, stop after one level of replies
-            if get_max_levels:
-                for reply in post.replies:
-                    if reply.comment_count > 0:
-                        (
-                            second_order_replies,
-                            _,
-                        ) = await posts_repo.retrieve_many_with_filter(
-                            query_params=posts.PostQueryRepoAdapter(
-                                requesting_user_id=user_id,
-                                is_post_comment_on=reply.post_id,
-                            ),
-                            page_number=1,
-                            page_size=5,
-                        )
-
-                        # Filter blocked content and save
-                        filtered_second_order_replies = await filter_blocked_content(
-                            posts_list=second_order_replies,
-                            user_block_data=user_block_data,
-                        )
-                        reply.replies = filtered_second_order_replies
-
-                        for reply in reply.replies:
-                            if reply.comment_count > 0:
-                                (
-                                    third_order_replies,
-                                    _,
-                                ) = await posts_repo.retrieve_many_with_filter(
-                                    query_params=posts.PostQueryRepoAdapter(
-                                        requesting_user_id=user_id,
-                                        is_post_comment_on=reply.post_id,
-                                    ),
-                                    page_number=1,
-                                    page_size=5,
-                                )
-
-                                # Filter blocked content and save
-                                filtered_third_order_replies = (
-                                    await filter_blocked_content(
-                                        posts_list=third_order_replies,
-                                        user_block_data=user_block_data,
-                                    )
-                                )
-                                reply.replies = filtered_third_order_replies
-
-    return posts_list
 
 
 async def filter_blocked_content(
@@ -1,23 +1,25 @@
-import math
 from typing import Union
 
 from fastapi import APIRouter, Body, Depends, Path, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import conint
 from starlette.status import HTTP_204_NO_CONTENT
 
 from app.dependencies import (
     get_current_active_user,
+    get_meta_data,
     get_rationales_query_params,
     get_rationales_repo,
     get_theses_repo,
     paginate,
 )
+from app.infrastructure.web import serializers
 from app.libraries import pelleum_errors
 from app.settings import settings
 from app.usecases.interfaces.rationales_repo import IRationalesRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
-from app.usecases.schemas import rationales, theses, users
-from app.usecases.schemas.request_pagination import MetaData, RequestPagination
+from app.usecases.schemas import rationales, users
+from app.usecases.schemas.request_pagination import RequestPagination
 
 rationale_router = APIRouter(tags=["Rationales"])
 
@@ -28,6 +30,7 @@ rationale_router = APIRouter(tags=["Rationales"])
     response_model=Union[
         rationales.RationaleResponse, rationales.MaxRationaleReachedResponse
     ],
+    response_class=ORJSONResponse,
 )
 async def add_thesis_to_rationales(
     response: Response,
@@ -35,7 +38,7 @@ async def add_thesis_to_rationales(
     theses_repo: IThesesRepo = Depends(get_theses_repo),
     rationales_repo: IRationalesRepo = Depends(get_rationales_repo),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
-) -> Union[rationales.RationaleResponse, rationales.MaxRationaleReachedResponse]:
+) -> Union[serializers.RawJSONResponse, rationales.MaxRationaleReachedResponse]:
     """Adds a thesis to a user's "rationale library"."""
 
     thesis = await theses_repo.retrieve_thesis_with_filter(thesis_id=body.thesis_id)
@@ -51,7 +54,7 @@ async def add_thesis_to_rationales(
         sentiment=thesis.sentiment,
     )
     users_rationales, _ = await rationales_repo.retrieve_many_rationales_with_filter(
-        query_params=query_params
+        query_params=query_params, include_total=False
     )
 
     if len(users_rationales) >= settings.max_rationale_limit:
@@ -66,15 +69,9 @@ async def add_thesis_to_rationales(
     )
 
     # 2. Format the data
-    rationale_raw = rationale_with_thesis.dict()
-    thesis_object_raw = {}
-    for key, value in rationale_raw.items():
-        if key[0:7] == "thesis_" and value is not None:
-            thesis_object_raw[key[7:]] = value
-
-    return rationales.RationaleResponse(
-        thesis=theses.ThesisInDB(**thesis_object_raw) if thesis_object_raw else None,
-        **rationale_raw,
+    return serializers.RawJSONResponse(
+        content=serializers.dump_rationale_response(rationale_with_thesis),
+        status_code=201,
     )
 
 
@@ -82,6 +79,7 @@ async def add_thesis_to_rationales(
     "/retrieve/many",
     status_code=200,
     response_model=rationales.ManyRationalesResponse,
+    response_class=serializers.RawJSONResponse,
 )
 async def get_many_rationales(
     query_params: rationales.RationaleQueryParams = Depends(
@@ -90,7 +88,7 @@ async def get_many_rationales(
     request_pagination: RequestPagination = Depends(paginate),
     rationales_repo: IRationalesRepo = Depends(get_rationales_repo),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
-) -> rationales.ManyRationalesResponse:
+) -> serializers.RawJSONResponse:
     """This endpoint returns many rationales based on supplied query parameters."""
 
     # 1. if no user_id is supplied, use requesting user, else use suplied user
@@ -107,35 +105,26 @@ async def get_many_rationales(
         query_params=query_params,
         page_number=request_pagination.page,
         page_size=request_pagination.records_per_page,
+        cursor=request_pagination.cursor,
+        include_total=request_pagination.include_total,
     )
 
-    # 2. Format the data
-    formatted_rationales = []
-    for rationale in retrieved_rationales:
-        rationale_raw = rationale.dict()
-        thesis_object_raw = {}
-        for key, value in rationale_raw.items():
-            if key[0:7] == "thesis_" and value is not None:
-                thesis_object_raw[key[7:]] = value
-        formatted_rationales.append(
-            rationales.RationaleResponse(
-                thesis=theses.ThesisInDB(**thesis_object_raw)
-                if thesis_object_raw
-                else None,
-                **rationale_raw,
-            )
-        )
-
-    return rationales.ManyRationalesResponse(
-        records=rationales.Rationales(rationales=formatted_rationales),
-        meta_data=MetaData(
-            page=request_pagination.page,
-            records_per_page=request_pagination.records_per_page,
-            total_records=rationales_count,
-            total_pages=math.ceil(
-                rationales_count / request_pagination.records_per_page
+    # 2. Format the data. The rationales were validated when they were loaded, so
+    # they are written straight to JSON rather than through response_model again
+    return serializers.RawJSONResponse(
+        content=serializers.dump_page(
+            records_key="rationales",
+            records=[
+                serializers.dump_rationale_response(rationale)
+                for rationale in retrieved_rationales
+            ],
+            meta_data=get_meta_data(
+                pagination=request_pagination,
+                records=retrieved_rationales,
+                record_count=rationales_count,
+                id_field="rationale_id",
             ),
-        ),
+        )
     )
 
 
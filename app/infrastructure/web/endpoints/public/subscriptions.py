@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Body, Depends, Path, Request, Response
 
 from app.dependencies.auth import get_current_active_user
-from app.dependencies.repos import get_subscriptions_repo
-from app.dependencies.stripe import get_stripe_client
+from app.dependencies.repos import get_stripe_events_repo, get_subscriptions_repo
+from app.dependencies.stripe import get_stripe_client, get_stripe_event_worker
 from app.usecases.interfaces.clients.stripe import IStripeClient
+from app.usecases.interfaces.stripe_events_repo import IStripeEventsRepo
 from app.usecases.interfaces.subscriptions_repo import ISubscriptionsRepo
 from app.usecases.schemas import subscriptions, users
+from app.usecases.services.stripe_events import StripeEventWorker
 
 subscriptions_router = APIRouter(tags=["Subscriptions"])
 
@@ -109,9 +111,11 @@ async def webhook_received(
     request: Request,
     response: Response,
     stripe_client: IStripeClient = Depends(get_stripe_client),
-    subscriptions_repo: ISubscriptionsRepo = Depends(get_subscriptions_repo),
+    stripe_events_repo: IStripeEventsRepo = Depends(get_stripe_events_repo),
+    stripe_event_worker: StripeEventWorker = Depends(get_stripe_event_worker),
 ) -> Response:
-    """Listens for webhook calls from Stripe"""
+    """Listens for webhook calls from Stripe. Verified events are queued and
+    acknowledged right away, and the Stripe event worker applies them."""
 
     # Retrieve the event by verifying the signature using the raw body and secret if webhook signing is configured.
     signature = request.headers.get("stripe-signature")
@@ -121,35 +125,9 @@ async def webhook_received(
         sig_header=signature,
     )
 
-    data = event.data
-    event_type = event.event_type
-    data_object = data["object"]
-
-    if event_type == "invoice.paid":
-        if stripe_subscription_id := data_object["subscription"]:
-            updated_record = subscriptions.SubscriptionRepoUpdate(
-                stripe_subscription_id=stripe_subscription_id, is_active=True
-            )
-            await subscriptions_repo.update(updated_subscription=updated_record)
-    elif event_type == "invoice.payment_failed":
-        if stripe_subscription_id := data_object["subscription"]:
-            updated_record = subscriptions.SubscriptionRepoUpdate(
-                stripe_subscription_id=stripe_subscription_id, is_active=False
-            )
-            await subscriptions_repo.update(updated_subscription=updated_record)
-    elif event_type == "invoice.payment_succeeded":
-        if data_object["billing_reason"] == "subscription_create":
-            stripe_subscription_id = data_object["subscription"]
-            payment_intent_id = data_object["payment_intent"]
-
-            payment_intent = await stripe_client.retrieve_payment_intent(
-                payment_intent_id
-            )
-
-            await stripe_client.modify_subscription(
-                stripe_subscription_id=stripe_subscription_id,
-                default_payment_method=payment_intent.payment_method,
-            )
+    # Redelivered events are already queued, so only new ones wake the worker
+    if await stripe_events_repo.create(event=event):
+        stripe_event_worker.notify()
 
     response.status_code = 200
     return response
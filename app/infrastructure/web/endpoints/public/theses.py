@@ -1,21 +1,19 @@
-import math
-
 from fastapi import APIRouter, Body, Depends, Path, Response
 from pydantic import conint
 from starlette.status import HTTP_204_NO_CONTENT
 
 from app.dependencies import (
-    get_block_data,
     get_current_active_user,
-    get_optional_user,
+    get_meta_data,
     get_theses_query_params,
     get_theses_repo,
+    get_viewer,
     paginate,
 )
 from app.libraries import pelleum_errors
 from app.usecases.interfaces.theses_repo import IThesesRepo
 from app.usecases.schemas import theses, users
-from app.usecases.schemas.request_pagination import MetaData, RequestPagination
+from app.usecases.schemas.request_pagination import RequestPagination
 
 theses_router = APIRouter(tags=["Theses"])
 
@@ -89,12 +87,11 @@ async def update_thesis(
 async def get_thesis(
     thesis_id: conint(gt=0, lt=100000000000) = Path(...),
     theses_repo: IThesesRepo = Depends(get_theses_repo),
-    user_block_data: users.BlockData = Depends(get_block_data),
-    optional_user: users.UserInDB = Depends(get_optional_user),
+    viewer: users.Viewer = Depends(get_viewer),
 ) -> theses.ThesisResponse:
 
     thesis = await theses_repo.retrieve_thesis_with_reaction(
-        thesis_id=thesis_id, user_id=optional_user.user_id if optional_user else -1
+        thesis_id=thesis_id, user_id=viewer.user.user_id if viewer.user else -1
     )
 
     # 1. Ensure resource exists
@@ -105,8 +102,8 @@ async def get_thesis(
 
     # 2. If user is blocked, prevent access
     if (
-        thesis.user_id in user_block_data.user_blocks
-        or thesis.user_id in user_block_data.user_blocked_by
+        thesis.user_id in viewer.block_data.user_blocks
+        or thesis.user_id in viewer.block_data.user_blocked_by
     ):
         raise await pelleum_errors.PelleumErrors(
             detail="You're account has been blocked by the user of this resource."
@@ -124,7 +121,7 @@ async def get_many_theses(
     query_params: theses.ThesesQueryParams = Depends(get_theses_query_params),
     request_pagination: RequestPagination = Depends(paginate),
     theses_repo: IThesesRepo = Depends(get_theses_repo),
-    user_block_data: users.BlockData = Depends(get_block_data),
+    viewer: users.Viewer = Depends(get_viewer),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
 ) -> theses.ManyThesesResponse:
     """This endpiont returns many theses based on query parameters that were sent to it."""
@@ -139,27 +136,19 @@ async def get_many_theses(
         user_id=authorized_user.user_id,
         page_number=request_pagination.page,
         page_size=request_pagination.records_per_page,
+        cursor=request_pagination.cursor,
+        include_total=request_pagination.include_total,
+        excluded_user_ids=viewer.block_data.user_blocks
+        | viewer.block_data.user_blocked_by,
     )
 
-    # 2. Remove blocked content
-    if user_block_data.user_blocks or user_block_data.user_blocked_by:
-        filtered_theses = []
-        for post in theses_list:
-            if (
-                post.user_id not in user_block_data.user_blocks
-                and post.user_id not in user_block_data.user_blocked_by
-            ):
-                filtered_theses.append(post)
-    else:
-        filtered_theses = theses_list
-
     return theses.ManyThesesResponse(
-        records=theses.Theses(theses=filtered_theses),
-        meta_data=MetaData(
-            page=request_pagination.page,
-            records_per_page=request_pagination.records_per_page,
-            total_records=theses_count,
-            total_pages=math.ceil(theses_count / request_pagination.records_per_page),
+        records=theses.Theses(theses=theses_list),
+        meta_data=get_meta_data(
+            pagination=request_pagination,
+            records=theses_list,
+            record_count=theses_count,
+            id_field="thesis_id",
         ),
     )
 
@@ -1,23 +1,22 @@
-import math
-
 from fastapi import APIRouter, Body, Depends, Path, Response
 from pydantic import conint
 from starlette.status import HTTP_204_NO_CONTENT
 
 from app.dependencies import (
     get_current_active_user,
-    get_notifications_repo,
+    get_meta_data,
+    get_notification_dispatcher,
     get_theses_repo,
     get_thesis_reactions_query_params,
     get_thesis_reactions_repo,
     paginate,
 )
 from app.libraries import pelleum_errors
-from app.usecases.interfaces.notifications_repo import INotificationsRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
 from app.usecases.interfaces.thesis_reaction_repo import IThesisReactionRepo
 from app.usecases.schemas import notifications, thesis_reactions, users
-from app.usecases.schemas.request_pagination import MetaData, RequestPagination
+from app.usecases.schemas.request_pagination import RequestPagination
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
 
 thesis_reactions_router = APIRouter(tags=["Thesis Reactions"])
 
@@ -28,7 +27,9 @@ async def create_thesis_reaction(
     body: thesis_reactions.ThesisReactionRequest = Body(...),
     thesis_reactions_repo: IThesisReactionRepo = Depends(get_thesis_reactions_repo),
     theses_repo: IThesesRepo = Depends(get_theses_repo),
-    notifications_repo: INotificationsRepo = Depends(get_notifications_repo),
+    notification_dispatcher: NotificationDispatcher = Depends(
+        get_notification_dispatcher
+    ),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
 ) -> None:
 
@@ -65,7 +66,7 @@ async def create_thesis_reaction(
     await thesis_reactions_repo.create(thesis_reaction=thesis_reaction)
 
     # Insert Notification
-    await notifications_repo.create(
+    await notification_dispatcher.dispatch(
         new_event=notifications.NewEventRepoAdapter(
             type=notifications.EventType.THESIS_REACTION,
             user_to_notify=thesis.user_id,
@@ -148,19 +149,19 @@ async def get_many_thesis_reactions(
         query_params=query_params,
         page_number=request_pagination.page,
         page_size=request_pagination.records_per_page,
+        cursor=request_pagination.cursor,
+        include_total=request_pagination.include_total,
     )
 
     return thesis_reactions.ManyThesesReactionsResponse(
         records=thesis_reactions.ThesesReactions(
             theses_reactions=theses_reactions_list
         ),
-        meta_data=MetaData(
-            page=request_pagination.page,
-            records_per_page=request_pagination.records_per_page,
-            total_records=theses_reactions_count,
-            total_pages=math.ceil(
-                theses_reactions_count / request_pagination.records_per_page
-            ),
+        meta_data=get_meta_data(
+            pagination=request_pagination,
+            records=theses_reactions_list,
+            record_count=theses_reactions_count,
+            id_field="user_id" if query_params.thesis_id else "thesis_id",
         ),
     )
 
@@ -8,10 +8,8 @@ from starlette.status import HTTP_204_NO_CONTENT
 
 from app.dependencies import (
     create_access_token,
-    get_block_data,
     get_current_active_user,
-    get_optional_user,
-    get_password_context,
+    get_password_hasher,
     get_portfolio_repo,
     get_users_repo,
     validate_email,
@@ -47,7 +45,9 @@ async def login_for_access_token(
         ).invalid_credentials()
 
     access_token = await create_access_token(
-        data=auth.AuthDataToCreateToken(sub=user.username)
+        data=auth.AuthDataToCreateToken(
+            sub=user.username, user_id=user.user_id, is_active=user.is_active
+        )
     )
 
     return users.UserWithAuthTokenResponse(
@@ -71,12 +71,16 @@ async def create_new_user(
     await validate_inputs(users_repo=users_repo, data=body)
 
     # 2. Create new user object
-    password_context = await get_password_context()
-    new_user = await users_repo.create(new_user=body, password_context=password_context)
+    password_hasher = await get_password_hasher()
+    new_user = await users_repo.create(new_user=body, password_hasher=password_hasher)
     new_user_raw = new_user.dict()
 
     access_token = await create_access_token(
-        data=auth.AuthDataToCreateToken(sub=body.username)
+        data=auth.AuthDataToCreateToken(
+            sub=new_user.username,
+            user_id=new_user.user_id,
+            is_active=new_user.is_active,
+        )
     )
 
     return users.UserWithAuthTokenResponse(
@@ -100,16 +104,20 @@ async def update_user(
     await validate_inputs(users_repo=users_repo, data=body)
 
     # 2. Update user
-    password_context = await get_password_context()
+    password_hasher = await get_password_hasher()
     updated_user = await users_repo.update(
         updated_user=body,
         user_id=authorized_user.user_id,
-        password_context=password_context,
+        password_hasher=password_hasher,
     )
     updated_user_raw = updated_user.dict()
 
     access_token = await create_access_token(
-        data=auth.AuthDataToCreateToken(sub=updated_user.username)
+        data=auth.AuthDataToCreateToken(
+            sub=updated_user.username,
+            user_id=updated_user.user_id,
+            is_active=updated_user.is_active,
+        )
     )
 
     return users.UserWithAuthTokenResponse(
@@ -128,7 +136,6 @@ async def get_current_user(
 async def get_user_by_id(
     user_id: conint(gt=0, lt=100000000000) = Path(...),
     users_repo: IUsersRepo = Depends(get_users_repo),
-    optional_user: users.UserInDB = Depends(get_optional_user),
 ) -> users.UserByIdResponse:
 
     user = await users_repo.retrieve_user_with_filter(user_id=user_id)
@@ -173,7 +180,6 @@ async def validate_inputs(
 async def block_user(
     blocked_user_id: conint(gt=0, lt=100000000000) = Path(...),
     users_repo: IUsersRepo = Depends(get_users_repo),
-    user_block_data: users.BlockData = Depends(get_block_data),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
 ) -> None:
     """Block a user."""
@@ -185,17 +191,15 @@ async def block_user(
             detail="The supplied user_id is invalid."
         ).invalid_resource_id()
 
-    # 2. Ensure the soon-to-be blocked user is not already blocked
-    if user_block_data.user_blocks:
-        if blocked_user_id in user_block_data.user_blocks:
-            raise await pelleum_errors.PelleumErrors(
-                detail="The supplied user_id is already blocked."
-            ).invalid_resource_id()
-
-    # 3. Add block to database
-    await users_repo.add_block(
+    # 2. Add block to database, ensuring the user wasn't already blocked. Checked
+    # against the write itself, as cached block sets may be stale
+    block_added = await users_repo.add_block(
         initiating_user_id=authorized_user.user_id, receiving_user_id=blocked_user_id
     )
+    if not block_added:
+        raise await pelleum_errors.PelleumErrors(
+            detail="The supplied user_id is already blocked."
+        ).invalid_resource_id()
 
 
 @auth_router.delete(
@@ -206,7 +210,6 @@ async def block_user(
 async def unblock_user(
     blocked_user_id: conint(gt=0, lt=100000000000) = Path(...),
     users_repo: IUsersRepo = Depends(get_users_repo),
-    user_block_data: users.BlockData = Depends(get_block_data),
     authorized_user: users.UserInDB = Depends(get_current_active_user),
 ) -> None:
     """Un-block a user."""
@@ -218,18 +221,11 @@ async def unblock_user(
             detail="The supplied user_id is invalid."
         ).invalid_resource_id()
 
-    # 2. Ensure the soon-to-be unblocked user is, in fact, blocked
-    if not user_block_data.user_blocks:
-        raise await pelleum_errors.PelleumErrors(
-            detail="The supplied user_id is not currently blocked, so can't unblock."
-        ).invalid_resource_id()
-
-    if blocked_user_id not in user_block_data.user_blocks:
+    # 2. Remove block from database, ensuring the user was, in fact, blocked
+    block_removed = await users_repo.remove_block(
+        initiating_user_id=authorized_user.user_id, receiving_user_id=blocked_user_id
+    )
+    if not block_removed:
         raise await pelleum_errors.PelleumErrors(
             detail="The supplied user_id is not currently blocked, so can't unblock."
         ).invalid_resource_id()
-
-    # 3. Remove block from database
-    await users_repo.remove_block(
-        initiating_user_id=authorized_user.user_id, receiving_user_id=blocked_user_id
-    )
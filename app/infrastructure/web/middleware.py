@@ -0,0 +1,32 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.infrastructure.db.instrumentation import (
+    finish_request_query_count,
+    start_request_query_count,
+)
+
+
+class QueryCountMiddleware:
+    """Records how many queries each request issued, labelled by the endpoint that
+    handled it."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request_query_count()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Routing adds the endpoint to the scope; unmatched paths have none
+            endpoint = scope.get("endpoint")
+            route = (
+                f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+                if endpoint
+                else "unmatched"
+            )
+            finish_request_query_count(token=token, route=route)
@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi import Response
+
+from app.usecases.schemas import posts, rationales
+from app.usecases.schemas.request_pagination import MetaData
+
+# Response fields, in the order the response models declare them
+POST_FIELDS = tuple(
+    field for field in posts.PostWithReactionData.__fields__ if field != "replies"
+)
+RATIONALE_FIELDS = tuple(rationales.RationaleInDb.__fields__)
+
+
+class RawJSONResponse(Response):
+    """A response whose content is already encoded as JSON"""
+
+    media_type = "application/json"
+
+
+def build_post(post: posts.PostWithReactionData) -> Dict[str, Any]:
+    """A post and its replies, shaped like PostWithReactionData"""
+
+    post_raw = {field: getattr(post, field) for field in POST_FIELDS}
+    post_raw["replies"] = (
+        [build_post(reply) for reply in post.replies]
+        if post.replies is not None
+        else None
+    )
+    return post_raw
+
+
+def dump_with_thesis(record_raw: Dict[str, Any], thesis_json: Optional[str]) -> bytes:
+    """record_raw as a JSON object, with the thesis JSON built by Postgres copied in
+    under thesis as is, rather than parsed and encoded again."""
+
+    thesis = thesis_json.encode() if thesis_json is not None else b"null"
+    return orjson.dumps(record_raw)[:-1] + b',"thesis":' + thesis + b"}"
+
+
+def dump_post_response(post: posts.PostInfoFromDB) -> bytes:
+    """A post shaped like PostResponse, as JSON"""
+
+    return dump_with_thesis(build_post(post), thesis_json=post.thesis_json)
+
+
+def dump_rationale_response(rationale: rationales.RationaleWithThesis) -> bytes:
+    """A rationale shaped like RationaleResponse, as JSON"""
+
+    rationale_raw = {field: getattr(rationale, field) for field in RATIONALE_FIELDS}
+    return dump_with_thesis(rationale_raw, thesis_json=rationale.thesis_json)
+
+
+def dump_page(records_key: str, records: List[bytes], meta_data: MetaData) -> bytes:
+    """A page of records already encoded as JSON, shaped like the Many*Response
+    models: {"records": {records_key: [...]}, "meta_data": {...}}"""
+
+    return b"".join(
+        [
+            b'{"records":{"',
+            records_key.encode(),
+            b'":[',
+            b",".join(records),
+            b']},"meta_data":',
+            orjson.dumps(meta_data.dict()),
+            b"}",
+        ]
+    )
@@ -3,9 +3,15 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.dependencies import get_client_session, get_event_loop
+from app.dependencies import (
+    get_client_session,
+    get_event_loop,
+    get_notification_dispatcher,
+    get_password_hasher,
+    get_stripe_event_worker,
+)
 from app.infrastructure.db.core import get_or_create_database
-from app.infrastructure.web.endpoints import health
+from app.infrastructure.web.endpoints import health, metrics
 from app.infrastructure.web.endpoints.private import example as example_private
 from app.infrastructure.web.endpoints.public import (
     account_connections,
@@ -19,6 +25,7 @@ from app.infrastructure.web.endpoints.public import (
     thesis_reactions,
     users,
 )
+from app.infrastructure.web.middleware import QueryCountMiddleware
 from app.settings import settings
 
 
@@ -45,6 +52,7 @@ def setup_app():
     )
     app.include_router(example_private.example_private_router, prefix="/private")
     app.include_router(health.health_router, prefix="/health")
+    app.include_router(metrics.metrics_router, prefix="/metrics")
     app.include_router(
         subscriptions.subscriptions_router, prefix="/public/subscriptions"
     )
@@ -61,6 +69,7 @@ def setup_app():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(QueryCountMiddleware)
 
     return app
 
@@ -73,14 +82,33 @@ async def startup_event():
     await get_event_loop()
     await get_client_session()
     await get_or_create_database()
+    await get_password_hasher()
+
+    stripe_event_worker = await get_stripe_event_worker()
+    stripe_event_worker.start()
+
+    notification_dispatcher = await get_notification_dispatcher()
+    notification_dispatcher.start()
 
 
 @fastapi_app.on_event("shutdown")
 async def shutdown_event():
+    # Write out queued notifications while the database is still connected
+    notification_dispatcher = await get_notification_dispatcher()
+    await notification_dispatcher.stop()
+
+    # Stop the Stripe event worker; unfinished events are picked up on restart
+    stripe_event_worker = await get_stripe_event_worker()
+    await stripe_event_worker.stop()
+
     # Close client session
     client_session = await get_client_session()
     await client_session.close()
 
+    # Stop the password hashing workers
+    password_hasher = await get_password_hasher()
+    password_hasher.shutdown()
+
     # Close database connection once db exists
     DATABASE = await get_or_create_database()
     if DATABASE.is_connected:
@@ -0,0 +1,92 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond lookups up to slow queries
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """A cumulative histogram in the shape Prometheus expects: a count per upper
+    bound, plus the overall count and sum."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        cumulative_counts = []
+        running_count = 0
+
+        for upper_bound, bucket_count in zip(
+            self.buckets + (float("inf"),), self.bucket_counts
+        ):
+            running_count += bucket_count
+            cumulative_counts.append(
+                (
+                    "+Inf" if upper_bound == float("inf") else repr(upper_bound),
+                    running_count,
+                )
+            )
+
+        return cumulative_counts
+
+
+class HistogramFamily:
+    """Histograms sharing a name and buckets, one per label value."""
+
+    def __init__(
+        self, name: str, description: str, label: str, buckets: Sequence[float]
+    ):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+
+    def observe(self, label_value: str, value: float) -> None:
+        histogram = self.histograms.get(label_value)
+        if histogram is None:
+            histogram = self.histograms[label_value] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+
+        for label_value, histogram in sorted(self.histograms.items()):
+            label = f'{self.label}="{label_value}"'
+            for upper_bound, count in histogram.cumulative_counts():
+                yield f'{self.name}_bucket{{{label},le="{upper_bound}"}} {count}'
+            yield f"{self.name}_count{{{label}}} {histogram.count}"
+            yield f"{self.name}_sum{{{label}}} {histogram.sum}"
+
+    def clear(self) -> None:
+        self.histograms.clear()
+
+
+def render_gauge(name: str, description: str, value: float) -> Iterable[str]:
+    yield f"# HELP {name} {description}"
+    yield f"# TYPE {name} gauge"
+    yield f"{name} {value}"
@@ -0,0 +1,92 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.libraries import pelleum_errors
+
+
+def create_password_context(bcrypt_rounds: int) -> CryptContext:
+    """Builds the password hashing policy. Pinning the bcrypt cost as both the minimum
+    and maximum marks hashes made with any other cost as deprecated, so they get
+    rehashed the next time their user logs in."""
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+    )
+
+
+class PasswordHasher:
+    """Runs password hashing and verification on a bounded thread pool, so bcrypt's
+    CPU work doesn't stall the event loop. Once every worker is busy and the queue
+    is full, further calls are rejected with a 503 instead of piling up."""
+
+    def __init__(
+        self,
+        password_context: CryptContext,
+        max_workers: int,
+        max_queue: int,
+        retry_after: int,
+    ):
+        self.password_context = password_context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hashing"
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.max_workers, 0)
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise await pelleum_errors.PelleumErrors(
+                detail="The server is busy. Please try again shortly."
+            ).service_unavailable(retry_after=self.retry_after)
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(function, *args)
+            )
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.password_context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.password_context.verify, password, hashed_password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verifies a password, also returning a new hash for it if the stored hash
+        no longer matches the hashing policy"""
+
+        return await self._run(
+            self.password_context.verify_and_update, password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
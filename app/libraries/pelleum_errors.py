@@ -93,6 +93,15 @@ class PelleumErrors:
             detail="The maximum amount of supporting sources is 10.",
         )
 
+    async def service_unavailable(self, retry_after: int = 1):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=self.detail
+            if self.detail
+            else "The service is temporarily unavailable.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
     async def stripe_client_error(self):
         return HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
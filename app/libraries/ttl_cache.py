@@ -0,0 +1,47 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """A small in-process cache whose entries expire after ttl seconds. Once full,
+    the least recently used entry is evicted. Entries are local to the worker
+    process, so other workers only see changes once their own copies expire."""
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+
+        if not entry:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        self._entries.pop(key, None)
+
+        # Expired entries are dropped when next read, so a full cache just evicts
+        # the least recently used entry rather than scanning for expired ones
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+
+        self._entries[key] = (now + self.ttl, value)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
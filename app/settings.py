@@ -1,4 +1,5 @@
 from os import path
+from typing import List, Optional
 
 from pydantic import BaseSettings
 
@@ -19,12 +20,27 @@ class Settings(BaseSettings):
 
     # Database Settings
     db_url: str
+    db_min_pool_size: int = 5
+    db_max_pool_size: int = 10
+    db_command_timeout: Optional[float] = None
+    db_statement_cache_size: int = 100
+    db_max_queries: int = 50000
+    db_max_inactive_connection_lifetime: float = 300.0
+    db_replica_urls: List[str] = []
+    db_replica_sticky_seconds: float = 5
+    # Bearer token scrapers must send to /metrics; unset, /metrics is closed
+    metrics_token: Optional[str] = None
 
     # Auth Settings
     token_url: str
     json_web_token_secret: str
     json_web_token_algorithm: str
     access_token_expire_minutes: float
+    access_token_user_claims: bool = False
+    bcrypt_rounds: int = 12
+    password_hashing_workers: int = 2
+    password_hashing_max_queue: int = 32
+    password_hashing_retry_after: int = 1
 
     # External Connection Settings
     account_connections_base_url: str
@@ -36,6 +52,20 @@ class Settings(BaseSettings):
     stripe_test_publishable_key: str
     stripe_test_secret_key: str
     stripe_test_webhook_secret: str
+    stripe_api_base_url: str = "https://api.stripe.com"
+    stripe_timeout_seconds: float = 10
+    stripe_max_retries: int = 2
+    stripe_event_worker_concurrency: int = 4
+
+    # Notification Writes
+    notification_queue_size: int = 1000
+    notification_batch_size: int = 100
+    notification_flush_ms: int = 50
+    notification_write_attempts: int = 5
+    notification_retry_backoff_ms: int = 100
+    # Keep this above the five days of notifications that users are shown
+    notification_retention_days: int = 7
+    notification_partition_premake_days: int = 7
 
     class Config:
         env_file = DOTENV_FILE
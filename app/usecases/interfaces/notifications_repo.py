@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 
 from app.usecases.schemas import notifications
+from app.usecases.schemas.request_pagination import Cursor
 
 
 class INotificationsRepo(ABC):
@@ -9,6 +10,12 @@ class INotificationsRepo(ABC):
     async def create(self, new_event: notifications.NewEventRepoAdapter) -> None:
         """Create reaction."""
 
+    @abstractmethod
+    async def create_many(
+        self, new_events: List[notifications.NewEventRepoAdapter]
+    ) -> None:
+        """Creates many events and their notifications at once."""
+
     @abstractmethod
     async def update(self, notification_id: int) -> None:
         """Update notification acknowledgement."""
@@ -19,12 +26,21 @@ class INotificationsRepo(ABC):
         user_id: int,
         page_number: int = 1,
         page_size: int = 200,
+        cursor: Optional[Cursor] = None,
     ) -> List[notifications.NotificationDbInfo]:
         """Retrieve many reactions"""
 
+    @abstractmethod
+    async def retrieve_unread(self, user_id: int) -> notifications.UnreadNotifications:
+        """Counts a user's unacknowledged notifications."""
+
     @abstractmethod
     async def retrieve_single(
         self,
         notification_id: int,
     ) -> Optional[notifications.NotificationDbInfo]:
         """Retrieves a single notification."""
+
+    @abstractmethod
+    async def maintain_partitions(self, retention_days: int, premake_days: int) -> None:
+        """Creates upcoming notification partitions and drops expired ones."""
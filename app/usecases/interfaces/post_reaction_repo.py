@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from app.usecases.schemas import post_reactions
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
 
 
 class IPostReactionRepo(ABC):
@@ -21,5 +22,7 @@ class IPostReactionRepo(ABC):
         query_params: post_reactions.PostsReactionsQueryParams,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[post_reactions.PostReactionInDB], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[post_reactions.PostReactionInDB], Optional[RecordCount]]:
         """Retrieve many reactions"""
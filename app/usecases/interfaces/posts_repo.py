@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import AbstractSet, Dict, List, Optional, Tuple
 
 from app.usecases.schemas import posts
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
 
 
 class IPostsRepo(ABC):
@@ -25,9 +26,32 @@ class IPostsRepo(ABC):
         query_params: posts.PostQueryRepoAdapter,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[posts.PostInfoFromDB], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+        excluded_user_ids: Optional[AbstractSet[int]] = None,
+    ) -> Tuple[List[posts.PostInfoFromDB], Optional[RecordCount]]:
         pass
 
+    @abstractmethod
+    async def retrieve_replies_for_posts(
+        self,
+        post_ids: List[int],
+        requesting_user_id: int,
+        max_depth: int = 3,
+    ) -> List[posts.PostInfoFromDB]:
+        """Retrieve up to three levels of replies for many parent posts in one query"""
+
+    @abstractmethod
+    async def retrieve_posts_by_ids(
+        self, post_ids: List[int], requesting_user_id: int
+    ) -> Dict[int, posts.PostInfoFromDB]:
+        """Retrieve many posts in one query, keyed by post_id"""
+
     @abstractmethod
     async def delete(self, post_id: int) -> None:
         pass
+
+    @abstractmethod
+    async def repair_stats(self, post_id: Optional[int] = None) -> None:
+        """Recomputes the post_stats counters from the reactions and posts tables,
+        repairing any drift. Repairs every post unless post_id is passed."""
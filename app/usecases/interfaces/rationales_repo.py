@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app.usecases.schemas import rationales
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
 
 
 class IRationalesRepo(ABC):
@@ -27,7 +28,9 @@ class IRationalesRepo(ABC):
         query_params: rationales.RationaleQueryRepoAdapter,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> List[rationales.RationaleWithThesis]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[rationales.RationaleWithThesis], Optional[RecordCount]]:
         """Retrieve many rationales"""
 
     @abstractmethod
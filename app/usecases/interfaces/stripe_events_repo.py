@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from app.usecases.schemas import subscriptions
+
+
+class IStripeEventsRepo(ABC):
+    @abstractmethod
+    async def create(self, event: subscriptions.WebhookEvent) -> bool:
+        """Queues a verified webhook event. Returns False if the event was already
+        queued, since Stripe may deliver the same event more than once."""
+
+    @abstractmethod
+    async def claim_pending(
+        self, limit: int, lease_seconds: float, max_attempts: int
+    ) -> List[subscriptions.StripeEventInDB]:
+        """Leases up to limit unprocessed events in arrival order."""
+
+    @abstractmethod
+    async def mark_processed(self, event_id: str) -> None:
+        """Marks an event as processed."""
+
+    @abstractmethod
+    async def mark_failed(
+        self, event_id: str, error: str, retry_in_seconds: float
+    ) -> None:
+        """Records a failed attempt and holds the event until it may be retried."""
+
+    @abstractmethod
+    async def release(self, event_ids: List[str]) -> None:
+        """Gives up leases on events that were claimed but not attempted."""
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import AbstractSet, Dict, List, Optional, Tuple
 
 from app.usecases.schemas import theses
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
 
 
 class IThesesRepo(ABC):
@@ -19,6 +20,12 @@ class IThesesRepo(ABC):
     ) -> Optional[theses.ThesisInDB]:
         pass
 
+    @abstractmethod
+    async def retrieve_theses_by_ids(
+        self, thesis_ids: List[int]
+    ) -> Dict[int, theses.ThesisInDB]:
+        """Retrieve many theses in one query, keyed by thesis_id"""
+
     @abstractmethod
     async def retrieve_thesis_with_reaction(
         self, thesis_id: int, user_id: int
@@ -39,10 +46,18 @@ class IThesesRepo(ABC):
         user_id: int,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[theses.ThesisWithInteractionData], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+        excluded_user_ids: Optional[AbstractSet[int]] = None,
+    ) -> Tuple[List[theses.ThesisWithInteractionData], Optional[RecordCount]]:
         pass
 
     @abstractmethod
     async def delete(self, thesis_id: int) -> None:
         """Delete a thesis. The models that reference thesis_id as a foreign
         key all have ondelete="cascade", so they should also get deleted."""
+
+    @abstractmethod
+    async def repair_stats(self, thesis_id: Optional[int] = None) -> None:
+        """Recomputes the thesis_stats counters from the reactions and rationales
+        tables, repairing any drift. Repairs every thesis unless thesis_id is passed."""
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List, Optional, Tuple
 
 from app.usecases.schemas import thesis_reactions
+from app.usecases.schemas.request_pagination import Cursor, RecordCount
 
 
 class IThesisReactionRepo(ABC):
@@ -27,7 +28,9 @@ class IThesisReactionRepo(ABC):
         query_params: thesis_reactions.ThesisReactionsQueryParams,
         page_number: int = 1,
         page_size: int = 200,
-    ) -> Tuple[List[thesis_reactions.ThesisReactionInDB], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[thesis_reactions.ThesisReactionInDB], Optional[RecordCount]]:
         """Retrieve many reactions"""
 
     @abstractmethod
@@ -1,15 +1,14 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
-from passlib.context import CryptContext
-
+from app.libraries.password_hasher import PasswordHasher
 from app.usecases.schemas import users
 
 
 class IUsersRepo(ABC):
     @abstractmethod
     async def create(
-        self, new_user: users.UserCreate, password_context: CryptContext
+        self, new_user: users.UserCreate, password_hasher: PasswordHasher
     ) -> users.UserInDB:
         pass
 
@@ -22,30 +21,41 @@ class IUsersRepo(ABC):
     ) -> Optional[users.UserInDB]:
         pass
 
+    @abstractmethod
+    async def retrieve_authenticated_user(
+        self, username: str
+    ) -> Optional[users.UserInDB]:
+        """Retrieves the user a token was issued to. Results are cached per username,
+        so authenticated requests usually skip the users table."""
+
     @abstractmethod
     async def update(
         self,
         updated_user: users.UserUpdate,
         user_id: str,
-        password_context: CryptContext,
+        password_hasher: PasswordHasher,
     ) -> users.UserInDB:
         pass
 
+    @abstractmethod
+    async def update_hashed_password(self, user_id: int, hashed_password: str) -> None:
+        """Replaces a user's stored password hash."""
+
     @abstractmethod
     async def add_block(
         self,
         initiating_user_id: str,
         receiving_user_id: str,
-    ) -> None:
-        """Add block."""
+    ) -> bool:
+        """Add block. Returns False if the block already existed."""
 
     @abstractmethod
     async def remove_block(
         self,
         initiating_user_id: str,
         receiving_user_id: str,
-    ) -> None:
-        """Remove block."""
+    ) -> bool:
+        """Remove block. Returns False if there was no block to remove."""
 
     @abstractmethod
     async def retrieve_blocks(
@@ -54,3 +64,13 @@ class IUsersRepo(ABC):
         receiving_user_id: Optional[str] = None,
     ) -> Optional[List[users.BlockInDb]]:
         """Retrieve blocks."""
+
+    @abstractmethod
+    async def retrieve_block_data(self, user_id: int) -> users.BlockData:
+        """Retrieves the users a user has blocked and the users who have blocked
+        them, in both directions with one query. Results are cached per user."""
+
+    @abstractmethod
+    async def retrieve_viewer(self, username: str) -> users.Viewer:
+        """Retrieves the user a token was issued to along with their block sets. On a
+        cache miss, the user row and both block sets come back in one statement."""
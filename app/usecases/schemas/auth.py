@@ -5,7 +5,11 @@ from pydantic import BaseModel
 
 class AuthDataToCreateToken(BaseModel):
     sub: str
+    user_id: Optional[int] = None
+    is_active: Optional[bool] = None
 
 
 class JWTData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[int] = None
+    is_active: Optional[bool] = None
@@ -52,6 +52,18 @@ class NotificationDbInfo(EventInDb):
     notification_id: int
     username: str
     user_id: int
+    created_at: datetime
+
+
+class UnreadNotifications(BaseModel):
+    """Unacknowledged notifications of a user"""
+
+    unread_count: int
+    latest_notification_id: Optional[int]
+
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
 
 
 class NotifcationResponseObject(BaseModel):
@@ -72,3 +84,4 @@ class NotificationsResponse(BaseModel):
     """Same as NotificationDbInfo"""
 
     notifications: List[NotifcationResponseObject]
+    next_cursor: Optional[str] = None
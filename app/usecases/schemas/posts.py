@@ -123,17 +123,8 @@ PostWithReactionData.update_forward_refs()
 class PostInfoFromDB(PostWithReactionData):
     """Returned from database via join"""
 
-    thesis_title: Optional[str]
-    thesis_content: Optional[str]
-    thesis_asset_symbol: Optional[str]
-    thesis_sentiment: Optional[str]
-    thesis_thesis_id: Optional[int]
-    thesis_user_id: Optional[int]
-    thesis_username: Optional[str]
-    thesis_is_authors_current: Optional[bool]
-    thesis_sources: Optional[List[str]]
-    thesis_created_at: Optional[datetime]
-    thesis_updated_at: Optional[datetime]
+    # The thesis the post is on, as the JSON object Postgres built for it
+    thesis_json: Optional[str]
 
 
 class PostResponse(PostWithReactionData):
@@ -1,13 +1,40 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
 from pydantic import BaseModel
 
 
+class CountType(str, Enum):
+    EXACT = "EXACT"
+    ESTIMATE = "ESTIMATE"
+
+
+class Cursor(BaseModel):
+    """Keyset position: the sort key of the last record on the previous page"""
+
+    created_at: datetime
+    record_id: int
+
+
+class RecordCount(BaseModel):
+    """Total records matched by a list query, and whether it's exact or estimated"""
+
+    total: int
+    type: CountType
+
+
 class RequestPagination(BaseModel):
     page: int = 1
     records_per_page: int = 200
+    cursor: Optional[Cursor] = None
+    include_total: bool = True
 
 
 class MetaData(BaseModel):
     page: int
     records_per_page: int
-    total_pages: int
-    total_records: int
+    total_pages: Optional[int] = None
+    total_records: Optional[int] = None
+    total_records_type: Optional[CountType] = None
+    next_cursor: Optional[str] = None
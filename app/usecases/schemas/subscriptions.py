@@ -10,10 +10,22 @@ class SubscriptionTier(str, Enum):
 
 
 class WebhookEvent(BaseModel):
+    event_id: str
     data: dict
     event_type: str
 
 
+class StripeEventInDB(WebhookEvent):
+    """Database Model"""
+
+    stripe_subscription_id: Optional[str]
+    attempts: int
+    last_error: Optional[str]
+    locked_until: Optional[datetime]
+    processed_at: Optional[datetime]
+    created_at: datetime
+
+
 class CreateSubscription(BaseModel):
     subscription_tier: SubscriptionTier = Field(
         ...,
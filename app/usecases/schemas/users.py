@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import FrozenSet, Optional
 
 from pydantic import BaseModel, Field, constr
 
@@ -96,5 +96,12 @@ class BlockInDb(BaseModel):
 
 
 class BlockData(BaseModel):
-    user_blocks: Optional[List[int]]
-    user_blocked_by: Optional[List[int]]
+    user_blocks: FrozenSet[int] = frozenset()
+    user_blocked_by: FrozenSet[int] = frozenset()
+
+
+class Viewer(BaseModel):
+    """The user making a request, if any, along with their block sets."""
+
+    user: Optional[UserInDB] = None
+    block_data: BlockData = BlockData()
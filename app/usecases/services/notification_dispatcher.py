@@ -0,0 +1,148 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from app.dependencies import logger
+from app.usecases.interfaces.notifications_repo import INotificationsRepo
+from app.usecases.schemas import notifications
+
+
+class NotificationDispatcher:
+    """Writes notifications in the background, so the request that fired an event
+    doesn't wait on them. Events are queued and written with
+    notifications_repo.create_many once batch_size of them are waiting, or
+    flush_interval seconds after the first one arrived, whichever comes first.
+
+    The queue holds at most max_queue_size events; past that, dispatch() waits for
+    room, slowing requests down rather than letting the backlog grow unbounded.
+    Until start() is called, or after stop(), events are written right away.
+
+    A batch that fails to write, e.g. while the database is failing over, is tried
+    again after retry_backoff seconds, doubling each time, up to max_attempts times
+    in all. Only then are its events dropped. Failed writes and dropped events are
+    counted in metrics()."""
+
+    def __init__(
+        self,
+        notifications_repo: INotificationsRepo,
+        max_queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+        max_attempts: int = 5,
+        retry_backoff: float = 0.1,
+    ):
+        self.notifications_repo = notifications_repo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+        self._queue: "asyncio.Queue[notifications.NewEventRepoAdapter]" = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[notifications.NewEventRepoAdapter] = []
+        self._write: Optional[asyncio.Future] = None
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+        }
+
+    async def dispatch(self, new_event: notifications.NewEventRepoAdapter) -> None:
+        if self._task is None:
+            await self.notifications_repo.create(new_event=new_event)
+            return
+
+        await self._queue.put(new_event)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background task, then writes out everything still queued."""
+
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        # A write cancelled along with the task still runs to completion
+        if self._write is not None:
+            await asyncio.wait([self._write])
+
+        leftover = self._batch
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        self._batch = []
+
+        for start in range(0, len(leftover), self.batch_size):
+            await self._create_many(leftover[start : start + self.batch_size])
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect_batch()
+
+            batch, self._batch = self._batch, []
+            self._write = asyncio.ensure_future(self._create_many(batch))
+            await asyncio.shield(self._write)
+            self._write = None
+
+    async def _create_many(
+        self, new_events: List[notifications.NewEventRepoAdapter]
+    ) -> None:
+        for attempt in range(self.max_attempts):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                await self.notifications_repo.create_many(new_events=new_events)
+            except Exception:  # pylint: disable = broad-except
+                self.failed_batches += 1
+                logger.exception(
+                    "Failed to write %s notifications (attempt %s of %s)",
+                    len(new_events),
+                    attempt + 1,
+                    self.max_attempts,
+                )
+                continue
+
+            self.written += len(new_events)
+            return
+
+        self.dropped += len(new_events)
+        logger.error("Dropped %s notifications", len(new_events))
+
+    async def _collect_batch(self) -> None:
+        """Waits for an event, then collects more until the batch is full or the
+        flush interval has passed. Kept on self._batch, so stop() can write out
+        a batch that was still being collected."""
+
+        self._batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        flush_at = loop.time() + self.flush_interval
+
+        while len(self._batch) < self.batch_size:
+            try:
+                self._batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = flush_at - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
@@ -0,0 +1,169 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from app.dependencies import logger
+from app.usecases.interfaces.clients.stripe import IStripeClient
+from app.usecases.interfaces.stripe_events_repo import IStripeEventsRepo
+from app.usecases.interfaces.subscriptions_repo import ISubscriptionsRepo
+from app.usecases.schemas import subscriptions
+
+
+async def handle_stripe_event(
+    event: subscriptions.WebhookEvent,
+    stripe_client: IStripeClient,
+    subscriptions_repo: ISubscriptionsRepo,
+) -> None:
+    """Applies a verified webhook event to our subscriptions."""
+
+    data_object = event.data["object"]
+
+    if event.event_type == "invoice.paid":
+        if stripe_subscription_id := data_object["subscription"]:
+            updated_record = subscriptions.SubscriptionRepoUpdate(
+                stripe_subscription_id=stripe_subscription_id, is_active=True
+            )
+            await subscriptions_repo.update(updated_subscription=updated_record)
+    elif event.event_type == "invoice.payment_failed":
+        if stripe_subscription_id := data_object["subscription"]:
+            updated_record = subscriptions.SubscriptionRepoUpdate(
+                stripe_subscription_id=stripe_subscription_id, is_active=False
+            )
+            await subscriptions_repo.update(updated_subscription=updated_record)
+    elif event.event_type == "invoice.payment_succeeded":
+        if data_object["billing_reason"] == "subscription_create":
+            stripe_subscription_id = data_object["subscription"]
+            payment_intent_id = data_object["payment_intent"]
+
+            payment_intent = await stripe_client.retrieve_payment_intent(
+                payment_intent_id
+            )
+
+            await stripe_client.modify_subscription(
+                stripe_subscription_id=stripe_subscription_id,
+                default_payment_method=payment_intent.payment_method,
+            )
+
+
+class StripeEventWorker:
+    """Drains the stripe_events queue in the background. Subscriptions are handled
+    concurrently, up to max_concurrency at a time, but each subscription's events
+    are handled one after another in arrival order."""
+
+    def __init__(
+        self,
+        stripe_events_repo: IStripeEventsRepo,
+        subscriptions_repo: ISubscriptionsRepo,
+        stripe_client: IStripeClient,
+        max_concurrency: int = 4,
+        batch_size: int = 50,
+        poll_interval: float = 5,
+        lease_seconds: float = 60,
+        max_attempts: int = 10,
+        retry_backoff: float = 5,
+    ):
+        self.stripe_events_repo = stripe_events_repo
+        self.subscriptions_repo = subscriptions_repo
+        self.stripe_client = stripe_client
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._wake_up = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        """Wakes the worker up early, e.g. right after an event is queued."""
+        self._wake_up.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake_up.clear()
+
+            try:
+                processed_count = await self.process_pending()
+            except Exception:  # pylint: disable = broad-except
+                logger.exception("Failed to process queued Stripe events")
+                processed_count = 0
+
+            # A full batch likely means more events are waiting
+            if processed_count == self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake_up.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_pending(self) -> int:
+        """Claims and handles one batch of queued events. Returns the batch size."""
+
+        events = await self.stripe_events_repo.claim_pending(
+            limit=self.batch_size,
+            lease_seconds=self.lease_seconds,
+            max_attempts=self.max_attempts,
+        )
+
+        # Events without a subscription have nothing to stay ordered with
+        event_groups: Dict[str, List[subscriptions.StripeEventInDB]] = defaultdict(list)
+        for event in events:
+            event_groups[event.stripe_subscription_id or event.event_id].append(event)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        await asyncio.gather(
+            *[
+                self._process_group(event_group=event_group, semaphore=semaphore)
+                for event_group in event_groups.values()
+            ]
+        )
+
+        return len(events)
+
+    async def _process_group(
+        self,
+        event_group: List[subscriptions.StripeEventInDB],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        async with semaphore:
+            for index, event in enumerate(event_group):
+                try:
+                    await handle_stripe_event(
+                        event=event,
+                        stripe_client=self.stripe_client,
+                        subscriptions_repo=self.subscriptions_repo,
+                    )
+                except Exception as e:  # pylint: disable = broad-except
+                    logger.exception("Failed to handle Stripe event %s", event.event_id)
+                    await self.stripe_events_repo.mark_failed(
+                        event_id=event.event_id,
+                        error=repr(e),
+                        retry_in_seconds=self.retry_backoff * 2**event.attempts,
+                    )
+
+                    # Later events for this subscription wait for this one
+                    await self.stripe_events_repo.release(
+                        event_ids=[
+                            later_event.event_id
+                            for later_event in event_group[index + 1 :]
+                        ]
+                    )
+                    return
+
+                await self.stripe_events_repo.mark_processed(event_id=event.event_id)
@@ -24,10 +24,14 @@ from app.infrastructure.db.models.public.notifications import EVENTS, NOTIFICATI
 
 # Public Schema
 from app.infrastructure.db.models.public.portfolio import ASSETS
-from app.infrastructure.db.models.public.posts import POST_REACTIONS, POSTS
+from app.infrastructure.db.models.public.posts import POST_REACTIONS, POST_STATS, POSTS
 from app.infrastructure.db.models.public.rationales import RATIONALES
 from app.infrastructure.db.models.public.subscriptions import SUBSCRIPTIONS
-from app.infrastructure.db.models.public.theses import THESES, THESES_REACTIONS
+from app.infrastructure.db.models.public.theses import (
+    THESES,
+    THESES_REACTIONS,
+    THESIS_STATS,
+)
 from app.infrastructure.db.models.public.users import BLOCKS, USERS
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,119 @@
+"""partitioned notifications by day
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2022-05-09 11:03:52.418305
+
+"""
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+# Daily partitions created up front, around the day of the migration. Later ones
+# come from `invoke maintain-notification-partitions`.
+PAST_DAYS = 7
+FUTURE_DAYS = 7
+
+NOTIFICATION_INDEXES = [
+    ("ix_notifications_user_to_notify", ["user_to_notify"], None),
+    ("ix_notifications_user_who_fired_event", ["user_who_fired_event"], None),
+    (
+        "ix_notifications_unacknowledged",
+        ["user_to_notify", "created_at"],
+        sa.text("NOT acknowledged"),
+    ),
+]
+
+NOTIFICATION_COLUMNS = (
+    "notification_id, user_to_notify, user_who_fired_event, event_id, "
+    "acknowledged, created_at, updated_at"
+)
+
+
+def _create_notifications_table(partitioned: bool) -> None:
+    primary_key = "notification_id, created_at" if partitioned else "notification_id"
+    op.execute(
+        f"""
+        CREATE TABLE notifications (
+            notification_id INTEGER NOT NULL
+                DEFAULT nextval('notifications_notification_id_seq'),
+            user_to_notify INTEGER NOT NULL REFERENCES users (user_id),
+            user_who_fired_event INTEGER NOT NULL REFERENCES users (user_id),
+            event_id INTEGER NOT NULL
+                REFERENCES events (event_id) ON DELETE CASCADE,
+            acknowledged BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY ({primary_key})
+        ) {"PARTITION BY RANGE (created_at)" if partitioned else ""}
+        """
+    )
+    op.execute(
+        "ALTER SEQUENCE notifications_notification_id_seq "
+        "OWNED BY notifications.notification_id"
+    )
+
+
+def _replace_notifications_table(partitioned: bool) -> None:
+    """Moves the notifications into a new table, partitioned or not"""
+
+    # Keep the id sequence, and free up the names the new table uses
+    op.execute("ALTER SEQUENCE notifications_notification_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE notifications RENAME TO notifications_old")
+    op.execute("ALTER INDEX notifications_pkey RENAME TO notifications_old_pkey")
+    for index_name, _, _ in NOTIFICATION_INDEXES:
+        op.execute(f"DROP INDEX {index_name}")
+    op.execute("DROP INDEX IF EXISTS ix_notifications_event_id")
+
+    _create_notifications_table(partitioned=partitioned)
+
+    if partitioned:
+        # Catches rows on days that don't have a partition of their own
+        op.execute(
+            "CREATE TABLE notifications_default PARTITION OF notifications DEFAULT"
+        )
+
+        today = datetime.utcnow().date()
+        for offset in range(-PAST_DAYS, FUTURE_DAYS + 1):
+            day = today + timedelta(days=offset)
+            op.execute(
+                f"CREATE TABLE notifications_p{day:%Y%m%d} PARTITION OF notifications "
+                f"FOR VALUES FROM ('{day.isoformat()}') "
+                f"TO ('{(day + timedelta(days=1)).isoformat()}')"
+            )
+
+    op.execute(
+        f"INSERT INTO notifications ({NOTIFICATION_COLUMNS}) "
+        f"SELECT {NOTIFICATION_COLUMNS} FROM notifications_old"
+    )
+    op.execute("DROP TABLE notifications_old")
+
+    for index_name, columns, where in NOTIFICATION_INDEXES:
+        op.create_index(
+            index_name,
+            "notifications",
+            columns,
+            unique=False,
+            postgresql_where=where,
+        )
+
+    if partitioned:
+        # Lets the retention job's cleanup of events find their notifications
+        op.create_index(
+            "ix_notifications_event_id", "notifications", ["event_id"], unique=False
+        )
+
+
+def upgrade():
+    _replace_notifications_table(partitioned=True)
+
+
+def downgrade():
+    _replace_notifications_table(partitioned=False)
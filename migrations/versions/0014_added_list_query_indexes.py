@@ -0,0 +1,145 @@
+"""added list query indexes
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2022-05-16 14:27:09.553871
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # List queries filter on one column and page through it newest first, ordered by
+    # (created_at, id). The single column indexes these replace are a prefix of them.
+    op.create_index(
+        "ix_posts_created_at",
+        "posts",
+        [sa.text("created_at DESC"), sa.text("post_id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_posts_user_id_created_at",
+        "posts",
+        ["user_id", sa.text("created_at DESC"), sa.text("post_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_posts_user_id"), table_name="posts")
+    op.create_index(
+        "ix_posts_asset_symbol_created_at",
+        "posts",
+        ["asset_symbol", sa.text("created_at DESC"), sa.text("post_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_posts_asset_symbol"), table_name="posts")
+    op.create_index(
+        "ix_posts_is_post_comment_on_created_at",
+        "posts",
+        ["is_post_comment_on", sa.text("created_at DESC"), sa.text("post_id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_post_comment_on IS NOT NULL"),
+    )
+    op.drop_index(op.f("ix_posts_is_post_comment_on"), table_name="posts")
+    op.create_index(
+        "ix_posts_is_thesis_comment_on_created_at",
+        "posts",
+        ["is_thesis_comment_on", sa.text("created_at DESC"), sa.text("post_id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_thesis_comment_on IS NOT NULL"),
+    )
+    op.drop_index(op.f("ix_posts_is_thesis_comment_on"), table_name="posts")
+    op.create_index(
+        "ix_theses_created_at",
+        "theses",
+        [sa.text("created_at DESC"), sa.text("thesis_id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_theses_user_id_created_at",
+        "theses",
+        ["user_id", sa.text("created_at DESC"), sa.text("thesis_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_theses_user_id"), table_name="theses")
+    op.create_index(
+        "ix_theses_asset_symbol_created_at",
+        "theses",
+        ["asset_symbol", sa.text("created_at DESC"), sa.text("thesis_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_theses_asset_symbol"), table_name="theses")
+    op.create_index(
+        "ix_rationales_thesis_id_created_at",
+        "rationales",
+        ["thesis_id", sa.text("created_at DESC"), sa.text("rationale_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_rationales_thesis_id"), table_name="rationales")
+    op.create_index(
+        "ix_rationales_user_id_created_at",
+        "rationales",
+        ["user_id", sa.text("created_at DESC"), sa.text("rationale_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_rationales_user_id"), table_name="rationales")
+    op.create_index(
+        "ix_notifications_user_to_notify_created_at",
+        "notifications",
+        ["user_to_notify", sa.text("created_at DESC"), sa.text("notification_id DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_notifications_user_to_notify"), table_name="notifications")
+
+
+def downgrade():
+    op.create_index(
+        op.f("ix_notifications_user_to_notify"),
+        "notifications",
+        ["user_to_notify"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_notifications_user_to_notify_created_at", table_name="notifications"
+    )
+    op.create_index(
+        op.f("ix_rationales_user_id"), "rationales", ["user_id"], unique=False
+    )
+    op.drop_index("ix_rationales_user_id_created_at", table_name="rationales")
+    op.create_index(
+        op.f("ix_rationales_thesis_id"), "rationales", ["thesis_id"], unique=False
+    )
+    op.drop_index("ix_rationales_thesis_id_created_at", table_name="rationales")
+    op.create_index(
+        op.f("ix_theses_asset_symbol"), "theses", ["asset_symbol"], unique=False
+    )
+    op.drop_index("ix_theses_asset_symbol_created_at", table_name="theses")
+    op.create_index(op.f("ix_theses_user_id"), "theses", ["user_id"], unique=False)
+    op.drop_index("ix_theses_user_id_created_at", table_name="theses")
+    op.drop_index("ix_theses_created_at", table_name="theses")
+    op.create_index(
+        op.f("ix_posts_is_thesis_comment_on"),
+        "posts",
+        ["is_thesis_comment_on"],
+        unique=False,
+    )
+    op.drop_index("ix_posts_is_thesis_comment_on_created_at", table_name="posts")
+    op.create_index(
+        op.f("ix_posts_is_post_comment_on"),
+        "posts",
+        ["is_post_comment_on"],
+        unique=False,
+    )
+    op.drop_index("ix_posts_is_post_comment_on_created_at", table_name="posts")
+    op.create_index(
+        op.f("ix_posts_asset_symbol"), "posts", ["asset_symbol"], unique=False
+    )
+    op.drop_index("ix_posts_asset_symbol_created_at", table_name="posts")
+    op.create_index(op.f("ix_posts_user_id"), "posts", ["user_id"], unique=False)
+    op.drop_index("ix_posts_user_id_created_at", table_name="posts")
+    op.drop_index("ix_posts_created_at", table_name="posts")
@@ -0,0 +1,30 @@
+"""notifications timestamps in utc
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2022-05-20 09:41:12.583019
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Recurses to the partitions
+    for column in ("created_at", "updated_at"):
+        op.alter_column(
+            "notifications",
+            column,
+            server_default=sa.text("timezone('utc', now())"),
+        )
+
+
+def downgrade():
+    for column in ("created_at", "updated_at"):
+        op.alter_column("notifications", column, server_default=sa.text("now()"))
@@ -42,6 +42,78 @@ def set_up_database(context):
     context.run("/app/continuous_integration/manage_database.sh")
 
 
+@task
+def repair_thesis_stats(context):  # pylint: disable=unused-argument
+    """Recomputes the thesis_stats counters from their source tables."""
+
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    from databases import Database
+
+    from app.infrastructure.db.repos.theses_repo import ThesesRepo
+    from app.settings import settings
+
+    async def _repair():
+        database = Database(url=settings.db_url)
+        await database.connect()
+        try:
+            await ThesesRepo(db=database).repair_stats()
+        finally:
+            await database.disconnect()
+
+    asyncio.run(_repair())
+
+
+@task
+def repair_post_stats(context):  # pylint: disable=unused-argument
+    """Recomputes the post_stats counters from their source tables."""
+
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    from databases import Database
+
+    from app.infrastructure.db.repos.posts_repo import PostsRepo
+    from app.settings import settings
+
+    async def _repair():
+        database = Database(url=settings.db_url)
+        await database.connect()
+        try:
+            await PostsRepo(db=database).repair_stats()
+        finally:
+            await database.disconnect()
+
+    asyncio.run(_repair())
+
+
+@task
+def maintain_notification_partitions(context):  # pylint: disable=unused-argument
+    """Creates upcoming notification partitions and drops expired ones. Run daily."""
+
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    from databases import Database
+
+    from app.infrastructure.db.repos.notifications_repo import NotificationsRepo
+    from app.settings import settings
+
+    async def _maintain():
+        database = Database(url=settings.db_url)
+        await database.connect()
+        try:
+            await NotificationsRepo(db=database).maintain_partitions(
+                retention_days=settings.notification_retention_days,
+                premake_days=settings.notification_partition_premake_days,
+            )
+        finally:
+            await database.disconnect()
+
+    asyncio.run(_maintain())
+
+
 @task
 def tests(context):
     """Runs all tests"""
@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class Timing:
+    """Mean seconds per run of a timed block, set once the block exits."""
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+
+class Benchmark:
+    """Times blocks of test code and records the results as test properties, which
+    end up in pytest's JUnit XML report, so they can be compared across runs.
+    Timings swing with the machine's load, so tests shouldn't assert on them."""
+
+    def __init__(self, record_property: Callable[[str, Any], None]):
+        self.record_property = record_property
+
+    def record(self, name: str, value: float) -> None:
+        self.record_property(name, round(value, 2))
+
+    @contextmanager
+    def timer(
+        self,
+        name: str,
+        runs: int = 1,
+        scale: float = 1e3,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> Iterator[Timing]:
+        """Times the block and records the mean time of its runs as the property
+        name, in seconds times scale; milliseconds unless told otherwise."""
+
+        timing = Timing()
+        start_time = clock()
+        yield timing
+        timing.seconds = (clock() - start_time) / runs
+        self.record(name, timing.seconds * scale)
@@ -10,11 +10,14 @@ from passlib.context import CryptContext
 
 from app.dependencies import (
     get_current_active_user,
+    get_notification_dispatcher,
     get_portfolio_repo,
     get_post_reactions_repo,
     get_posts_repo,
     get_rationales_repo,
     get_stripe_client,
+    get_stripe_event_worker,
+    get_stripe_events_repo,
     get_subscriptions_repo,
     get_theses_repo,
     get_thesis_reactions_repo,
@@ -26,22 +29,28 @@ from app.infrastructure.db.repos.portfolio_repo import PortfolioRepo
 from app.infrastructure.db.repos.post_reaction_repo import PostReactionRepo
 from app.infrastructure.db.repos.posts_repo import PostsRepo
 from app.infrastructure.db.repos.rationales_repo import RationalesRepo
+from app.infrastructure.db.repos.stripe_events_repo import StripeEventsRepo
 from app.infrastructure.db.repos.subscriptions_repo import SubscriptionsRepo
 from app.infrastructure.db.repos.theses_repo import ThesesRepo
 from app.infrastructure.db.repos.thesis_reaction_repo import ThesisReactionRepo
-from app.infrastructure.db.repos.user_repo import UsersRepo
+from app.infrastructure.db.repos.user_repo import UsersRepo, clear_user_caches
 from app.infrastructure.web.setup import setup_app
+from app.libraries.password_hasher import PasswordHasher
 from app.usecases.interfaces.clients.stripe import IStripeClient
 from app.usecases.interfaces.notifications_repo import INotificationsRepo
 from app.usecases.interfaces.portfolio_repo import IPortfolioRepo
 from app.usecases.interfaces.post_reaction_repo import IPostReactionRepo
 from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.interfaces.rationales_repo import IRationalesRepo
+from app.usecases.interfaces.stripe_events_repo import IStripeEventsRepo
 from app.usecases.interfaces.subscriptions_repo import ISubscriptionsRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
 from app.usecases.interfaces.thesis_reaction_repo import IThesisReactionRepo
 from app.usecases.interfaces.user_repo import IUsersRepo
 from app.usecases.schemas import posts, subscriptions, theses, users
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
+from app.usecases.services.stripe_events import StripeEventWorker
+from tests.benchmarks import Benchmark
 from tests.mocks.mock_stripe_client import MockStripeClient
 
 DEFAULT_NUMBER_OF_INSERTED_OBJECTS = 3
@@ -75,7 +84,9 @@ async def test_db(test_db_url) -> Database:
     await test_db.execute("TRUNCATE users CASCADE")
     await test_db.execute("TRUNCATE account_connections.institutions CASCADE")
     await test_db.execute("TRUNCATE subscriptions CASCADE")
+    await test_db.execute("TRUNCATE stripe_events CASCADE")
     await test_db.disconnect()
+    clear_user_caches()
 
 
 # Repos (Database Gateways)
@@ -119,6 +130,11 @@ async def subscriptions_repo(test_db: Database) -> ISubscriptionsRepo:
     return SubscriptionsRepo(db=test_db)
 
 
+@pytest_asyncio.fixture
+async def stripe_events_repo(test_db: Database) -> IStripeEventsRepo:
+    return StripeEventsRepo(db=test_db)
+
+
 @pytest_asyncio.fixture
 async def notifications_repo(test_db: Database) -> INotificationsRepo:
     return NotificationsRepo(db=test_db)
@@ -129,6 +145,27 @@ async def stripe_client() -> IStripeClient:
     return MockStripeClient()
 
 
+@pytest_asyncio.fixture
+async def stripe_event_worker(
+    stripe_events_repo: IStripeEventsRepo,
+    subscriptions_repo: ISubscriptionsRepo,
+    stripe_client: IStripeClient,
+) -> StripeEventWorker:
+    return StripeEventWorker(
+        stripe_events_repo=stripe_events_repo,
+        subscriptions_repo=subscriptions_repo,
+        stripe_client=stripe_client,
+    )
+
+
+@pytest_asyncio.fixture
+async def notification_dispatcher(
+    notifications_repo: INotificationsRepo,
+) -> NotificationDispatcher:
+    # Not started, so notifications are written before the request returns
+    return NotificationDispatcher(notifications_repo=notifications_repo)
+
+
 # Database-inserted Objects
 @pytest_asyncio.fixture
 async def inserted_user_object(
@@ -143,7 +180,12 @@ async def inserted_user_object(
             gender="FEMALE",
             birthdate="2002-11-27T06:00:00.000Z",
         ),
-        password_context=CryptContext(schemes=["bcrypt"], deprecated="auto"),
+        password_hasher=PasswordHasher(
+            password_context=CryptContext(schemes=["bcrypt"], deprecated="auto"),
+            max_workers=1,
+            max_queue=8,
+            retry_after=1,
+        ),
     )
 
 
@@ -271,7 +313,10 @@ def test_app(
     rationales_repo: IRationalesRepo,
     subscriptions_repo: ISubscriptionsRepo,
     notifications_repo: INotificationsRepo,
+    stripe_events_repo: IStripeEventsRepo,
     stripe_client: IStripeClient,
+    stripe_event_worker: StripeEventWorker,
+    notification_dispatcher: NotificationDispatcher,
 ) -> FastAPI:
     app = setup_app()
     app.dependency_overrides[get_current_active_user] = lambda: inserted_user_object
@@ -285,6 +330,11 @@ def test_app(
     app.dependency_overrides[get_subscriptions_repo] = lambda: subscriptions_repo
     app.dependency_overrides[get_notifications_repo] = lambda: notifications_repo
     app.dependency_overrides[get_stripe_client] = lambda: stripe_client
+    app.dependency_overrides[get_stripe_events_repo] = lambda: stripe_events_repo
+    app.dependency_overrides[get_stripe_event_worker] = lambda: stripe_event_worker
+    app.dependency_overrides[
+        get_notification_dispatcher
+    ] = lambda: notification_dispatcher
     return app
 
 
@@ -292,3 +342,8 @@ def test_app(
 async def test_client(test_app: FastAPI) -> AsyncClient:
     respx.route(host="test").pass_through()
     return AsyncClient(app=test_app, base_url="http://test")
+
+
+@pytest_asyncio.fixture
+def benchmark(record_property) -> Benchmark:
+    return Benchmark(record_property=record_property)
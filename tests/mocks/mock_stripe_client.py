@@ -34,6 +34,7 @@ class MockStripeClient(IStripeClient):
         sig_header: str,
     ) -> subscriptions.WebhookEvent:
         return subscriptions.WebhookEvent(
+            event_id="evt_123",
             data={
                 "object": {
                     "billing_reason": "subscription_create",
@@ -0,0 +1,192 @@
+import asyncio
+from typing import List
+
+import pytest
+import pytest_asyncio
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from fastapi import HTTPException
+
+from app.infrastructure.clients.stripe import StripeClient, encode_stripe_params
+
+
+class FakeStripe:
+    """A local stand-in for the Stripe API that records requests and can be told to
+    fail or stall the next few calls."""
+
+    def __init__(self):
+        self.requests: List[web.Request] = []
+        self.forms: List[dict] = []
+        self.failures_left = 0
+        self.stalls_left = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(request)
+        self.forms.append(dict(await request.post()))
+
+        if self.stalls_left:
+            self.stalls_left -= 1
+            await asyncio.sleep(1)
+
+        if self.failures_left:
+            self.failures_left -= 1
+            return web.json_response(
+                {"error": {"message": "Stripe is having a moment"}}, status=500
+            )
+
+        if request.path == "/v1/empty":
+            return web.Response(status=404)
+
+        if request.path.startswith("/v1/payment_intents/"):
+            return web.json_response({"id": "pi_123", "payment_method": "pm_123"})
+
+        if request.path == "/v1/customers" and self.forms[-1]["email"] == "bad":
+            return web.json_response(
+                {"error": {"message": "Invalid email address: bad"}}, status=400
+            )
+
+        return web.json_response(
+            {
+                "id": "sub_123" if "subscriptions" in request.path else "cus_123",
+                "latest_invoice": {"payment_intent": {"client_secret": "secret_123"}},
+            }
+        )
+
+
+@pytest_asyncio.fixture
+async def fake_stripe() -> FakeStripe:
+    fake_stripe = FakeStripe()
+    fake_app = web.Application()
+    fake_app.router.add_route("*", "/{path:.*}", fake_stripe.handle)
+
+    server = TestServer(fake_app)
+    await server.start_server()
+    fake_stripe.base_url = str(server.make_url("")).rstrip("/")
+    yield fake_stripe
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def stripe_http_client(fake_stripe: FakeStripe) -> StripeClient:
+    async with ClientSession() as client_session:
+        yield StripeClient(
+            client_session=client_session,
+            api_key="sk_test_123",
+            webhook_secret="whsec_123",
+            base_url=fake_stripe.base_url,
+            timeout=0.2,
+            max_retries=2,
+            retry_backoff=0,
+        )
+
+
+def test_encode_stripe_params():
+
+    assert encode_stripe_params(
+        {
+            "customer": "cus_123",
+            "items": [{"price": "price_123"}],
+            "expand": ["latest_invoice.payment_intent"],
+        }
+    ) == [
+        ("customer", "cus_123"),
+        ("items[0][price]", "price_123"),
+        ("expand[0]", "latest_invoice.payment_intent"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_subscription(
+    stripe_http_client: StripeClient, fake_stripe: FakeStripe
+):
+
+    subscription = await stripe_http_client.create_subscription(
+        customer_id="cus_123",
+        price_id="price_123",
+        payment_behavior="default_incomplete",
+    )
+
+    assert subscription.id == "sub_123"
+    assert subscription.client_secret == "secret_123"
+    assert fake_stripe.requests[0].headers["Authorization"] == "Bearer sk_test_123"
+    assert fake_stripe.forms[0]["items[0][price]"] == "price_123"
+
+
+@pytest.mark.asyncio
+async def test_retrieve_payment_intent(stripe_http_client: StripeClient):
+
+    payment_intent = await stripe_http_client.retrieve_payment_intent(
+        payment_intent_id="pi_123"
+    )
+
+    assert payment_intent.payment_method == "pm_123"
+
+
+@pytest.mark.asyncio
+async def test_retries_reuse_idempotency_key(
+    stripe_http_client: StripeClient, fake_stripe: FakeStripe
+):
+    # 1. Fail the first two attempts, then succeed
+    fake_stripe.failures_left = 2
+
+    customer = await stripe_http_client.create_customer(email="test@test.com")
+
+    # 2. Ensure every attempt carried the same idempotency key
+    idempotency_keys = {
+        request.headers["Idempotency-Key"] for request in fake_stripe.requests
+    }
+
+    assert customer.id == "cus_123"
+    assert len(fake_stripe.requests) == 3
+    assert len(idempotency_keys) == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_timeouts(
+    stripe_http_client: StripeClient, fake_stripe: FakeStripe
+):
+
+    fake_stripe.stalls_left = 1
+
+    customer = await stripe_http_client.create_customer(email="test@test.com")
+
+    assert customer.id == "cus_123"
+    assert len(fake_stripe.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(
+    stripe_http_client: StripeClient, fake_stripe: FakeStripe
+):
+
+    fake_stripe.failures_left = 3
+
+    with pytest.raises(HTTPException) as error:
+        await stripe_http_client.create_customer(email="test@test.com")
+
+    assert error.value.detail == "Stripe is having a moment"
+    assert len(fake_stripe.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_invalid_requests(
+    stripe_http_client: StripeClient, fake_stripe: FakeStripe
+):
+
+    with pytest.raises(HTTPException) as error:
+        await stripe_http_client.create_customer(email="bad")
+
+    assert error.value.detail == "Invalid email address: bad"
+    assert len(fake_stripe.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_error_body(
+    stripe_http_client: StripeClient, fake_stripe: FakeStripe
+):
+
+    with pytest.raises(HTTPException) as error:
+        await stripe_http_client.api_call(method="GET", endpoint="/v1/empty")
+
+    assert error.value.detail == "There was an external Stripe error"
+    assert len(fake_stripe.requests) == 1
@@ -0,0 +1,276 @@
+import json
+from typing import Any, List, Set
+
+import pytest
+import pytest_asyncio
+from databases import Database
+
+from app.infrastructure.db.repos.notifications_repo import NotificationsRepo
+from app.infrastructure.db.repos.posts_repo import PostsRepo
+from app.infrastructure.db.repos.rationales_repo import RationalesRepo
+from app.infrastructure.db.repos.theses_repo import ThesesRepo
+from app.infrastructure.db.statement_cache import compile_statement
+from app.usecases.schemas import posts, rationales, theses
+from app.usecases.schemas.posts import PostInDB
+from app.usecases.schemas.users import UserInDB
+
+# Enough rows that reading a whole table costs more than walking an index
+SEEDED_ROWS = 20000
+
+
+class ExplainingDatabase:
+    """Stands in for databases.Database, running EXPLAIN on each list query a repo
+    issues instead of the query, and keeping the names of the indexes it would use.
+    Single row queries, like counts, run too, since repos build their result from
+    the row."""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.index_names: Set[str] = set()
+
+    async def fetch_all(self, query: Any, values: Any = None) -> List[Any]:
+        await self._explain(query=query, values=values)
+        return []
+
+    async def fetch_one(self, query: Any, values: Any = None) -> Any:
+        await self._explain(query=query, values=values)
+        return await self.db.fetch_one(query=query, values=values)
+
+    async def _explain(self, query: Any, values: Any = None) -> None:
+        if not isinstance(query, str):
+            statement = compile_statement(query)
+            query, values = statement.sql, statement.fixed_values
+
+        query_plan = await self.db.fetch_val(
+            query=f"EXPLAIN (FORMAT JSON) {query}", values=values
+        )
+        if isinstance(query_plan, str):
+            query_plan = json.loads(query_plan)
+
+        for index_name in _plan_index_names(query_plan[0]["Plan"]):
+            # Partitions have indexes of their own, named after the partition
+            self.index_names.add(
+                await self.db.fetch_val(
+                    query="""
+                    SELECT CAST(
+                        COALESCE(
+                            pg_partition_root(CAST(:index_name AS regclass)),
+                            CAST(:index_name AS regclass)
+                        ) AS text
+                    )
+                    """,
+                    values={"index_name": index_name},
+                )
+            )
+
+
+def _plan_index_names(plan: dict) -> Set[str]:
+    index_names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for sub_plan in plan.get("Plans", []):
+        index_names |= _plan_index_names(sub_plan)
+    return index_names
+
+
+@pytest_asyncio.fixture
+async def seeded_tables(
+    test_db: Database,
+    inserted_user_object: UserInDB,
+    inserted_post_object: PostInDB,
+) -> None:
+    """A prolific second user, so filtering on the inserted user, TSLA or comments
+    picks out a small share of each table. Most notifications go to the second user
+    too, and only a few of them are unacknowledged."""
+
+    seeded_user_id = await test_db.fetch_val(
+        query="""
+        INSERT INTO users (
+            email, username, hashed_password, gender, birthdate,
+            is_active, is_superuser, is_verified
+        )
+        VALUES (
+            'seeded@test.com', 'seeded_name', 'not-a-hash', 'FEMALE', '2000-01-01',
+            true, false, false
+        )
+        RETURNING user_id
+        """
+    )
+    values = {"seeded_user_id": seeded_user_id, "rows": SEEDED_ROWS}
+
+    await test_db.execute(
+        query="""
+        INSERT INTO theses (
+            user_id, username, title, content, asset_symbol, sentiment,
+            is_authors_current, created_at
+        )
+        SELECT
+            :seeded_user_id, 'seeded_name', 'Seeded thesis ' || i, 'Seeded thesis',
+            CASE WHEN i % 50 = 0 THEN 'TSLA' ELSE 'AAPL' END, 'Bull', true,
+            now() - i * interval '1 minute'
+        FROM generate_series(1, :rows) AS i
+        """,
+        values=values,
+    )
+    await test_db.execute(
+        query="""
+        INSERT INTO posts (
+            user_id, username, content, asset_symbol, sentiment,
+            is_post_comment_on, created_at
+        )
+        SELECT
+            :seeded_user_id, 'seeded_name', 'Seeded post',
+            CASE WHEN i % 50 = 0 THEN 'TSLA' ELSE 'AAPL' END, 'Bull',
+            CASE WHEN i % 100 = 0 THEN CAST(:post_id AS bigint) END,
+            now() - i * interval '1 minute'
+        FROM generate_series(1, :rows) AS i
+        """,
+        values={**values, "post_id": inserted_post_object.post_id},
+    )
+    await test_db.execute(
+        query="""
+        INSERT INTO rationales (thesis_id, user_id)
+        SELECT thesis_id, :seeded_user_id FROM theses
+        """,
+        values={"seeded_user_id": seeded_user_id},
+    )
+    await test_db.execute(
+        query="""
+        WITH new_events AS (
+            INSERT INTO events (type, affected_post_id)
+            SELECT 'POST_REACTION', CAST(:post_id AS integer)
+            FROM generate_series(1, :rows)
+            RETURNING event_id
+        )
+        INSERT INTO notifications (
+            user_to_notify, user_who_fired_event, event_id, acknowledged
+        )
+        SELECT
+            CASE
+                WHEN event_id % 50 = 0 THEN CAST(:user_id AS integer)
+                ELSE CAST(:seeded_user_id AS integer)
+            END,
+            :seeded_user_id, event_id, event_id % 100 != 0
+        FROM new_events
+        """,
+        values={
+            **values,
+            "post_id": inserted_post_object.post_id,
+            "user_id": inserted_user_object.user_id,
+        },
+    )
+
+    await test_db.execute("ANALYZE")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, index_name",
+    [
+        ({}, "ix_posts_created_at"),
+        ({"asset_symbol": "TSLA"}, "ix_posts_asset_symbol_created_at"),
+        ({"by_inserted_user": True}, "ix_posts_user_id_created_at"),
+        ({"on_inserted_post": True}, "ix_posts_is_post_comment_on_created_at"),
+    ],
+)
+async def test_posts_list_uses_index(
+    test_db: Database,
+    seeded_tables: None,
+    inserted_post_object: PostInDB,
+    filters: dict,
+    index_name: str,
+) -> None:
+
+    database = ExplainingDatabase(db=test_db)
+    await PostsRepo(db=database).retrieve_many_with_filter(
+        query_params=posts.PostQueryRepoAdapter(
+            requesting_user_id=inserted_post_object.user_id,
+            asset_symbol=filters.get("asset_symbol"),
+            user_id=inserted_post_object.user_id
+            if filters.get("by_inserted_user")
+            else None,
+            is_post_comment_on=inserted_post_object.post_id
+            if filters.get("on_inserted_post")
+            else None,
+        ),
+        page_size=20,
+        include_total=False,
+    )
+
+    assert index_name in database.index_names
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, index_name",
+    [
+        ({}, "ix_theses_created_at"),
+        ({"asset_symbol": "TSLA"}, "ix_theses_asset_symbol_created_at"),
+        ({"by_inserted_user": True}, "ix_theses_user_id_created_at"),
+    ],
+)
+async def test_theses_list_uses_index(
+    test_db: Database,
+    seeded_tables: None,
+    inserted_user_object: UserInDB,
+    filters: dict,
+    index_name: str,
+) -> None:
+
+    database = ExplainingDatabase(db=test_db)
+    await ThesesRepo(db=database).retrieve_many_with_filter(
+        query_params=theses.ThesesQueryRepoAdapter(
+            requesting_user_id=inserted_user_object.user_id,
+            asset_symbol=filters.get("asset_symbol"),
+            user_id=inserted_user_object.user_id
+            if filters.get("by_inserted_user")
+            else None,
+        ),
+        user_id=inserted_user_object.user_id,
+        page_size=20,
+        include_total=False,
+    )
+
+    assert index_name in database.index_names
+
+
+@pytest.mark.asyncio
+async def test_rationales_list_uses_index(
+    test_db: Database, seeded_tables: None, inserted_user_object: UserInDB
+) -> None:
+
+    database = ExplainingDatabase(db=test_db)
+    await RationalesRepo(db=database).retrieve_many_rationales_with_filter(
+        query_params=rationales.RationaleQueryRepoAdapter(
+            user_id=inserted_user_object.user_id
+        ),
+        page_size=20,
+        include_total=False,
+    )
+
+    assert "ix_rationales_user_id_created_at" in database.index_names
+
+
+@pytest.mark.asyncio
+async def test_notifications_list_uses_index(
+    test_db: Database, seeded_tables: None, inserted_user_object: UserInDB
+) -> None:
+
+    database = ExplainingDatabase(db=test_db)
+    await NotificationsRepo(db=database).retrieve_many(
+        user_id=inserted_user_object.user_id, page_size=20
+    )
+
+    assert "ix_notifications_user_to_notify_created_at" in database.index_names
+
+
+@pytest.mark.asyncio
+async def test_unread_notifications_use_partial_index(
+    test_db: Database, seeded_tables: None, inserted_user_object: UserInDB
+) -> None:
+
+    database = ExplainingDatabase(db=test_db)
+    unread = await NotificationsRepo(db=database).retrieve_unread(
+        user_id=inserted_user_object.user_id
+    )
+
+    assert unread.unread_count > 0
+    assert "ix_notifications_unacknowledged" in database.index_names
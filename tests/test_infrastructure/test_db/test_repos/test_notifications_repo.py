@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pytest
+from databases import Database
+
+from app.infrastructure.db.partitions import (
+    create_daily_partitions,
+    daily_partition_name,
+)
+from app.usecases.interfaces.notifications_repo import INotificationsRepo
+from app.usecases.schemas import notifications
+from app.usecases.schemas.posts import PostInDB
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
+
+
+def make_event(
+    post: PostInDB,
+    event_type: notifications.EventType = notifications.EventType.POST_REACTION,
+    comment_id: Optional[int] = None,
+) -> notifications.NewEventRepoAdapter:
+    return notifications.NewEventRepoAdapter(
+        type=event_type,
+        user_to_notify=post.user_id,
+        user_who_fired_event=post.user_id,
+        affected_post_id=post.post_id,
+        comment_id=comment_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create(
+    notifications_repo: INotificationsRepo, inserted_post_object: PostInDB
+) -> None:
+
+    await notifications_repo.create(new_event=make_event(inserted_post_object))
+
+    created_notifications = await notifications_repo.retrieve_many(
+        user_id=inserted_post_object.user_id
+    )
+
+    assert len(created_notifications) == 1
+    assert created_notifications[0].type == notifications.EventType.POST_REACTION
+    assert created_notifications[0].affected_post_id == inserted_post_object.post_id
+    assert not created_notifications[0].acknowledged
+
+
+@pytest.mark.asyncio
+async def test_create_collapses_repeat_reactions(
+    notifications_repo: INotificationsRepo, inserted_post_object: PostInDB
+) -> None:
+
+    for _ in range(3):
+        await notifications_repo.create(new_event=make_event(inserted_post_object))
+
+    unread = await notifications_repo.retrieve_unread(
+        user_id=inserted_post_object.user_id
+    )
+
+    assert unread.unread_count == 1
+
+
+@pytest.mark.asyncio
+async def test_create_many(
+    notifications_repo: INotificationsRepo, many_inserted_posts: List[PostInDB]
+) -> None:
+
+    commented_post, *reacted_posts = many_inserted_posts
+    new_events = [make_event(post) for post in reacted_posts]
+    # Comments are never collapsed
+    new_events += [
+        make_event(
+            commented_post,
+            event_type=notifications.EventType.COMMENT,
+            comment_id=post.post_id,
+        )
+        for post in reacted_posts
+    ]
+
+    await notifications_repo.create_many(new_events=new_events)
+    # A second batch of the same reactions adds nothing
+    await notifications_repo.create_many(
+        new_events=[make_event(post) for post in reacted_posts]
+    )
+
+    unread = await notifications_repo.retrieve_unread(user_id=commented_post.user_id)
+
+    assert unread.unread_count == len(new_events)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_writes_notifications(
+    notifications_repo: INotificationsRepo, many_inserted_posts: List[PostInDB]
+) -> None:
+
+    dispatcher = NotificationDispatcher(
+        notifications_repo=notifications_repo, batch_size=2, flush_interval=0.01
+    )
+    dispatcher.start()
+
+    for post in many_inserted_posts:
+        await dispatcher.dispatch(new_event=make_event(post))
+    await dispatcher.stop()
+
+    unread = await notifications_repo.retrieve_unread(
+        user_id=many_inserted_posts[0].user_id
+    )
+
+    assert unread.unread_count == len(many_inserted_posts)
+    assert dispatcher.metrics()["written"] == len(many_inserted_posts)
+    assert dispatcher.metrics()["failed_batches"] == 0
+
+
+@pytest.mark.asyncio
+async def test_maintain_partitions(
+    test_db: Database,
+    notifications_repo: INotificationsRepo,
+    inserted_post_object: PostInDB,
+) -> None:
+
+    await notifications_repo.create(new_event=make_event(inserted_post_object))
+
+    # Expired partitions, one attached and one left detached by an earlier run
+    expired_day = datetime.utcnow().date() - timedelta(days=30)
+    expired_partitions = await create_daily_partitions(
+        db=test_db, table_name="notifications", first_day=expired_day, days=2
+    )
+    await test_db.execute(
+        f"ALTER TABLE notifications DETACH PARTITION {expired_partitions[1]}"
+    )
+
+    # Running it again changes nothing
+    for _ in range(2):
+        await notifications_repo.maintain_partitions(retention_days=7, premake_days=2)
+
+    tomorrow = datetime.utcnow().date() + timedelta(days=1)
+    assert await test_db.fetch_val(
+        query="SELECT to_regclass(:partition_name) IS NOT NULL",
+        values={"partition_name": daily_partition_name("notifications", tomorrow)},
+    )
+    for partition_name in expired_partitions:
+        assert not await test_db.fetch_val(
+            query="SELECT to_regclass(:partition_name) IS NOT NULL",
+            values={"partition_name": partition_name},
+        )
+
+    unread = await notifications_repo.retrieve_unread(
+        user_id=inserted_post_object.user_id
+    )
+    assert unread.unread_count == 1
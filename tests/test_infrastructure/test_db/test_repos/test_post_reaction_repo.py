@@ -78,6 +78,14 @@ async def test_create(
     assert test_reaction["post_id"] == inserted_post_object.post_id
     assert test_reaction["reaction"] == 1
 
+    # Ensure the post's like counter was incremented
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM post_stats WHERE post_id=:post_id",
+        {"post_id": inserted_post_object.post_id},
+    )
+
+    assert test_stats["like_count"] == 1
+
 
 @pytest.mark.asyncio
 async def test_retrieve_many_with_filter(
@@ -119,3 +127,11 @@ async def test_delete(
     )
 
     assert not post_reaction
+
+    # 3. Ensure the post's like counter was decremented
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM post_stats WHERE post_id=:post_id",
+        {"post_id": inserted_post_reaction["post_id"]},
+    )
+
+    assert test_stats["like_count"] == 0
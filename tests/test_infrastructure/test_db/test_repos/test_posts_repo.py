@@ -41,6 +41,44 @@ async def test_retrieve_many_with_filter(
         assert isinstance(post, posts.PostInfoFromDB)
 
 
+@pytest.mark.asyncio
+async def test_retrieve_replies_for_posts(
+    posts_repo: IPostsRepo,
+    inserted_post_object: posts.PostInDB,
+    create_post_object: posts.CreatePostRepoAdapter,
+):
+    # 1. Build a comment tree three levels deep
+    create_post_object.is_post_comment_on = inserted_post_object.post_id
+    first_order_reply = await posts_repo.create(new_post=create_post_object)
+    create_post_object.is_post_comment_on = first_order_reply.post_id
+    second_order_reply = await posts_repo.create(new_post=create_post_object)
+    create_post_object.is_post_comment_on = second_order_reply.post_id
+    third_order_reply = await posts_repo.create(new_post=create_post_object)
+
+    # 2. Retrieve every level at once
+    test_replies = await posts_repo.retrieve_replies_for_posts(
+        post_ids=[inserted_post_object.post_id],
+        requesting_user_id=inserted_post_object.user_id,
+    )
+
+    assert {reply.post_id for reply in test_replies} == {
+        first_order_reply.post_id,
+        second_order_reply.post_id,
+        third_order_reply.post_id,
+    }
+    for reply in test_replies:
+        assert isinstance(reply, posts.PostInfoFromDB)
+
+    # 3. Only retrieve the first level
+    test_replies = await posts_repo.retrieve_replies_for_posts(
+        post_ids=[inserted_post_object.post_id],
+        requesting_user_id=inserted_post_object.user_id,
+        max_depth=1,
+    )
+
+    assert [reply.post_id for reply in test_replies] == [first_order_reply.post_id]
+
+
 @pytest.mark.asyncio
 async def test_delete(
     posts_repo: IPostsRepo, inserted_post_object: posts.PostInDB, test_db: Database
@@ -55,3 +93,56 @@ async def test_delete(
     )
 
     assert not post
+
+
+@pytest.mark.asyncio
+async def test_repair_stats(
+    posts_repo: IPostsRepo,
+    inserted_post_object: posts.PostInDB,
+    create_post_object: posts.CreatePostRepoAdapter,
+    test_db: Database,
+):
+    # 1. Comment on the post, then knock its counters out of sync
+    create_post_object.is_post_comment_on = inserted_post_object.post_id
+    await posts_repo.create(new_post=create_post_object)
+    await test_db.execute(
+        "UPDATE post_stats SET like_count = 5, comment_count = 5 "
+        "WHERE post_id = :post_id",
+        {"post_id": inserted_post_object.post_id},
+    )
+
+    # 2. Repair the counters
+    await posts_repo.repair_stats(post_id=inserted_post_object.post_id)
+
+    # 3. Ensure they match the reactions and comments again
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM post_stats WHERE post_id=:post_id",
+        {"post_id": inserted_post_object.post_id},
+    )
+
+    assert test_stats["like_count"] == 0
+    assert test_stats["comment_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieve_posts_by_ids(
+    posts_repo: IPostsRepo, many_inserted_posts: List[posts.PostInDB]
+):
+
+    post_ids = [post.post_id for post in many_inserted_posts[:2]]
+
+    test_posts = await posts_repo.retrieve_posts_by_ids(
+        post_ids=post_ids, requesting_user_id=many_inserted_posts[0].user_id
+    )
+
+    assert set(test_posts) == set(post_ids)
+    for post_id, post in test_posts.items():
+        assert isinstance(post, posts.PostInfoFromDB)
+        assert post.post_id == post_id
+
+    assert (
+        await posts_repo.retrieve_posts_by_ids(
+            post_ids=[], requesting_user_id=many_inserted_posts[0].user_id
+        )
+        == {}
+    )
@@ -50,18 +50,14 @@ async def test_create(
         thesis_id=inserted_thesis_object.thesis_id, user_id=inserted_user_object.user_id
     )
 
-    test_rationale_dict = test_rationale.dict()
-    inserted_thesis_dict = inserted_thesis_object.dict()
-
     assert isinstance(test_rationale, rationales.RationaleWithThesis)
     assert test_rationale.thesis_id == inserted_thesis_object.thesis_id
     assert test_rationale.user_id == inserted_user_object.user_id
-    for key, value in test_rationale_dict.items():
-        if key[0:7] == "thesis_" and value is not None:
-            if key == "thesis_id":
-                assert inserted_thesis_dict[key] == value
-            else:
-                assert inserted_thesis_dict[key[7:]] == value
+    # The thesis comes back as one JSON object
+    assert (
+        theses.ThesisInDB.parse_raw(test_rationale.thesis_json)
+        == inserted_thesis_object
+    )
 
 
 @pytest.mark.asyncio
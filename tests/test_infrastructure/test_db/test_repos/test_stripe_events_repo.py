@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from databases import Database
+
+from app.infrastructure.db.repos.stripe_events_repo import CLAIM_LOCK_KEY
+from app.usecases.interfaces.stripe_events_repo import IStripeEventsRepo
+from app.usecases.schemas.subscriptions import StripeEventInDB, WebhookEvent
+
+
+def make_event(event_id: str, stripe_subscription_id: str) -> WebhookEvent:
+    return WebhookEvent(
+        event_id=event_id,
+        event_type="invoice.paid",
+        data={"object": {"subscription": stripe_subscription_id}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_deduplicates(stripe_events_repo: IStripeEventsRepo):
+
+    assert await stripe_events_repo.create(event=make_event("evt_1", "sub_1"))
+    assert not await stripe_events_repo.create(event=make_event("evt_1", "sub_1"))
+
+
+@pytest.mark.asyncio
+async def test_claim_pending(stripe_events_repo: IStripeEventsRepo):
+
+    await stripe_events_repo.create(event=make_event("evt_1", "sub_1"))
+    await stripe_events_repo.create(event=make_event("evt_2", "sub_1"))
+
+    # 1. Claim both events in arrival order
+    claimed_events = await stripe_events_repo.claim_pending(
+        limit=10, lease_seconds=60, max_attempts=3
+    )
+
+    assert [event.event_id for event in claimed_events] == ["evt_1", "evt_2"]
+    for event in claimed_events:
+        assert isinstance(event, StripeEventInDB)
+        assert event.stripe_subscription_id == "sub_1"
+
+    # 2. Leased events can't be claimed again
+    assert (
+        await stripe_events_repo.claim_pending(
+            limit=10, lease_seconds=60, max_attempts=3
+        )
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_holds_back_later_events(
+    stripe_events_repo: IStripeEventsRepo,
+):
+    await stripe_events_repo.create(event=make_event("evt_1", "sub_1"))
+    await stripe_events_repo.create(event=make_event("evt_2", "sub_1"))
+    await stripe_events_repo.create(event=make_event("evt_3", "sub_2"))
+
+    # 1. Fail the first event and give the rest back
+    await stripe_events_repo.claim_pending(limit=10, lease_seconds=60, max_attempts=3)
+    await stripe_events_repo.mark_failed(
+        event_id="evt_1", error="boom", retry_in_seconds=60
+    )
+    await stripe_events_repo.release(event_ids=["evt_2", "evt_3"])
+
+    # 2. Only the other subscription's event is claimable until evt_1 is retried
+    claimed_events = await stripe_events_repo.claim_pending(
+        limit=10, lease_seconds=60, max_attempts=3
+    )
+
+    assert [event.event_id for event in claimed_events] == ["evt_3"]
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_waits_for_other_claims(
+    stripe_events_repo: IStripeEventsRepo, test_db_url: str
+):
+    await stripe_events_repo.create(event=make_event("evt_1", "sub_1"))
+    await stripe_events_repo.create(event=make_event("evt_2", "sub_1"))
+
+    other_worker_db = Database(url=test_db_url)
+    await other_worker_db.connect()
+    try:
+        # 1. Another worker is part way through claiming the first event
+        async with other_worker_db.transaction():
+            await other_worker_db.execute(
+                "SELECT pg_advisory_xact_lock(:key)", {"key": CLAIM_LOCK_KEY}
+            )
+            await other_worker_db.execute(
+                "UPDATE stripe_events SET locked_until = now() + interval '1 minute' "
+                "WHERE event_id = 'evt_1'"
+            )
+
+            claim = asyncio.create_task(
+                stripe_events_repo.claim_pending(
+                    limit=10, lease_seconds=60, max_attempts=3
+                )
+            )
+            await asyncio.sleep(0.2)
+
+            assert not claim.done()
+
+        # 2. Once that claim commits, the later event waits behind its lease
+        assert await claim == []
+    finally:
+        await other_worker_db.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_mark_processed(stripe_events_repo: IStripeEventsRepo):
+
+    await stripe_events_repo.create(event=make_event("evt_1", "sub_1"))
+    await stripe_events_repo.claim_pending(limit=10, lease_seconds=0, max_attempts=3)
+    await stripe_events_repo.mark_processed(event_id="evt_1")
+
+    assert (
+        await stripe_events_repo.claim_pending(
+            limit=10, lease_seconds=60, max_attempts=3
+        )
+        == []
+    )
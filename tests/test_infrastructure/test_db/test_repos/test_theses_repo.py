@@ -4,8 +4,10 @@ import pytest
 import pytest_asyncio
 from databases import Database
 
+from app.usecases.interfaces.posts_repo import IPostsRepo
 from app.usecases.interfaces.theses_repo import IThesesRepo
-from app.usecases.schemas import theses
+from app.usecases.schemas import posts, theses
+from app.usecases.schemas.request_pagination import CountType, Cursor
 from app.usecases.schemas.users import UserInDB
 from tests.conftest import DEFAULT_NUMBER_OF_INSERTED_OBJECTS
 
@@ -65,6 +67,77 @@ async def test_retrieve_many_with_filter(
     assert len(test_theses[0]) >= DEFAULT_NUMBER_OF_INSERTED_OBJECTS
     for thesis in test_theses[0]:
         assert isinstance(thesis, theses.ThesisWithInteractionData)
+    assert test_theses[1].total >= DEFAULT_NUMBER_OF_INSERTED_OBJECTS
+    assert test_theses[1].type == CountType.EXACT
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_with_filter_excluded_users(
+    theses_repo: IThesesRepo, many_inserted_theses: List[theses.ThesisInDB]
+):
+
+    test_theses, test_theses_count = await theses_repo.retrieve_many_with_filter(
+        user_id=many_inserted_theses[0].user_id,
+        query_params=theses.ThesesQueryRepoAdapter(
+            user_id=many_inserted_theses[0].user_id,
+            requesting_user_id=many_inserted_theses[0].user_id,
+        ),
+        excluded_user_ids=frozenset([many_inserted_theses[0].user_id]),
+    )
+
+    assert test_theses == []
+    assert test_theses_count.total == 0
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_with_filter_cursor(
+    theses_repo: IThesesRepo, many_inserted_theses: List[theses.ThesisInDB]
+):
+
+    query_params = theses.ThesesQueryRepoAdapter(
+        user_id=many_inserted_theses[0].user_id,
+        requesting_user_id=many_inserted_theses[0].user_id,
+    )
+
+    # 1. Retrieve the first page
+    first_page, _ = await theses_repo.retrieve_many_with_filter(
+        user_id=many_inserted_theses[0].user_id,
+        query_params=query_params,
+        page_size=1,
+    )
+
+    # 2. Retrieve the next page by seeking past the first page's last thesis
+    second_page, _ = await theses_repo.retrieve_many_with_filter(
+        user_id=many_inserted_theses[0].user_id,
+        query_params=query_params,
+        page_size=1,
+        cursor=Cursor(
+            created_at=first_page[-1].created_at,
+            record_id=first_page[-1].thesis_id,
+        ),
+    )
+
+    assert len(second_page) == 1
+    assert second_page[0].thesis_id != first_page[0].thesis_id
+    assert (second_page[0].created_at, second_page[0].thesis_id) < (
+        first_page[0].created_at,
+        first_page[0].thesis_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_retrieve_theses_by_ids(
+    theses_repo: IThesesRepo, many_inserted_theses: List[theses.ThesisInDB]
+):
+
+    thesis_ids = [thesis.thesis_id for thesis in many_inserted_theses[:2]]
+
+    test_theses = await theses_repo.retrieve_theses_by_ids(thesis_ids=thesis_ids)
+
+    assert set(test_theses) == set(thesis_ids)
+    for thesis_id, thesis in test_theses.items():
+        assert isinstance(thesis, theses.ThesisInDB)
+        assert thesis.thesis_id == thesis_id
 
 
 @pytest.mark.asyncio
@@ -99,3 +172,56 @@ async def test_delete(
     )
 
     assert not thesis
+
+
+@pytest.mark.asyncio
+async def test_delete_decrements_comment_counts(
+    theses_repo: IThesesRepo,
+    posts_repo: IPostsRepo,
+    inserted_thesis_object: theses.ThesisInDB,
+    inserted_post_object: posts.PostInDB,
+    create_post_object: posts.CreatePostRepoAdapter,
+    test_db: Database,
+):
+    # 1. Comment on a post, from a post that's on the thesis
+    create_post_object.thesis_id = inserted_thesis_object.thesis_id
+    create_post_object.is_post_comment_on = inserted_post_object.post_id
+    await posts_repo.create(new_post=create_post_object)
+
+    # 2. Delete the thesis, which takes the comment with it
+    await theses_repo.delete(thesis_id=inserted_thesis_object.thesis_id)
+
+    # 3. Ensure the post's comment count went back down
+    comment_count = await test_db.fetch_val(
+        "SELECT comment_count FROM post_stats WHERE post_id=:post_id",
+        {"post_id": inserted_post_object.post_id},
+    )
+
+    assert comment_count == 0
+
+
+@pytest.mark.asyncio
+async def test_repair_stats(
+    theses_repo: IThesesRepo,
+    inserted_thesis_object: theses.ThesisInDB,
+    test_db: Database,
+):
+    # 1. Knock the thesis's counters out of sync with its source tables
+    await test_db.execute(
+        "INSERT INTO thesis_stats (thesis_id, like_count, dislike_count, save_count) "
+        "VALUES (:thesis_id, 5, 5, 5)",
+        {"thesis_id": inserted_thesis_object.thesis_id},
+    )
+
+    # 2. Repair the counters
+    await theses_repo.repair_stats(thesis_id=inserted_thesis_object.thesis_id)
+
+    # 3. Ensure they match the (empty) reactions and rationales tables again
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM thesis_stats WHERE thesis_id=:thesis_id",
+        {"thesis_id": inserted_thesis_object.thesis_id},
+    )
+
+    assert test_stats["like_count"] == 0
+    assert test_stats["dislike_count"] == 0
+    assert test_stats["save_count"] == 0
@@ -78,6 +78,14 @@ async def test_create(
     assert test_reaction["thesis_id"] == inserted_thesis_object.thesis_id
     assert test_reaction["reaction"] == 1
 
+    # Ensure the thesis's like counter was incremented
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM thesis_stats WHERE thesis_id=:thesis_id",
+        {"thesis_id": inserted_thesis_object.thesis_id},
+    )
+
+    assert test_stats["like_count"] == 1
+
 
 @pytest.mark.asyncio
 async def test_update(
@@ -105,6 +113,15 @@ async def test_update(
     # 3. Verified updated reaction value
     assert updated_thesis_reaction["reaction"] == -1
 
+    # 4. Verify the reaction moved from the like counter to the dislike counter
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM thesis_stats WHERE thesis_id=:thesis_id",
+        {"thesis_id": inserted_thesis_reaction["thesis_id"]},
+    )
+
+    assert test_stats["like_count"] == 0
+    assert test_stats["dislike_count"] == 1
+
 
 @pytest.mark.asyncio
 async def test_retrieve_many_with_filter(
@@ -162,3 +179,11 @@ async def test_delete(
     )
 
     assert not thesis_reaction
+
+    # 4. Ensure the thesis's like counter was decremented
+    test_stats = await test_db.fetch_one(
+        "SELECT * FROM thesis_stats WHERE thesis_id=:thesis_id",
+        {"thesis_id": inserted_thesis_reaction["thesis_id"]},
+    )
+
+    assert test_stats["like_count"] == 0
@@ -1,9 +1,19 @@
+import json
+
 import pytest
 import pytest_asyncio
+from databases import Database
 from passlib.context import CryptContext
 
+from app.infrastructure.db.repos.user_repo import clear_user_caches
+from app.libraries.password_hasher import PasswordHasher
 from app.usecases.interfaces.user_repo import IUsersRepo
+from app.usecases.schemas import users
 from app.usecases.schemas.users import UserCreate, UserInDB, UserUpdate
+from tests.benchmarks import Benchmark
+
+BLOCKS_PER_DIRECTION = 3000
+BENCHMARK_LOOKUPS = 20
 
 
 @pytest_asyncio.fixture
@@ -26,19 +36,24 @@ def update_user_object() -> UserUpdate:
 
 
 @pytest_asyncio.fixture
-def password_context() -> CryptContext:
-    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+def password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        password_context=CryptContext(schemes=["bcrypt"], deprecated="auto"),
+        max_workers=1,
+        max_queue=8,
+        retry_after=1,
+    )
 
 
 @pytest.mark.asyncio
 async def test_create(
     user_repo: IUsersRepo,
     create_user_object: UserCreate,
-    password_context: CryptContext,
+    password_hasher: PasswordHasher,
 ):
 
     test_user = await user_repo.create(
-        new_user=create_user_object, password_context=password_context
+        new_user=create_user_object, password_hasher=password_hasher
     )
 
     assert isinstance(test_user, UserInDB)
@@ -62,21 +77,211 @@ async def test_retrieve_user_with_filter(
     assert test_user.hashed_password == inserted_user_object.hashed_password
 
 
+@pytest.mark.asyncio
+async def test_retrieve_authenticated_user(
+    user_repo: IUsersRepo, inserted_user_object: UserInDB
+):
+
+    test_user = await user_repo.retrieve_authenticated_user(
+        username=inserted_user_object.username
+    )
+
+    assert test_user == inserted_user_object
+
+
 @pytest.mark.asyncio
 async def test_update(
     user_repo: IUsersRepo,
     update_user_object: UserUpdate,
-    password_context: CryptContext,
+    password_hasher: PasswordHasher,
     inserted_user_object: UserInDB,
 ):
 
     test_updated_user = await user_repo.update(
         updated_user=update_user_object,
         user_id=inserted_user_object.user_id,
-        password_context=password_context,
+        password_hasher=password_hasher,
     )
 
     assert isinstance(test_updated_user, UserInDB)
     assert test_updated_user.email == inserted_user_object.email
     assert test_updated_user.username == update_user_object.username
     assert test_updated_user.hashed_password != inserted_user_object.hashed_password
+
+
+@pytest.mark.asyncio
+async def test_update_hashed_password(
+    user_repo: IUsersRepo, inserted_user_object: UserInDB
+):
+
+    await user_repo.update_hashed_password(
+        user_id=inserted_user_object.user_id, hashed_password="rehashed_password"
+    )
+
+    test_user = await user_repo.retrieve_user_with_filter(
+        user_id=inserted_user_object.user_id
+    )
+
+    assert test_user.hashed_password == "rehashed_password"
+
+
+@pytest.mark.asyncio
+async def test_retrieve_block_data(
+    user_repo: IUsersRepo,
+    create_user_object: UserCreate,
+    password_hasher: PasswordHasher,
+    inserted_user_object: UserInDB,
+):
+    # 1. Create a second user and block them, priming the cache before the block
+    other_user = await user_repo.create(
+        new_user=create_user_object, password_hasher=password_hasher
+    )
+    await user_repo.retrieve_block_data(user_id=inserted_user_object.user_id)
+    await user_repo.add_block(
+        initiating_user_id=inserted_user_object.user_id,
+        receiving_user_id=other_user.user_id,
+    )
+
+    # 2. Ensure the block shows up in both directions
+    blocker_data = await user_repo.retrieve_block_data(
+        user_id=inserted_user_object.user_id
+    )
+    blocked_data = await user_repo.retrieve_block_data(user_id=other_user.user_id)
+
+    assert blocker_data.user_blocks == frozenset([other_user.user_id])
+    assert blocker_data.user_blocked_by == frozenset()
+    assert blocked_data.user_blocked_by == frozenset([inserted_user_object.user_id])
+
+    # 3. Ensure removing the block invalidates the cached block data
+    await user_repo.remove_block(
+        initiating_user_id=inserted_user_object.user_id,
+        receiving_user_id=other_user.user_id,
+    )
+    blocker_data = await user_repo.retrieve_block_data(
+        user_id=inserted_user_object.user_id
+    )
+
+    assert blocker_data.user_blocks == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_block(
+    user_repo: IUsersRepo,
+    create_user_object: UserCreate,
+    password_hasher: PasswordHasher,
+    inserted_user_object: UserInDB,
+):
+    other_user = await user_repo.create(
+        new_user=create_user_object, password_hasher=password_hasher
+    )
+    block = {
+        "initiating_user_id": inserted_user_object.user_id,
+        "receiving_user_id": other_user.user_id,
+    }
+
+    # 1. Ensure a block is only added once
+    assert await user_repo.add_block(**block)
+    assert not await user_repo.add_block(**block)
+
+    # 2. Ensure a block is only removed once
+    assert await user_repo.remove_block(**block)
+    assert not await user_repo.remove_block(**block)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_viewer(
+    user_repo: IUsersRepo,
+    create_user_object: UserCreate,
+    password_hasher: PasswordHasher,
+    inserted_user_object: UserInDB,
+):
+    # 1. Create a second user and have the inserted user block them
+    other_user = await user_repo.create(
+        new_user=create_user_object, password_hasher=password_hasher
+    )
+    await user_repo.add_block(
+        initiating_user_id=inserted_user_object.user_id,
+        receiving_user_id=other_user.user_id,
+    )
+
+    # 2. Ensure the user and their block sets come back together
+    test_viewer = await user_repo.retrieve_viewer(username=other_user.username)
+
+    assert test_viewer.user == other_user
+    assert test_viewer.block_data.user_blocks == frozenset()
+    assert test_viewer.block_data.user_blocked_by == frozenset(
+        [inserted_user_object.user_id]
+    )
+
+
+@pytest.mark.asyncio
+async def test_retrieve_viewer_unknown_username(user_repo: IUsersRepo):
+
+    test_viewer = await user_repo.retrieve_viewer(username="not_a_user")
+
+    assert test_viewer.user is None
+    assert test_viewer.block_data == users.BlockData()
+
+
+@pytest.mark.asyncio
+async def test_retrieve_block_data_with_many_blocks(
+    test_db: Database,
+    user_repo: IUsersRepo,
+    inserted_user_object: UserInDB,
+    benchmark: Benchmark,
+):
+    """A user with thousands of blocks each way gets both block sets back whole, the
+    reverse direction read from its covering index alone. Uncached lookups are timed
+    too, since they're what every cache miss costs."""
+
+    # 1. Seed users; the inserted user blocks half of them and the rest block them
+    await test_db.execute(
+        query="""
+        WITH new_users AS (
+            INSERT INTO users (
+                email, username, hashed_password, gender, birthdate,
+                is_active, is_superuser, is_verified
+            )
+            SELECT
+                'blocks_' || i || '@test.com', 'blocks_' || i, 'not-a-hash',
+                'FEMALE', '2000-01-01', true, false, false
+            FROM generate_series(1, :user_count) AS i
+            RETURNING user_id
+        )
+        INSERT INTO blocks (user_id, blocked_user_id)
+        SELECT
+            CASE WHEN user_id % 2 = 0 THEN :user_id ELSE user_id END,
+            CASE WHEN user_id % 2 = 0 THEN user_id ELSE :user_id END
+        FROM new_users
+        """,
+        values={
+            "user_count": BLOCKS_PER_DIRECTION * 2,
+            "user_id": inserted_user_object.user_id,
+        },
+    )
+    await test_db.execute("VACUUM ANALYZE blocks")
+
+    # 2. The users who blocked someone are read from the reverse index alone
+    query_plan = await test_db.fetch_val(
+        query="""
+        EXPLAIN (FORMAT JSON)
+        SELECT user_id FROM blocks WHERE blocked_user_id = :user_id
+        """,
+        values={"user_id": inserted_user_object.user_id},
+    )
+    if isinstance(query_plan, str):
+        query_plan = json.loads(query_plan)
+
+    assert query_plan[0]["Plan"]["Node Type"] == "Index Only Scan"
+    assert query_plan[0]["Plan"]["Index Name"] == "ix_blocks_blocked_user_id_user_id"
+
+    # 3. Time uncached lookups of both directions
+    with benchmark.timer("block_data_ms_per_lookup", runs=BENCHMARK_LOOKUPS):
+        for _ in range(BENCHMARK_LOOKUPS):
+            clear_user_caches()
+            block_data = await user_repo.retrieve_block_data(
+                user_id=inserted_user_object.user_id
+            )
+
+    assert len(block_data.user_blocks) == BLOCKS_PER_DIRECTION
+    assert len(block_data.user_blocked_by) == BLOCKS_PER_DIRECTION
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, List
+
+import pytest
+from sqlalchemy import select, text
+
+from app.infrastructure.db.models.public.users import USERS
+from app.infrastructure.db.routing import (
+    RoutedDatabase,
+    is_read_query,
+    set_request_user,
+)
+
+
+class RecordingDatabase:
+    """Stands in for a connection pool, recording which queries reach it."""
+
+    def __init__(self):
+        self.queries: List[Any] = []
+
+    async def fetch_one(self, query: Any, values: Any = None) -> None:
+        self.queries.append(query)
+
+    async def execute(self, query: Any, values: Any = None) -> None:
+        self.queries.append(query)
+
+    def transaction(self) -> Any:
+        class Transaction:
+            async def __aenter__(self):
+                pass
+
+            async def __aexit__(self, *args):
+                pass
+
+        return Transaction()
+
+
+def test_is_read_query():
+
+    assert is_read_query(select([USERS]))
+    assert is_read_query(text("EXPLAIN (FORMAT JSON) SELECT 1"))
+    assert not is_read_query(select([USERS]).with_for_update())
+    assert not is_read_query(USERS.update().returning(USERS.c.user_id))
+    assert not is_read_query("TRUNCATE users")
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_request_writes():
+    primary, replica = RecordingDatabase(), RecordingDatabase()
+    database = RoutedDatabase(primary=primary, replicas=[replica])
+
+    async def request():
+        await database.fetch_one(select([USERS]))
+        await database.execute(USERS.delete())
+        await database.fetch_one(select([USERS]))
+
+    await asyncio.create_task(request())
+
+    assert len(replica.queries) == 1
+    assert len(primary.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_reads_stick_to_primary_after_user_writes():
+    primary, replica = RecordingDatabase(), RecordingDatabase()
+    database = RoutedDatabase(primary=primary, replicas=[replica], sticky_seconds=60)
+
+    async def request(write: bool):
+        set_request_user(user_id=1)
+        if write:
+            await database.execute(USERS.delete())
+        await database.fetch_one(select([USERS]))
+
+    # Each request runs in its own task, like it would under the server
+    await asyncio.create_task(request(write=True))
+    await asyncio.create_task(request(write=False))
+
+    assert replica.queries == []
+
+
+@pytest.mark.asyncio
+async def test_reads_in_transaction_stay_on_primary():
+    primary, replica = RecordingDatabase(), RecordingDatabase()
+    database = RoutedDatabase(primary=primary, replicas=[replica])
+
+    async def request():
+        async with database.transaction():
+            await database.fetch_one(select([USERS]))
+
+    await asyncio.create_task(request())
+
+    assert replica.queries == []
+    assert len(primary.queries) == 1
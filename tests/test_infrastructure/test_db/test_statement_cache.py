@@ -0,0 +1,159 @@
+import time
+from typing import Any, List
+
+import pytest
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.db.models.public.users import USERS
+from app.infrastructure.db.repos import posts_repo, theses_repo
+from app.infrastructure.db.repos.posts_repo import PostsRepo
+from app.infrastructure.db.repos.theses_repo import ThesesRepo
+from app.infrastructure.db.statement_cache import (
+    CompiledStatement,
+    StatementCache,
+    compile_statement,
+)
+from app.usecases.schemas import posts, theses
+from tests.benchmarks import Benchmark
+
+BENCHMARK_REQUESTS = 200
+
+# The repos' list statement caches, cleared to time requests without them
+LIST_STATEMENT_CACHES = {
+    "posts": posts_repo._list_statements,  # pylint: disable = protected-access
+    "theses": theses_repo._list_statements,  # pylint: disable = protected-access
+}
+
+
+class CompilingDatabase:
+    """Stands in for databases.Database, compiling each query the way it does before
+    sending it to asyncpg, so the benchmark measures the CPU spent on our side."""
+
+    def __init__(self):
+        self.queries: List[Any] = []
+
+    async def fetch_all(self, query: Any, values: Any = None) -> List[Any]:
+        if isinstance(query, str):
+            query = text(query).bindparams(**values or {})
+
+        compiled = query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}
+        )
+        self.queries.append((compiled.string, compiled.params))
+        return []
+
+
+def test_statement_cache_compiles_each_shape_once():
+    statement_cache = StatementCache()
+    build_count = 0
+
+    def build_query():
+        nonlocal build_count
+        build_count += 1
+        return select([USERS.c.user_id]).where(
+            USERS.c.username == bindparam("username")
+        )
+
+    first_statement = statement_cache.get(("username",), build_query)
+    second_statement = statement_cache.get(("username",), build_query)
+
+    assert first_statement is second_statement
+    assert build_count == 1
+    assert ":username" in first_statement.sql
+    assert first_statement.bind({"username": "a", "unused": 1}) == {"username": "a"}
+
+
+@pytest.mark.asyncio
+async def test_cached_list_query_binds_new_values():
+    database = CompilingDatabase()
+    repo = PostsRepo(db=database)
+
+    for user_id in (1, 2):
+        await repo.retrieve_many_with_filter(
+            query_params=posts.PostQueryRepoAdapter(
+                requesting_user_id=7, user_id=user_id
+            ),
+            include_total=False,
+            excluded_user_ids={3},
+        )
+
+    (first_sql, first_params), (second_sql, second_params) = database.queries
+    assert first_sql == second_sql
+    assert (first_params["user_id"], second_params["user_id"]) == (1, 2)
+    assert first_params["excluded_user_ids"] == [3]
+    assert first_params["requesting_user_id"] == 7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint", ["posts", "theses"])
+async def test_list_query_cpu_per_request(
+    endpoint: str, benchmark: Benchmark, monkeypatch: pytest.MonkeyPatch
+):
+    """A list request only compiles its query when the statement cache is cold. Also
+    times the CPU each request spends on the query both ways, to show what the cache
+    saves."""
+
+    database = CompilingDatabase()
+    statement_cache = LIST_STATEMENT_CACHES[endpoint]
+
+    compile_count = 0
+
+    def counting_compile_statement(query: Any) -> CompiledStatement:
+        nonlocal compile_count
+        compile_count += 1
+        return compile_statement(query)
+
+    monkeypatch.setattr(
+        "app.infrastructure.db.statement_cache.compile_statement",
+        counting_compile_statement,
+    )
+
+    if endpoint == "posts":
+
+        async def list_request():
+            await PostsRepo(db=database).retrieve_many_with_filter(
+                query_params=posts.PostQueryRepoAdapter(
+                    requesting_user_id=1, asset_symbol="TSLA"
+                ),
+                include_total=False,
+            )
+
+    else:
+
+        async def list_request():
+            await ThesesRepo(db=database).retrieve_many_with_filter(
+                query_params=theses.ThesesQueryRepoAdapter(
+                    requesting_user_id=1, asset_symbol="TSLA"
+                ),
+                user_id=1,
+                include_total=False,
+            )
+
+    # 1. A cleared cache compiles the query on every request
+    with benchmark.timer(
+        "uncached_us_per_request",
+        runs=BENCHMARK_REQUESTS,
+        scale=1e6,
+        clock=time.process_time,
+    ) as uncached:
+        for _ in range(BENCHMARK_REQUESTS):
+            statement_cache.clear()
+            await list_request()
+
+    assert compile_count == BENCHMARK_REQUESTS
+
+    # 2. A warm cache never compiles it again
+    compile_count = 0
+    with benchmark.timer(
+        "cached_us_per_request",
+        runs=BENCHMARK_REQUESTS,
+        scale=1e6,
+        clock=time.process_time,
+    ) as cached:
+        for _ in range(BENCHMARK_REQUESTS):
+            await list_request()
+
+    assert compile_count == 0
+
+    benchmark.record("saved_us_per_request", (uncached.seconds - cached.seconds) * 1e6)
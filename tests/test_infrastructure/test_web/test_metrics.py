@@ -0,0 +1,31 @@
+import pytest
+from httpx import AsyncClient
+
+from app.infrastructure.web.setup import setup_app
+from app.settings import settings
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_requires_token(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    endpoint = "/metrics"
+    async with AsyncClient(app=setup_app(), base_url="http://test") as client:
+        # 1. Closed while no token is configured
+        monkeypatch.setattr(settings, "metrics_token", None)
+
+        assert (await client.get(endpoint)).status_code == 403
+
+        # 2. Once configured, only requests bearing the token get metrics
+        monkeypatch.setattr(settings, "metrics_token", "scraper-token")
+
+        assert (await client.get(endpoint)).status_code == 403
+        assert (
+            await client.get(endpoint, headers={"Authorization": "Bearer wrong"})
+        ).status_code == 403
+
+        response = await client.get(
+            endpoint, headers={"Authorization": "Bearer scraper-token"}
+        )
+
+        assert response.status_code == 200
+        assert "db_query_seconds" in response.text
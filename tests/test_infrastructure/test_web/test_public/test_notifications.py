@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+
+from app.usecases.interfaces.notifications_repo import INotificationsRepo
+from app.usecases.schemas import notifications
+from app.usecases.schemas.posts import PostInDB
+
+
+@pytest.mark.asyncio
+async def test_get_unread_count(
+    test_client: AsyncClient,
+    notifications_repo: INotificationsRepo,
+    inserted_post_object: PostInDB,
+) -> None:
+
+    endpoint = "/public/notifications/unread_count"
+
+    # 1. Notify the user of a reaction to their post
+    await notifications_repo.create(
+        new_event=notifications.NewEventRepoAdapter(
+            type=notifications.EventType.POST_REACTION,
+            user_to_notify=inserted_post_object.user_id,
+            user_who_fired_event=inserted_post_object.user_id,
+            affected_post_id=inserted_post_object.post_id,
+        )
+    )
+
+    response = await test_client.get(endpoint)
+
+    assert response.status_code == 200
+    assert response.json() == {"unread_count": 1}
+    etag = response.headers["ETag"]
+
+    # 2. Nothing changed, so the client's copy is still current
+    response = await test_client.get(endpoint, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+    # 3. Acknowledging the notification changes the count and the ETag
+    unread_notifications = await notifications_repo.retrieve_many(
+        user_id=inserted_post_object.user_id
+    )
+    await notifications_repo.update(
+        notification_id=unread_notifications[0].notification_id
+    )
+
+    response = await test_client.get(endpoint, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json() == {"unread_count": 0}
+    assert response.headers["ETag"] != etag
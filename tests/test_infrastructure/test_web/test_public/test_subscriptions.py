@@ -5,6 +5,7 @@ import pytest_asyncio
 from httpx import AsyncClient
 
 from app.usecases.schemas.subscriptions import StripeSubscription, SubscriptionInDB
+from app.usecases.services.stripe_events import StripeEventWorker
 
 
 @pytest_asyncio.fixture
@@ -65,7 +66,17 @@ async def test_get_subscription(
 
 
 @pytest.mark.asyncio
-async def test_webhook_received(test_client: AsyncClient):
+async def test_webhook_received(
+    test_client: AsyncClient, stripe_event_worker: StripeEventWorker
+):
     endpoint = "public/subscriptions/webhook_received"
     response = await test_client.post(endpoint, json={})
     assert response.status_code == 200
+
+    # The event is queued rather than handled inline, so the worker finds it
+    assert await stripe_event_worker.process_pending() == 1
+
+    # Stripe redelivering the same event doesn't queue it twice
+    response = await test_client.post(endpoint, json={})
+    assert response.status_code == 200
+    assert await stripe_event_worker.process_pending() == 0
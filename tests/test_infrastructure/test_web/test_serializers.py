@@ -0,0 +1,123 @@
+import json
+from datetime import datetime
+from typing import Any, List
+
+import orjson
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.infrastructure.web import serializers
+from app.usecases.schemas import posts, theses
+from app.usecases.schemas.request_pagination import MetaData
+from tests.benchmarks import Benchmark
+
+PAGE_SIZE = 200
+BENCHMARK_PAGES = 20
+
+
+def make_posts_page() -> List[posts.PostInfoFromDB]:
+    posts_page = []
+    for post_id in range(1, PAGE_SIZE + 1):
+        posts_page.append(
+            posts.PostInfoFromDB(
+                post_id=post_id,
+                user_id=post_id % 7 + 1,
+                username=f"user_{post_id % 7}",
+                title="Bought 5 shares of TSLA",
+                content="Pelleum is the future of investing." * 5,
+                asset_symbol="TSLA",
+                sentiment="Bull",
+                thesis_id=post_id if post_id % 2 == 0 else None,
+                created_at=datetime(2022, 3, 1, 12, 0, post_id % 60, post_id),
+                updated_at=datetime(2022, 3, 1, 12, 0, post_id % 60, post_id),
+                user_reaction_value=1 if post_id % 3 == 0 else None,
+                like_count=post_id,
+                comment_count=0,
+                thesis_json=orjson.dumps(
+                    {
+                        "title": "Pelleum to Change the World.",
+                        "content": "Pelleum is the future." * 20,
+                        "asset_symbol": "TSLA",
+                        "sentiment": "Bull",
+                        "thesis_id": post_id,
+                        "user_id": 1,
+                        "username": "user_0",
+                        "sources": ["https://www.pelleum.com"],
+                        "is_authors_current": True,
+                        "created_at": "2022-01-01T00:00:00",
+                        "updated_at": "2022-01-01T00:00:00",
+                    }
+                ).decode()
+                if post_id % 2 == 0
+                else None,
+            )
+        )
+    return posts_page
+
+
+META_DATA = MetaData(page=1, records_per_page=PAGE_SIZE)
+RESPONSE_FIELD = create_response_field(
+    name="response_model", type_=posts.ManyPostsResponse
+)
+
+
+async def render_through_response_model(posts_page: List[Any]) -> bytes:
+    """The previous path: copy each post into PostResponse with its thesis parsed,
+    then let FastAPI validate and encode the whole page against response_model."""
+
+    formatted_posts = [
+        posts.PostResponse(
+            thesis=theses.ThesisInDB.parse_raw(post.thesis_json)
+            if post.thesis_json
+            else None,
+            **post.dict(),
+        )
+        for post in posts_page
+    ]
+
+    content = await serialize_response(
+        field=RESPONSE_FIELD,
+        response_content=posts.ManyPostsResponse(
+            records=posts.Posts(posts=formatted_posts), meta_data=META_DATA
+        ),
+    )
+    return JSONResponse(content=content).body
+
+
+def render_with_serializers(posts_page: List[Any]) -> bytes:
+    return serializers.RawJSONResponse(
+        content=serializers.dump_page(
+            records_key="posts",
+            records=[serializers.dump_post_response(post) for post in posts_page],
+            meta_data=META_DATA,
+        )
+    ).body
+
+
+@pytest.mark.asyncio
+async def test_serializers_match_response_model():
+    posts_page = make_posts_page()
+    posts_page[0].comment_count = 1
+    posts_page[0].replies = [posts_page[1]]
+
+    assert json.loads(render_with_serializers(posts_page)) == json.loads(
+        await render_through_response_model(posts_page)
+    )
+
+
+@pytest.mark.asyncio
+async def test_posts_page_serialization_time(benchmark: Benchmark):
+    """Times rendering the same 200 post page through response_model and through
+    the serializers, which skip revalidating the page."""
+
+    posts_page = make_posts_page()
+
+    with benchmark.timer("response_model_ms_per_page", runs=BENCHMARK_PAGES):
+        for _ in range(BENCHMARK_PAGES):
+            await render_through_response_model(posts_page)
+
+    with benchmark.timer("serializers_ms_per_page", runs=BENCHMARK_PAGES):
+        for _ in range(BENCHMARK_PAGES):
+            render_with_serializers(posts_page)
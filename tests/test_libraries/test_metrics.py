@@ -0,0 +1,32 @@
+from app.libraries.metrics import Histogram, HistogramFamily
+
+
+def test_histogram_counts_are_cumulative():
+
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative_counts() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+    assert histogram.sum == 2.65
+
+
+def test_histogram_family_renders_prometheus_text():
+
+    histogram_family = HistogramFamily(
+        name="db_query_seconds",
+        description="Query latency.",
+        label="method",
+        buckets=(0.1,),
+    )
+    histogram_family.observe("user_repo.create", 0.05)
+
+    assert list(histogram_family.render()) == [
+        "# HELP db_query_seconds Query latency.",
+        "# TYPE db_query_seconds histogram",
+        'db_query_seconds_bucket{method="user_repo.create",le="0.1"} 1',
+        'db_query_seconds_bucket{method="user_repo.create",le="+Inf"} 1',
+        'db_query_seconds_count{method="user_repo.create"} 1',
+        'db_query_seconds_sum{method="user_repo.create"} 0.05',
+    ]
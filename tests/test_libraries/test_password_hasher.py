@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.libraries.password_hasher import PasswordHasher, create_password_context
+from tests.benchmarks import Benchmark
+
+# The lowest cost bcrypt allows, so the tests stay fast
+TEST_BCRYPT_ROUNDS = 4
+BENCHMARK_HASHES = 20
+
+
+@pytest_asyncio.fixture
+async def password_hasher() -> PasswordHasher:
+    password_hasher = PasswordHasher(
+        password_context=create_password_context(bcrypt_rounds=TEST_BCRYPT_ROUNDS),
+        max_workers=2,
+        max_queue=BENCHMARK_HASHES,
+        retry_after=1,
+    )
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify(password_hasher: PasswordHasher):
+
+    hashed_password = await password_hasher.hash("AFGADaHAF$HADFHA1R")
+
+    assert await password_hasher.verify("AFGADaHAF$HADFHA1R", hashed_password)
+    assert not await password_hasher.verify("wrong_password", hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_rehashes_on_cost_change(
+    password_hasher: PasswordHasher,
+):
+    # 1. Hash a password under the current cost
+    hashed_password = await password_hasher.hash("AFGADaHAF$HADFHA1R")
+
+    # 2. Verifying under the same cost doesn't produce a new hash
+    _, new_hashed_password = await password_hasher.verify_and_update(
+        "AFGADaHAF$HADFHA1R", hashed_password
+    )
+    assert new_hashed_password is None
+
+    # 3. Verifying after the cost is raised produces a hash with the new cost
+    password_hasher.password_context = create_password_context(
+        bcrypt_rounds=TEST_BCRYPT_ROUNDS + 1
+    )
+    password_matches, new_hashed_password = await password_hasher.verify_and_update(
+        "AFGADaHAF$HADFHA1R", hashed_password
+    )
+
+    assert password_matches
+    assert new_hashed_password.startswith(f"$2b$0{TEST_BCRYPT_ROUNDS + 1}$")
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_saturated():
+
+    password_hasher = PasswordHasher(
+        password_context=create_password_context(bcrypt_rounds=TEST_BCRYPT_ROUNDS),
+        max_workers=1,
+        max_queue=0,
+        retry_after=3,
+    )
+
+    results = await asyncio.gather(
+        password_hasher.hash("first_password"),
+        password_hasher.hash("second_password"),
+        return_exceptions=True,
+    )
+    password_hasher.shutdown()
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 503
+    assert results[1].headers["Retry-After"] == "3"
+    assert password_hasher.metrics()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hashing_throughput(
+    password_hasher: PasswordHasher, benchmark: Benchmark
+):
+    """Hashes a burst of passwords at once, more than the pool has workers, and
+    times how long each takes on average while they share it."""
+
+    with benchmark.timer("ms_per_hash", runs=BENCHMARK_HASHES):
+        hashed_passwords = await asyncio.gather(
+            *[password_hasher.hash(f"password_{i}") for i in range(BENCHMARK_HASHES)]
+        )
+
+    assert len(set(hashed_passwords)) == BENCHMARK_HASHES
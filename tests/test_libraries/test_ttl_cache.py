@@ -0,0 +1,37 @@
+from app.libraries.ttl_cache import TTLCache
+
+
+def test_evicts_least_recently_used_entry():
+
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("first", 1)
+    cache.set("second", 2)
+
+    # 1. Reading the first entry makes the second the least recently used
+    assert cache.get("first") == 1
+
+    # 2. So adding a third entry evicts the second
+    cache.set("third", 3)
+
+    assert cache.get("first") == 1
+    assert cache.get("second") is None
+    assert cache.get("third") == 3
+
+
+def test_replacing_an_entry_does_not_evict_another():
+
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("first", 1)
+    cache.set("second", 2)
+    cache.set("second", 3)
+
+    assert cache.get("first") == 1
+    assert cache.get("second") == 3
+
+
+def test_expired_entries_are_not_returned():
+
+    cache = TTLCache(ttl=0)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
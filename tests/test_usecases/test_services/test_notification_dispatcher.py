@@ -0,0 +1,144 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.usecases.schemas import notifications
+from app.usecases.services.notification_dispatcher import NotificationDispatcher
+
+
+class RecordingNotificationsRepo:
+    """Records the batches the dispatcher writes, in place of NotificationsRepo"""
+
+    def __init__(self):
+        self.batches: List[List[notifications.NewEventRepoAdapter]] = []
+
+    async def create(self, new_event: notifications.NewEventRepoAdapter) -> None:
+        self.batches.append([new_event])
+
+    async def create_many(
+        self, new_events: List[notifications.NewEventRepoAdapter]
+    ) -> None:
+        await asyncio.sleep(0)
+        self.batches.append(new_events)
+
+
+def make_event(post_id: int) -> notifications.NewEventRepoAdapter:
+    return notifications.NewEventRepoAdapter(
+        type=notifications.EventType.POST_REACTION,
+        user_to_notify=1,
+        user_who_fired_event=2,
+        affected_post_id=post_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_dispatch_before_start_writes_right_away():
+    notifications_repo = RecordingNotificationsRepo()
+    dispatcher = NotificationDispatcher(notifications_repo=notifications_repo)
+
+    await dispatcher.dispatch(new_event=make_event(1))
+
+    assert notifications_repo.batches == [[make_event(1)]]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_writes_in_batches():
+    notifications_repo = RecordingNotificationsRepo()
+    dispatcher = NotificationDispatcher(
+        notifications_repo=notifications_repo, batch_size=3, flush_interval=10
+    )
+    dispatcher.start()
+
+    for post_id in range(7):
+        await dispatcher.dispatch(new_event=make_event(post_id))
+
+    # 1. Full batches are written without waiting for the flush interval
+    await asyncio.sleep(0.01)
+    assert [len(batch) for batch in notifications_repo.batches] == [3, 3]
+
+    # 2. Stopping writes out what's left
+    await dispatcher.stop()
+    assert [len(batch) for batch in notifications_repo.batches] == [3, 3, 1]
+    assert [
+        new_event.affected_post_id
+        for batch in notifications_repo.batches
+        for new_event in batch
+    ] == list(range(7))
+
+
+@pytest.mark.asyncio
+async def test_dispatch_flushes_after_interval():
+    notifications_repo = RecordingNotificationsRepo()
+    dispatcher = NotificationDispatcher(
+        notifications_repo=notifications_repo, batch_size=100, flush_interval=0.01
+    )
+    dispatcher.start()
+
+    await dispatcher.dispatch(new_event=make_event(1))
+    await dispatcher.dispatch(new_event=make_event(2))
+    await asyncio.sleep(0.05)
+
+    assert notifications_repo.batches == [[make_event(1), make_event(2)]]
+
+    await dispatcher.stop()
+
+
+class FlakyNotificationsRepo(RecordingNotificationsRepo):
+    """Fails its first few writes, then records batches"""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def create_many(
+        self, new_events: List[notifications.NewEventRepoAdapter]
+    ) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Database unavailable")
+        await super().create_many(new_events=new_events)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_retries_failed_writes():
+    notifications_repo = FlakyNotificationsRepo(failures=2)
+    dispatcher = NotificationDispatcher(
+        notifications_repo=notifications_repo,
+        flush_interval=0.01,
+        max_attempts=3,
+        retry_backoff=0.01,
+    )
+    dispatcher.start()
+
+    await dispatcher.dispatch(new_event=make_event(1))
+    await asyncio.sleep(0.1)
+
+    assert notifications_repo.batches == [[make_event(1)]]
+    assert dispatcher.metrics()["written"] == 1
+    assert dispatcher.metrics()["failed_batches"] == 2
+    assert dispatcher.metrics()["dropped"] == 0
+
+    await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_drops_batch_after_max_attempts():
+    notifications_repo = FlakyNotificationsRepo(failures=3)
+    dispatcher = NotificationDispatcher(
+        notifications_repo=notifications_repo,
+        flush_interval=0.01,
+        max_attempts=3,
+        retry_backoff=0.01,
+    )
+    dispatcher.start()
+
+    await dispatcher.dispatch(new_event=make_event(1))
+    await dispatcher.dispatch(new_event=make_event(2))
+    await asyncio.sleep(0.1)
+
+    assert notifications_repo.batches == []
+    assert dispatcher.metrics()["failed_batches"] == 3
+    assert dispatcher.metrics()["dropped"] == 2
+
+    await dispatcher.stop()